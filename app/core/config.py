@@ -29,10 +29,21 @@ class Settings(BaseSettings):
             path=f"{info.data.get('POSTGRES_DB')}",
         )
 
+    # --- Connection Pool Settings ---
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0 # Seconds to wait for a free connection before failing
+    DB_POOL_RECYCLE: int = 1800 # Seconds before a pooled connection is replaced
+    DB_STATEMENT_TIMEOUT_MS: int = 30000 # 0 disables the server-side timeout
+    DB_ASYNC_ENABLED: bool = False # Async engine (asyncpg) for the async endpoints
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 100 # Per connection; 0 behind PgBouncer transaction pooling
+    PREDICTION_PARTITION_DAYS_AHEAD: int = 7 # Daily predictions partitions created ahead of time
+
     # --- Reddit API Settings ---
     REDDIT_CLIENT_ID: str = ""
     REDDIT_CLIENT_SECRET: str = ""
     REDDIT_USER_AGENT: str = "my-reddit-app/0.1" 
+    REDDIT_REPLAY_FILE: Optional[str] = None # Serve a recorded dataset instead of the live API (offline runs)
 
     # --- MLflow Settings ---
     MLFLOW_TRACKING_URI: str = "http://mlflow:5000"
@@ -43,10 +54,24 @@ class Settings(BaseSettings):
     # --- Application Behavior Settings ---
     SUBREDDITS_TO_FETCH: List[str] = ["politics", "worldnews", "changemyview", 'unpopularopinion', 'Debate', 'TrueUnpopularOpinion', 'PoliticalDiscussion']
     POST_FETCH_LIMIT: int = 10
+    COMMENT_PAGE_SIZE: int = 500
+    PAGE_SIZE_DEFAULT: int = 50
+    PAGE_SIZE_MAX: int = 500
+
+    # --- Stream Ingestion Settings ---
+    STREAM_INGESTION_ENABLED: bool = False
+    STREAM_POLL_INTERVAL_SECONDS: float = 30.0 # Comments listing; subreddits are scheduled adaptively
+    STREAM_LISTING_LIMIT: int = 100 # Reddit caps listings at 100 items per request
+    STREAM_COMMENTS_MAX_ITEMS: int = 1000 # Comments paged per poll until the checkpoint; Reddit listings end near 1000
+    STREAM_REQUEST_BUDGET_PER_MINUTE: float = 60.0 # Shared by all stream polls, below Reddit's 100 QPM
+    STREAM_MIN_POLL_INTERVAL_SECONDS: float = 10.0
+    STREAM_MAX_POLL_INTERVAL_SECONDS: float = 900.0
 
     # --- Inference Service Settings ---
     MLFLOW_MODEL_NAME: str = ""
     MLFLOW_CHAMPION_ALIAS: str = ""
+    EMBEDDING_SAMPLING_ENABLED: bool = False # Keep a daily reservoir sample of CLS embeddings for drift monitoring
+    EMBEDDING_RESERVOIR_SIZE: int = 512 # Embeddings kept per model version and UTC day
 
     # --- Gemma3 API Settings ---
     LLM_API_KEY: str
@@ -59,6 +84,9 @@ class Settings(BaseSettings):
 settings = Settings()
 
 def get_reddit_client() -> praw.Reddit:
+    if settings.REDDIT_REPLAY_FILE:
+        from app.data_fetcher.utils.replay_reddit import ReplayReddit
+        return ReplayReddit.from_file(settings.REDDIT_REPLAY_FILE)
     if not all([settings.REDDIT_CLIENT_ID, settings.REDDIT_CLIENT_SECRET, settings.REDDIT_USER_AGENT]):
         raise ValueError("Reddit API credentials (client_id, client_secret, user_agent) are not fully configured.")
     return praw.Reddit(
@@ -1,18 +1,157 @@
-from sqlalchemy import create_engine
+import threading
+import time
+from typing import Any, Dict
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from app.core.config import settings
 
 
-SQLALCHEMY_DATABASE_URL = str(settings.DATABASE_URL) 
+SQLALCHEMY_DATABASE_URL = str(settings.DATABASE_URL)
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+SLOW_CHECKOUT_SECONDS = 0.1
+
+class PoolMetrics:
+    """Checkout counters of one connection pool. Waits include opening a new connection when the pool grows."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.slow_checkouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.connections_opened = 0
+        self.connections_invalidated = 0
+
+    def record_checkout(self, wait_seconds: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait_seconds += wait_seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+            if wait_seconds >= SLOW_CHECKOUT_SECONDS:
+                self.slow_checkouts += 1
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.checkout_timeouts += 1
+
+    def record_connect(self) -> None:
+        with self._lock:
+            self.connections_opened += 1
+
+    def record_invalidate(self) -> None:
+        with self._lock:
+            self.connections_invalidated += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.checkout_timeouts,
+                "slow_checkouts": self.slow_checkouts,
+                "avg_wait_ms": round(1000 * self.total_wait_seconds / self.checkouts, 3) if self.checkouts else 0.0,
+                "max_wait_ms": round(1000 * self.max_wait_seconds, 3),
+                "connections_opened": self.connections_opened,
+                "connections_invalidated": self.connections_invalidated,
+            }
+
+class _TimedCheckoutMixin:
+    # The pool has no "checkout requested" event, so the wait is timed around the queue get itself
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record_timeout()
+            raise
+        self.metrics.record_checkout(time.perf_counter() - started)
+        return connection
+
+sync_pool_metrics = PoolMetrics()
+async_pool_metrics = PoolMetrics()
+
+class InstrumentedQueuePool(_TimedCheckoutMixin, QueuePool):
+    metrics = sync_pool_metrics
+
+class InstrumentedAsyncQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    metrics = async_pool_metrics
+
+def _pool_options() -> Dict[str, Any]:
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": True, # Drop connections the server or a proxy closed while idle
+    }
+
+def _listen_pool_events(target, metrics: PoolMetrics) -> None:
+    event.listen(target, "connect", lambda *args: metrics.record_connect())
+    event.listen(target, "invalidate", lambda *args: metrics.record_invalidate())
+
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    poolclass=InstrumentedQueuePool,
+    # statement_timeout is set per connection, so a runaway query cannot hold a pooled connection forever
+    connect_args={"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"},
+    **_pool_options(),
+)
+_listen_pool_events(engine, sync_pool_metrics)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Optional asyncio engine (asyncpg) for `async def` endpoints, enabled with DB_ASYNC_ENABLED
+async_engine = None
+AsyncSessionLocal = None
+if settings.DB_ASYNC_ENABLED:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    # prepared_statement_cache_size is the per-connection cache of asyncpg prepared statements;
+    # set it to 0 behind a transaction-pooling proxy such as PgBouncer
+    async_url = make_url(SQLALCHEMY_DATABASE_URL).set(drivername="postgresql+asyncpg").update_query_dict(
+        {"prepared_statement_cache_size": str(settings.DB_PREPARED_STATEMENT_CACHE_SIZE)}
+    )
+    async_engine = create_async_engine(
+        async_url,
+        poolclass=InstrumentedAsyncQueuePool,
+        connect_args={"server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}},
+        **_pool_options(),
+    )
+    _listen_pool_events(async_engine.sync_engine, async_pool_metrics)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    """Yields an AsyncSession, or None when the async engine is disabled (callers then fall back to the sync session)."""
+    if AsyncSessionLocal is None:
+        yield None
+        return
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def get_pool_status() -> Dict[str, Any]:
+    pools = {"sync": (engine.pool, sync_pool_metrics)}
+    if async_engine is not None:
+        pools["async"] = (async_engine.pool, async_pool_metrics)
+    return {
+        name: {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "idle": pool.checkedin(),
+            **metrics.snapshot(),
+        }
+        for name, (pool, metrics) in pools.items()
+    }
@@ -0,0 +1,94 @@
+import logging
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List
+from sqlalchemy import MetaData, Index, inspect, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import CreateIndex
+from app.core.config import settings
+from app.core.partitions import convert_to_partitioned, ensure_daily_partitions, partition_column, relkind
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(name)s - %(message)s",
+    handlers=[
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger(__name__)
+
+# Advisory lock key shared by the app and the retrainer, which migrate the same database
+SCHEMA_LOCK_KEY = 720250601
+
+def apply_schema(engine: Engine, metadata: MetaData) -> None:
+    """
+    Replacement for `metadata.create_all` at startup. Creates missing tables, then makes sure every
+    index declared on the models exists on the tables that were already there, which `create_all`
+    never revisits.
+
+    Indexes on existing tables are built with CREATE INDEX CONCURRENTLY, so reads and the fetcher's
+    writes carry on during the build. A concurrent build that failed half-way leaves an INVALID
+    index behind; those are dropped and rebuilt. Partitioned parents don't support CONCURRENTLY, so
+    their indexes are built with a plain CREATE INDEX.
+
+    Tables declared as range-partitioned (see core/partitions.py) are converted in place if they
+    still exist as plain tables, and get their daily partitions created ahead of time.
+
+    The whole run holds a session-level advisory lock, so several replicas (or both services)
+    starting together do not race each other.
+    """
+    if engine.dialect.name != "postgresql":
+        metadata.create_all(bind=engine)
+        return
+    # CONCURRENTLY cannot run inside a transaction block, hence AUTOCOMMIT
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("SET statement_timeout = 0")) # Index builds on big tables outlast the request timeout
+        conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": SCHEMA_LOCK_KEY})
+        try:
+            partitioned_tables = [table for table in metadata.sorted_tables if partition_column(table)]
+            for table in partitioned_tables:
+                if relkind(conn, table.name) == "r":
+                    with engine.begin() as tx:
+                        tx.execute(text("SET LOCAL statement_timeout = 0"))
+                        copied = convert_to_partitioned(tx, table, settings.PREDICTION_PARTITION_DAYS_AHEAD)
+                    logger.info(f"Converted {table.name} to a partitioned table ({copied} rows copied)")
+            existing_tables = set(inspect(conn).get_table_names())
+            metadata.create_all(bind=conn)
+            today = datetime.now(timezone.utc).date()
+            for table in partitioned_tables:
+                with engine.begin() as tx:
+                    created = ensure_daily_partitions(tx, table, today, today + timedelta(days=settings.PREDICTION_PARTITION_DAYS_AHEAD))
+                if created:
+                    logger.info(f"Created partitions {', '.join(created)}")
+            for table in metadata.sorted_tables:
+                if table.name in existing_tables:
+                    concurrently = relkind(conn, table.name) != "p"
+                    ensure_indexes(conn, sorted(table.indexes, key=lambda index: index.name), concurrently=concurrently)
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": SCHEMA_LOCK_KEY})
+
+def ensure_indexes(conn: Connection, indexes: List[Index], concurrently: bool = True) -> None:
+    for index in indexes:
+        is_valid = conn.execute(
+            text("SELECT i.indisvalid FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid WHERE c.relname = :name"),
+            {"name": index.name}
+        ).scalar()
+        if is_valid:
+            continue
+        if is_valid is False:
+            logger.warning(f"Index {index.name} is invalid (interrupted concurrent build), rebuilding it")
+            conn.exec_driver_sql(f'DROP INDEX {"CONCURRENTLY " if concurrently else ""}IF EXISTS "{index.name}"')
+        started = time.perf_counter()
+        conn.exec_driver_sql(_create_index_sql(index, concurrently))
+        logger.info(f"Created index {index.name} on {index.table.name} in {time.perf_counter() - started:.1f}s")
+
+def _create_index_sql(index: Index, concurrently: bool) -> str:
+    # Models don't declare postgresql_concurrently themselves: plain create_all (scripts, new empty
+    # tables) may run inside a transaction, where CONCURRENTLY is not allowed
+    index.dialect_options["postgresql"]["concurrently"] = concurrently
+    try:
+        return str(CreateIndex(index, if_not_exists=True).compile(dialect=postgresql.dialect()))
+    finally:
+        index.dialect_options["postgresql"]["concurrently"] = False
@@ -1,12 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
-from typing import List
+from typing import List, Optional, Union
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.data_fetcher.services.reddit_service import RedditService
 from app.data_fetcher.schemas.reddit_post import RedditPost
+from app.data_fetcher.schemas.reddit_comment import RedditComment
 from app.data_fetcher.repositories.reddit_post import RedditPostRepository
-from app.core.db import get_db
+from app.data_fetcher.repositories.async_reddit_post import AsyncRedditPostRepository
+from app.core.db import get_db, get_async_db, SessionLocal
+from app.core.pagination import Page, stream_json_array
 from app.core.config import get_reddit_client
 import praw
 from app.core.config import settings
@@ -18,9 +22,14 @@ router = APIRouter()
 templates = Jinja2Templates(directory="app/data_fetcher/templates")
 
 
-def get_reddit_service(db: Session = Depends(get_db), reddit_client: praw.Reddit = Depends(get_reddit_client)) -> RedditService:
+def get_reddit_service(
+    db: Session = Depends(get_db),
+    async_db: Optional[AsyncSession] = Depends(get_async_db),
+    reddit_client: praw.Reddit = Depends(get_reddit_client)
+) -> RedditService:
     repository = RedditPostRepository(db)
-    return RedditService(repository, reddit_client)
+    async_repository = AsyncRedditPostRepository(async_db) if async_db is not None else None
+    return RedditService(repository, reddit_client, async_repository)
 
 
 @router.post("/fetch/{subreddit}", response_model=List[RedditPost])
@@ -46,13 +55,85 @@ async def fetch_posts_from_predefined_subreddits(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/posts", response_model=List[RedditPost])
-def get_posts(service: RedditService = Depends(get_reddit_service)):
-    return service.get_all_posts()
+@router.get("/stream/status", response_model=dict)
+def get_stream_status(request: Request):
+    """Reports the long-running ingestion mode's state and per-stream checkpoints."""
+    return request.app.state.stream_ingestion.status()
 
-@router.get("/posts/unprocessed", response_model=List[RedditPost])
-def get_unprocessed_posts(service: RedditService = Depends(get_reddit_service)):
-    return service.get_unprocessed_posts()
+@router.get("/stream/schedule", response_model=dict)
+def get_stream_schedule(request: Request):
+    """Shows each subreddit's estimated post rate, polling interval, listing limit and next poll time."""
+    return request.app.state.stream_ingestion.schedule()
+
+@router.post("/stream/start", response_model=dict)
+def start_stream_ingestion(request: Request):
+    """Starts continuous ingestion alongside the /fetch batch endpoint."""
+    try:
+        started = request.app.state.stream_ingestion.start()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"message": "Stream ingestion started." if started else "Stream ingestion is already running."}
+
+@router.post("/stream/stop", response_model=dict)
+def stop_stream_ingestion(request: Request):
+    stopped = request.app.state.stream_ingestion.stop()
+    return {"message": "Stream ingestion stopped." if stopped else "Stream ingestion is not running."}
+
+def _stream_posts(processed_status: str, start_date: Optional[str], end_date: Optional[str]):
+    # Streaming outlives the request's dependencies, so the generator owns its own session
+    db = SessionLocal()
+    try:
+        service = RedditService(RedditPostRepository(db), reddit_client=None)
+        yield from stream_json_array(service.iter_filtered_posts(processed_status, start_date=start_date, end_date=end_date))
+    finally:
+        db.close()
+
+@router.get("/posts", response_model=Union[Page[RedditPost], List[RedditPost]])
+def get_posts(
+    processed_status: str = Query("all", enum=["all", "processed", "unprocessed"]),
+    start_date: Optional[str] = Query(None),
+    end_date: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: Optional[int] = Query(None, ge=1, le=settings.PAGE_SIZE_MAX, description="Page size; pass it (or cursor) to get a Page"),
+    stream: bool = Query(False, description="Stream every matching post as one JSON array instead of a page"),
+    service: RedditService = Depends(get_reddit_service)
+):
+    """
+    Lists posts, newest first. With `cursor` or `limit` it returns one keyset `Page`; without either
+    it keeps the original plain-list response, capped at PAGE_SIZE_DEFAULT posts. `stream=true`
+    exports every matching post.
+    """
+    try:
+        # Validated up front: once streaming has started, errors can no longer become a 400
+        RedditService.parse_date_range(start_date, end_date)
+        if stream:
+            return StreamingResponse(_stream_posts(processed_status, start_date, end_date), media_type="application/json")
+        page = service.get_filtered_posts(processed_status, start_date=start_date, end_date=end_date, cursor=cursor, limit=limit or settings.PAGE_SIZE_DEFAULT)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return page if cursor is not None or limit is not None else page.items
+
+@router.get("/posts/unprocessed", response_model=Union[Page[RedditPost], List[RedditPost]])
+def get_unprocessed_posts(
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: Optional[int] = Query(None, ge=1, le=settings.PAGE_SIZE_MAX, description="Page size; pass it (or cursor) to get a Page"),
+    service: RedditService = Depends(get_reddit_service)
+):
+    """Same as /posts?processed_status=unprocessed: a Page with `cursor` or `limit`, otherwise a capped plain list."""
+    try:
+        page = service.get_filtered_posts("unprocessed", cursor=cursor, limit=limit or settings.PAGE_SIZE_DEFAULT)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return page if cursor is not None or limit is not None else page.items
+
+@router.get("/posts/{post_id}/comments", response_model=List[RedditComment])
+def get_post_comments(
+    post_id: str,
+    after_id: Optional[int] = Query(None, description="Return comments after this id (keyset pagination)"),
+    limit: int = Query(settings.COMMENT_PAGE_SIZE, ge=1, le=settings.COMMENT_PAGE_SIZE),
+    service: RedditService = Depends(get_reddit_service)
+):
+    return service.get_post_comments(post_id, after_id=after_id, limit=limit)
 
 @router.put("/posts/{post_id}/mark-processed", response_model=RedditPost)
 def mark_post_as_processed(post_id: str, service: RedditService = Depends(get_reddit_service)):
@@ -70,22 +151,32 @@ async def view_posts_ui(
     processed_status: str = Query("all", enum=["all", "processed", "unprocessed"]),
     start_date: str = Query(None),
     end_date: str = Query(None),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
     service: RedditService = Depends(get_reddit_service),
 ):
     '''
-    UI endpoint to view posts with filtering.
+    UI endpoint to view posts with filtering, one page at a time.
     '''
 
-    posts = service.get_filtered_posts(
-        processed_status=processed_status, 
-        start_date=start_date, 
-        end_date=end_date
-    )
+    try:
+        page = await service.get_filtered_posts_async(
+            processed_status=processed_status, 
+            start_date=start_date, 
+            end_date=end_date,
+            cursor=cursor,
+            limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    comments_by_post = await service.get_comments_for_posts_async([post.post_id for post in page.items])
     return templates.TemplateResponse(
         "posts_view.html",
         {
             "request": request, 
-            "posts": posts, 
+            "posts": page.items, 
+            "next_cursor": page.next_cursor,
+            "comments_by_post": comments_by_post,
             "processed_status": processed_status,
             "start_date": start_date,
             "end_date": end_date
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, String, DateTime, Integer, Text, Boolean, ForeignKey, Index
+from app.core.db import Base
+
+class RedditComment(Base):
+    __tablename__ = "raw_comments"
+
+    id = Column(Integer, primary_key=True, index=True)
+    comment_id = Column(String, unique=True, index=True, nullable=False)
+    post_id = Column(String, ForeignKey("raw_posts.post_id", ondelete="CASCADE"), index=True, nullable=False)
+    parent_id = Column(String, nullable=True)
+    author = Column(String, nullable=True)
+    body = Column(Text)
+    created_utc = Column(DateTime)
+    is_processed = Column(Boolean, default=False, nullable=False)
+
+    __table_args__ = (
+        Index("ix_raw_comments_unprocessed_id", "id", postgresql_where=is_processed == False),
+        Index("ix_raw_comments_post_id_id", "post_id", "id"), # A thread's comments in id order
+    )
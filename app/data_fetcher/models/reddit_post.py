@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Integer, Text, JSON, Boolean
+from sqlalchemy import Column, String, DateTime, Integer, Text, Boolean, Index
 from app.core.db import Base 
 
 class RedditPost(Base):
@@ -9,6 +9,12 @@ class RedditPost(Base):
     subreddit = Column(String)
     title = Column(String)
     text = Column(Text) 
-    comments = Column(JSON)
     created_utc = Column(DateTime)
     is_processed = Column(Boolean, default=False, nullable=False)
+
+    __table_args__ = (
+        # Inference backlog and the "unprocessed" listing: only the small unprocessed slice is indexed
+        Index("ix_raw_posts_unprocessed_created_utc_id", "created_utc", "id", postgresql_where=is_processed == False),
+        # Date-range reads and the keyset-paginated listing
+        Index("ix_raw_posts_created_utc_id", "created_utc", "id"),
+    )
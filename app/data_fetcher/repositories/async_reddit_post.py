@@ -0,0 +1,38 @@
+from datetime import datetime
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, List, Optional, Tuple
+from app.data_fetcher.models.reddit_post import RedditPost
+from app.data_fetcher.models.reddit_comment import RedditComment
+from app.data_fetcher.repositories.reddit_post import filtered_posts_criteria
+from app.core.config import settings
+
+class AsyncRedditPostRepository:
+    """Read-only counterpart of RedditPostRepository for the async endpoints."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_filtered_posts(
+        self,
+        processed_status: str = "all",
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        after: Optional[Tuple[datetime, int]] = None,
+        limit: int = settings.PAGE_SIZE_DEFAULT,
+    ) -> Tuple[List[RedditPost], bool]:
+        stmt = select(RedditPost).where(*filtered_posts_criteria(processed_status, start_date, end_date))
+        if after:
+            stmt = stmt.where(tuple_(RedditPost.created_utc, RedditPost.id) < after)
+        stmt = stmt.order_by(RedditPost.created_utc.desc(), RedditPost.id.desc()).limit(limit + 1)
+        rows = (await self.db.scalars(stmt)).all()
+        return list(rows[:limit]), len(rows) > limit
+
+    async def get_comments_for_posts(self, post_ids: List[str]) -> Dict[str, List[RedditComment]]:
+        grouped: Dict[str, List[RedditComment]] = {post_id: [] for post_id in post_ids}
+        if not post_ids:
+            return grouped
+        stmt = select(RedditComment).where(RedditComment.post_id.in_(post_ids)).order_by(RedditComment.id)
+        for comment in (await self.db.scalars(stmt)).all():
+            grouped[comment.post_id].append(comment)
+        return grouped
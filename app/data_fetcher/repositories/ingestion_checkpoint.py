@@ -0,0 +1,33 @@
+from datetime import datetime
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from typing import Dict
+from app.data_fetcher.models.ingestion_checkpoint import IngestionCheckpoint
+
+class IngestionCheckpointRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_checkpoint(self, stream_name: str) -> IngestionCheckpoint | None:
+        return self.db.get(IngestionCheckpoint, stream_name)
+
+    def get_all_checkpoints(self) -> Dict[str, IngestionCheckpoint]:
+        return {checkpoint.stream_name: checkpoint for checkpoint in self.db.query(IngestionCheckpoint).all()}
+
+    def save_checkpoint(self, stream_name: str, last_created_utc: datetime, last_item_id: str) -> None:
+        stmt = pg_insert(IngestionCheckpoint).values(
+            stream_name=stream_name,
+            last_created_utc=last_created_utc,
+            last_item_id=last_item_id,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[IngestionCheckpoint.stream_name],
+            set_={
+                "last_created_utc": stmt.excluded.last_created_utc,
+                "last_item_id": stmt.excluded.last_item_id,
+                "updated_at": func.now(),
+            },
+        )
+        self.db.execute(stmt)
+        self.db.commit()
@@ -1,18 +1,38 @@
 from datetime import datetime, timedelta
-from sqlalchemy import func
+from sqlalchemy import Row, func, insert, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 from app.data_fetcher.models.reddit_post import RedditPost
+from app.data_fetcher.models.reddit_comment import RedditComment
 from app.data_fetcher.schemas.reddit_post import RedditPostCreate
+from app.data_fetcher.schemas.reddit_comment import RedditCommentCreate
+from app.core.config import settings
+
+def filtered_posts_criteria(processed_status: str = "all", start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> List:
+    """WHERE criteria of the posts listing, shared with AsyncRedditPostRepository."""
+    criteria = []
+    if processed_status == "processed":
+        criteria.append(RedditPost.is_processed == True)
+    elif processed_status == "unprocessed":
+        criteria.append(RedditPost.is_processed == False)
+    if start_date:
+        criteria.append(RedditPost.created_utc >= start_date)
+    if end_date:
+        # Add 1 day to the end date to include the whole day
+        criteria.append(RedditPost.created_utc < end_date + timedelta(days=1))
+    return criteria
 
 class RedditPostRepository:
     def __init__(self, db: Session):
         self.db = db
 
     def create_post(self, post: RedditPostCreate) -> RedditPost:
-        db_post_data = post.model_dump() 
+        db_post_data = post.model_dump(exclude={"comments"})
         db_post = RedditPost(**db_post_data)
         self.db.add(db_post)
+        self.db.flush()
+        self._insert_comments(post.comments)
         self.db.commit()
         self.db.refresh(db_post)
         return db_post
@@ -20,19 +40,40 @@ class RedditPostRepository:
     def get_post_by_id(self, post_id: str) -> RedditPost | None:
         return self.db.query(RedditPost).filter(RedditPost.post_id == post_id).first()
 
-    def get_all_posts(self) -> List[RedditPost]:
-        return self.db.query(RedditPost).all()
-
     def get_unprocessed_posts(self) -> List[RedditPost]:
         return self.db.query(RedditPost).filter(RedditPost.is_processed == False).all()
 
-    def batch_create_posts(self, posts: List[RedditPostCreate]) -> List[RedditPost]:
-        db_posts = [RedditPost(**post.model_dump()) for post in posts]
-        self.db.add_all(db_posts)
+    def get_existing_post_ids(self, post_ids: List[str]) -> Set[str]:
+        if not post_ids:
+            return set()
+        rows = self.db.query(RedditPost.post_id).filter(RedditPost.post_id.in_(post_ids)).all()
+        return {row.post_id for row in rows}
+
+    def bulk_upsert_posts(self, posts: List[RedditPostCreate]) -> List[Row]:
+        """
+        Inserts a batch of posts and their comments in one transaction. Posts that already
+        exist (e.g. written by a concurrent fetcher) are skipped by ON CONFLICT DO NOTHING,
+        and only the rows actually inserted are returned.
+        """
+        if not posts:
+            return []
+        post_stmt = pg_insert(RedditPost).values(
+            [post.model_dump(exclude={"comments"}) for post in posts]
+        ).on_conflict_do_nothing(index_elements=[RedditPost.post_id]).returning(*RedditPost.__table__.c)
+        created_posts = self.db.execute(post_stmt).all()
+
+        # Only attach comments to posts this call created; the winner of a race owns the rest
+        created_post_ids = {row.post_id for row in created_posts}
+        comment_rows = [
+            comment.model_dump()
+            for post in posts if post.post_id in created_post_ids
+            for comment in post.comments
+        ]
+        if comment_rows:
+            comment_stmt = pg_insert(RedditComment).on_conflict_do_nothing(index_elements=[RedditComment.comment_id])
+            self.db.execute(comment_stmt, comment_rows)
         self.db.commit()
-        for db_post in db_posts:
-            self.db.refresh(db_post)
-        return db_posts
+        return created_posts
 
     def mark_post_as_processed(self, post_id: str) -> RedditPost | None:
         db_post = self.get_post_by_id(post_id)
@@ -42,25 +83,124 @@ class RedditPostRepository:
             self.db.refresh(db_post)
         return db_post
 
-    def get_filtered_posts(self, processed_status: str = "all", start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> List[RedditPost]:
-        query = self.db.query(RedditPost)
-        if processed_status == "processed":
-            query = query.filter(RedditPost.is_processed == True)
-        elif processed_status == "unprocessed":
-            query = query.filter(RedditPost.is_processed == False)
-        
-        if start_date:
-            query = query.filter(RedditPost.created_utc >= start_date)
-        if end_date:
-            # Add 1 day to the end date to include the whole day
-            query = query.filter(RedditPost.created_utc < end_date + timedelta(days=1))
-
-        return query.order_by(RedditPost.created_utc.desc()).all()
-    
+    def mark_posts_as_processed(self, post_ids: List[str]) -> int:
+        if not post_ids:
+            return 0
+        updated = self.db.query(RedditPost).filter(RedditPost.post_id.in_(post_ids)).update(
+            {RedditPost.is_processed: True}, synchronize_session=False
+        )
+        self.db.commit()
+        return updated
+
+    def _filtered_posts_query(self, processed_status: str = "all", start_date: Optional[datetime] = None, end_date: Optional[datetime] = None):
+        return self.db.query(RedditPost).filter(*filtered_posts_criteria(processed_status, start_date, end_date))
+
+    def get_filtered_posts(
+        self,
+        processed_status: str = "all",
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        after: Optional[Tuple[datetime, int]] = None,
+        limit: int = settings.PAGE_SIZE_DEFAULT,
+    ) -> Tuple[List[RedditPost], bool]:
+        """
+        Returns one page of posts, newest first, and whether more follow. Pages are keyset-paginated
+        on (created_utc, id): `after` is the key of the last row of the previous page.
+        """
+        query = self._filtered_posts_query(processed_status, start_date, end_date)
+        if after:
+            query = query.filter(tuple_(RedditPost.created_utc, RedditPost.id) < after)
+        rows = query.order_by(RedditPost.created_utc.desc(), RedditPost.id.desc()).limit(limit + 1).all()
+        return rows[:limit], len(rows) > limit
+
+    def iter_filtered_posts(self, processed_status: str = "all", start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> Iterator[RedditPost]:
+        """Streams all matching posts, newest first, through a server-side cursor."""
+        query = self._filtered_posts_query(processed_status, start_date, end_date)
+        return query.order_by(RedditPost.created_utc.desc(), RedditPost.id.desc()).yield_per(1000)
+
     # for development purposes, to reset the processed status of all posts
     def mark_all_as_unprocessed(self) -> int:
         updated = self.db.query(RedditPost).filter(RedditPost.is_processed == True).update(
             {RedditPost.is_processed: False}, synchronize_session=False
         )
+        self.db.query(RedditComment).filter(RedditComment.is_processed == True).update(
+            {RedditComment.is_processed: False}, synchronize_session=False
+        )
+        self.db.commit()
+        return updated
+
+    # --- Comments ---
+
+    def _insert_comments(self, comments: List[RedditCommentCreate]) -> None:
+        # Executemany-style insert: one statement for the whole set, no per-row refresh
+        if comments:
+            self.db.execute(insert(RedditComment), [comment.model_dump() for comment in comments])
+
+    def create_comments(self, comments: List[RedditCommentCreate]) -> int:
+        self._insert_comments(comments)
+        self.db.commit()
+        return len(comments)
+
+    def bulk_upsert_comments(self, comments: List[RedditCommentCreate]) -> int:
+        """Inserts comments in one statement, skipping ones already stored. Returns the number inserted."""
+        if not comments:
+            return 0
+        stmt = pg_insert(RedditComment).values(
+            [comment.model_dump() for comment in comments]
+        ).on_conflict_do_nothing(index_elements=[RedditComment.comment_id]).returning(RedditComment.comment_id)
+        inserted = len(self.db.execute(stmt).all())
+        self.db.commit()
+        return inserted
+
+    def get_comments_page(self, post_id: str, after_id: Optional[int] = None, limit: int = settings.COMMENT_PAGE_SIZE) -> List[RedditComment]:
+        """Returns one page of a thread's comments, keyset-paginated on the surrogate id."""
+        query = self.db.query(RedditComment).filter(RedditComment.post_id == post_id)
+        if after_id is not None:
+            query = query.filter(RedditComment.id > after_id)
+        return query.order_by(RedditComment.id).limit(limit).all()
+
+    def get_comments_for_posts(self, post_ids: List[str]) -> Dict[str, List[RedditComment]]:
+        """Loads the comments of several posts in one query, grouped by post_id."""
+        grouped: Dict[str, List[RedditComment]] = {post_id: [] for post_id in post_ids}
+        if not post_ids:
+            return grouped
+        for page in self.iter_comment_pages(RedditComment.post_id.in_(post_ids)):
+            for comment in page:
+                grouped[comment.post_id].append(comment)
+        return grouped
+
+    def get_comment_counts(self, post_ids: List[str]) -> Dict[str, int]:
+        if not post_ids:
+            return {}
+        rows = self.db.query(RedditComment.post_id, func.count(RedditComment.id)).filter(
+            RedditComment.post_id.in_(post_ids)
+        ).group_by(RedditComment.post_id).all()
+        return {post_id: count for post_id, count in rows}
+
+    def iter_unprocessed_comments(self, page_size: int = settings.COMMENT_PAGE_SIZE) -> Iterator[List[RedditComment]]:
+        return self.iter_comment_pages(RedditComment.is_processed == False, page_size=page_size)
+
+    def iter_comment_pages(self, *criteria, page_size: int = settings.COMMENT_PAGE_SIZE) -> Iterator[List[RedditComment]]:
+        """
+        Yields comments matching the given criteria in pages of `page_size`, using keyset
+        pagination on the id so large threads never have to be loaded at once.
+        """
+        last_id = None
+        while True:
+            query = self.db.query(RedditComment).filter(*criteria)
+            if last_id is not None:
+                query = query.filter(RedditComment.id > last_id)
+            page = query.order_by(RedditComment.id).limit(page_size).all()
+            if not page:
+                return
+            last_id = page[-1].id # Read before yielding: the caller may commit and expire the page
+            yield page
+
+    def mark_comments_as_processed(self, comment_ids: List[str]) -> int:
+        if not comment_ids:
+            return 0
+        updated = self.db.query(RedditComment).filter(RedditComment.comment_id.in_(comment_ids)).update(
+            {RedditComment.is_processed: True}, synchronize_session=False
+        )
         self.db.commit()
         return updated
@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+class RedditCommentBase(BaseModel):
+    comment_id: str
+    post_id: str
+    parent_id: Optional[str] = None
+    author: Optional[str] = None
+    body: str
+    created_utc: datetime
+    is_processed: bool = False
+
+class RedditCommentCreate(RedditCommentBase):
+    pass
+
+class RedditComment(RedditCommentBase):
+    id: int
+    is_processed: bool
+
+    class Config:
+        from_attributes = True
@@ -1,18 +1,18 @@
 from pydantic import BaseModel
 from datetime import datetime
 from typing import List
+from app.data_fetcher.schemas.reddit_comment import RedditCommentCreate
 
 class RedditPostBase(BaseModel):
     post_id: str
     subreddit: str
     title: str
     text: str
-    comments: List[str] = []
     created_utc: datetime
     is_processed: bool = False
 
 class RedditPostCreate(RedditPostBase):
-    pass
+    comments: List[RedditCommentCreate] = []
 
 class RedditPost(RedditPostBase):
     id: int
@@ -0,0 +1,188 @@
+import math
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from app.core.config import settings
+
+# Floor for the estimated arrival rate (about one post a day), so quiet subreddits still get polled
+MIN_RATE_PER_SECOND = 1.0 / 86400
+
+@dataclass
+class SubredditPollState:
+    name: str
+    rate_per_second: float
+    interval_seconds: float
+    listing_limit: int
+    next_poll_at: float = 0.0
+    last_poll_at: Optional[float] = None
+    observations: int = 0
+    last_saturated: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "subreddit": self.name,
+            "posts_per_hour": round(self.rate_per_second * 3600, 3),
+            "interval_seconds": round(self.interval_seconds, 1),
+            "listing_limit": self.listing_limit,
+            "last_poll_at": datetime.fromtimestamp(self.last_poll_at).isoformat() if self.last_poll_at else None,
+            "next_poll_at": datetime.fromtimestamp(self.next_poll_at).isoformat() if self.next_poll_at else None,
+            "observations": self.observations,
+            "last_listing_saturated": self.last_saturated,
+        }
+
+class AdaptivePollScheduler:
+    """
+    Per-subreddit polling scheduler driven by each subreddit's observed post velocity.
+
+    Arrival rates are tracked as an EWMA of posts/second. With Poisson arrivals at rate r_i and a
+    polling interval T_i, an item waits T_i / 2 on average, so the expected lag over all items is
+    proportional to sum(r_i * T_i). Minimising it under the shared request budget sum(1 / T_i) = B
+    gives T_i proportional to 1 / sqrt(r_i): busy subreddits are polled more often, but quiet ones
+    are not starved. Intervals are clamped to [min_interval, max_interval] and the leftover budget
+    is redistributed among the unclamped subreddits (water-filling).
+
+    Each subreddit's listing limit is sized to the posts expected between two polls, with headroom,
+    capped at Reddit's 100-item listing maximum.
+    """
+
+    def __init__(
+        self,
+        subreddits: List[str],
+        request_budget_per_minute: float = settings.STREAM_REQUEST_BUDGET_PER_MINUTE,
+        min_interval: float = settings.STREAM_MIN_POLL_INTERVAL_SECONDS,
+        max_interval: float = settings.STREAM_MAX_POLL_INTERVAL_SECONDS,
+        ewma_alpha: float = 0.3,
+        limit_headroom: float = 2.0,
+        min_limit: int = 10,
+        max_limit: int = settings.STREAM_LISTING_LIMIT,
+    ):
+        self.request_budget_per_second = request_budget_per_minute / 60.0
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.ewma_alpha = ewma_alpha
+        self.limit_headroom = limit_headroom
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self._lock = threading.Lock()
+        self._states: Dict[str, SubredditPollState] = {
+            name: SubredditPollState(name=name, rate_per_second=MIN_RATE_PER_SECOND, interval_seconds=min_interval, listing_limit=max_limit)
+            for name in subreddits
+        }
+        self._rebalance()
+        # Nothing is known yet: poll everything once, immediately, at the maximum listing size
+        for state in self._states.values():
+            state.next_poll_at = 0.0
+            state.listing_limit = max_limit
+
+    def due(self, now: Optional[float] = None) -> List[str]:
+        """Subreddits whose next poll time has passed, most overdue first."""
+        now = time.time() if now is None else now
+        with self._lock:
+            due = [state for state in self._states.values() if state.next_poll_at <= now]
+            return [state.name for state in sorted(due, key=lambda state: state.next_poll_at)]
+
+    def seconds_until_next(self, now: Optional[float] = None) -> float:
+        now = time.time() if now is None else now
+        with self._lock:
+            if not self._states:
+                return self.max_interval
+            return max(0.0, min(state.next_poll_at for state in self._states.values()) - now)
+
+    def listing_limit(self, subreddit: str) -> int:
+        with self._lock:
+            return self._states[subreddit].listing_limit
+
+    def record_poll(self, subreddit: str, created_timestamps: List[float], saturated: bool, now: Optional[float] = None) -> None:
+        """
+        Updates a subreddit's rate estimate from one poll.
+
+        `created_timestamps` are the epoch creation times of the listing items that were read and
+        `saturated` says whether the listing came back full, in which case older new items may have
+        been cut off and the rate is estimated from the span of the listing itself.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            state = self._states[subreddit]
+            observed_rate = self._observed_rate(state, created_timestamps, saturated, now)
+            if observed_rate is not None:
+                if state.observations == 0:
+                    state.rate_per_second = observed_rate
+                else:
+                    state.rate_per_second = self.ewma_alpha * observed_rate + (1 - self.ewma_alpha) * state.rate_per_second
+                state.rate_per_second = max(state.rate_per_second, MIN_RATE_PER_SECOND)
+                state.observations += 1
+            state.last_poll_at = now
+            state.last_saturated = saturated
+            self._rebalance()
+            state.next_poll_at = now + state.interval_seconds
+
+    def defer(self, subreddit: str, now: Optional[float] = None) -> None:
+        """Pushes a subreddit's next poll one interval out, e.g. after a failed poll."""
+        now = time.time() if now is None else now
+        with self._lock:
+            state = self._states[subreddit]
+            state.next_poll_at = now + state.interval_seconds
+
+    def set_request_budget(self, request_budget_per_minute: float) -> None:
+        with self._lock:
+            self.request_budget_per_second = request_budget_per_minute / 60.0
+            self._rebalance()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            states = sorted(self._states.values(), key=lambda state: state.rate_per_second, reverse=True)
+            return {
+                "request_budget_per_minute": round(self.request_budget_per_second * 60, 2),
+                "planned_requests_per_minute": round(sum(60.0 / state.interval_seconds for state in states), 2),
+                "subreddits": [state.to_dict() for state in states],
+            }
+
+    def _observed_rate(self, state: SubredditPollState, created_timestamps: List[float], saturated: bool, now: float) -> Optional[float]:
+        if saturated or state.last_poll_at is None:
+            # Rate over the span the listing covers
+            if len(created_timestamps) < 2:
+                return None
+            span = now - min(created_timestamps)
+            return len(created_timestamps) / span if span > 0 else None
+        window = now - state.last_poll_at
+        if window <= 0:
+            return None
+        arrivals = sum(1 for created in created_timestamps if created > state.last_poll_at)
+        return arrivals / window
+
+    def _rebalance(self) -> None:
+        # Water-filling of the request budget with weights sqrt(rate), honouring interval bounds
+        states = list(self._states.values())
+        remaining_budget = self.request_budget_per_second
+        free = states
+        fixed: Dict[str, float] = {}
+        for _ in range(len(states) + 1):
+            total_weight = sum(math.sqrt(state.rate_per_second) for state in free)
+            if not free or total_weight <= 0:
+                break
+            if remaining_budget <= 0:
+                # The clamped subreddits used up the budget: the rest fall back to the slowest schedule
+                for state in free:
+                    fixed[state.name] = self.max_interval
+                break
+            clamped = []
+            for state in free:
+                share = remaining_budget * math.sqrt(state.rate_per_second) / total_weight
+                interval = 1.0 / share if share > 0 else self.max_interval
+                if interval < self.min_interval or interval > self.max_interval:
+                    clamped.append((state, min(max(interval, self.min_interval), self.max_interval)))
+            if not clamped:
+                for state in free:
+                    fixed[state.name] = total_weight / (remaining_budget * math.sqrt(state.rate_per_second))
+                break
+            for state, interval in clamped:
+                fixed[state.name] = interval
+                remaining_budget -= 1.0 / interval
+            clamped_names = {state.name for state, _ in clamped}
+            free = [state for state in free if state.name not in clamped_names]
+        for state in states:
+            state.interval_seconds = fixed.get(state.name, self.max_interval)
+            expected = state.rate_per_second * state.interval_seconds * self.limit_headroom
+            state.listing_limit = int(min(max(math.ceil(expected), self.min_limit), self.max_limit))
@@ -1,11 +1,17 @@
 import logging
 import sys
+import warnings
 import praw
-from typing import List
+from sqlalchemy import Row
+from typing import Iterator, List, Optional, Tuple
 from datetime import datetime
+from starlette.concurrency import run_in_threadpool
 from app.data_fetcher.repositories.reddit_post import RedditPostRepository
-from app.data_fetcher.schemas.reddit_post import RedditPostCreate
+from app.data_fetcher.repositories.async_reddit_post import AsyncRedditPostRepository
+from app.data_fetcher.schemas.reddit_post import RedditPostCreate, RedditPost as RedditPostSchema
+from app.data_fetcher.schemas.reddit_comment import RedditCommentCreate
 from app.core.config import settings
+from app.core.pagination import Page, decode_cursor, encode_cursor
 
 logging.basicConfig(
     level=logging.INFO,
@@ -17,50 +23,62 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 class RedditService:
-    def __init__(self, repository: RedditPostRepository, reddit_client: praw.Reddit):
+    def __init__(self, repository: RedditPostRepository, reddit_client: praw.Reddit, async_repository: Optional[AsyncRedditPostRepository] = None):
         self.repository = repository
         self.reddit = reddit_client
+        self.async_repository = async_repository
 
-    async def fetch_subreddit_posts(self, subreddit_name: str, limit: int = 10) -> List[RedditPostCreate]:
+    @staticmethod
+    def _to_comment_create(comment, post_id: str) -> RedditCommentCreate:
+        return RedditCommentCreate(
+            comment_id=comment.id,
+            post_id=post_id,
+            parent_id=comment.parent_id,
+            author=comment.author.name if comment.author else None, # Deleted accounts have no author
+            body=comment.body,
+            created_utc=datetime.fromtimestamp(comment.created_utc),
+            is_processed=False
+        )
+
+    @staticmethod
+    def _to_post_create(submission, subreddit_name: str, comments: List[RedditCommentCreate]) -> RedditPostCreate:
+        return RedditPostCreate(
+            post_id=submission.id,
+            subreddit=subreddit_name,
+            title=submission.title,
+            text=submission.selftext,
+            comments=comments, 
+            created_utc=datetime.fromtimestamp(submission.created_utc),
+            is_processed=False
+        )
+
+    async def fetch_subreddit_posts(self, subreddit_name: str, limit: int = 10) -> List[Row]:
         subreddit = self.reddit.subreddit(subreddit_name)
+        submissions = list(subreddit.new(limit=limit))
+
+        # Check which posts already exist in one query, before fetching comments to save API calls
+        existing_post_ids = self.repository.get_existing_post_ids([submission.id for submission in submissions])
         posts_to_store = []
         
-        for submission in subreddit.new(limit=limit):
-            # Check if post already exists before fetching comments to save API calls
-            if self.repository.get_post_by_id(submission.id):
+        for submission in submissions:
+            if submission.id in existing_post_ids:
                 continue # Skip if post already exists
 
             submission.comments.replace_more(limit=None) # Fetch all comments
-            comments_body = [comment.body for comment in submission.comments.list()]
-            
-            post_data = RedditPostCreate(
-                post_id=submission.id,
-                subreddit=subreddit_name,
-                title=submission.title,
-                text=submission.selftext,
-                comments=comments_body, 
-                created_utc=datetime.fromtimestamp(submission.created_utc),
-                is_processed=False
-            )
+            comments = [
+                self._to_comment_create(comment, submission.id)
+                for comment in submission.comments.list()
+            ]
             
             # Storing the Pydantic model
-            posts_to_store.append(post_data)
+            posts_to_store.append(self._to_post_create(submission, subreddit_name, comments))
 
-        # Batch create posts to reduce database calls
-        # if posts_to_store:
-        #     return self.repository.batch_create_posts(posts_to_store)
-        
-        # return []
+        # Write the whole batch in one statement; posts inserted meanwhile by another fetcher are skipped
+        created_posts = self.repository.bulk_upsert_posts(posts_to_store)
+        logger.info(f"Stored {len(created_posts)} new posts from r/{subreddit_name} ({len(posts_to_store) - len(created_posts)} already present)")
+        return created_posts
 
-        # Loop create posts
-        created_db_posts = []
-        for post_to_create in posts_to_store:
-            created_db_post = self.repository.create_post(post_to_create)
-            if created_db_post: # Ensure post was actually created
-                 created_db_posts.append(created_db_post) # Append the DB model instance
-        return created_db_posts # Return list of DB models
-
-    async def fetch_predefined_subreddits_posts(self) -> List[RedditPostCreate]:
+    async def fetch_predefined_subreddits_posts(self) -> List[Row]:
         """Fetches posts from a predefined list of subreddits specified in config."""
         logger.info(f"Fetching posts from predefined subreddits")
         all_fetched_posts = []
@@ -70,17 +88,62 @@ class RedditService:
         logger.info(f"Fetched {len(all_fetched_posts)} posts from predefined subreddits")
         return all_fetched_posts
 
-    def get_all_posts(self):
-        return self.repository.get_all_posts()
+    def get_all_posts(self) -> List[RedditPostSchema]:
+        warnings.warn("get_all_posts loads every post; use get_filtered_posts or iter_filtered_posts", DeprecationWarning, stacklevel=2)
+        return list(self.iter_filtered_posts("all"))
 
-    def get_unprocessed_posts(self):
-        return self.repository.get_unprocessed_posts()
+    def get_unprocessed_posts(self) -> List[RedditPostSchema]:
+        warnings.warn("get_unprocessed_posts loads every post; use get_filtered_posts or iter_filtered_posts", DeprecationWarning, stacklevel=2)
+        return list(self.iter_filtered_posts("unprocessed"))
 
     def mark_post_as_processed(self, post_id: str):
         return self.repository.mark_post_as_processed(post_id)
 
-    def get_filtered_posts(self, processed_status, start_date=None, end_date=None) -> List[RedditPostCreate]:
-        logger.info(f"Fetching posts with processed status: {processed_status}, start date: {start_date}, end date: {end_date}")
+    def get_post_comments(self, post_id: str, after_id: Optional[int] = None, limit: int = settings.COMMENT_PAGE_SIZE):
+        return self.repository.get_comments_page(post_id, after_id=after_id, limit=limit)
+
+    def get_comments_for_posts(self, post_ids: List[str]):
+        return self.repository.get_comments_for_posts(post_ids)
+
+    def get_filtered_posts(self, processed_status, start_date=None, end_date=None, cursor: Optional[str] = None, limit: int = settings.PAGE_SIZE_DEFAULT) -> Page[RedditPostSchema]:
+        logger.info(f"Fetching posts with processed status: {processed_status}, start date: {start_date}, end date: {end_date}, cursor: {cursor}, limit: {limit}")
         start_date_obj = datetime.strptime(start_date, "%Y-%m-%d") if start_date else None
         end_date_obj = datetime.strptime(end_date, "%Y-%m-%d") if end_date else None
-        return self.repository.get_filtered_posts(processed_status, start_date=start_date_obj, end_date=end_date_obj)
+        posts, has_more = self.repository.get_filtered_posts(
+            processed_status, start_date=start_date_obj, end_date=end_date_obj, after=decode_cursor(cursor), limit=limit
+        )
+        return self._to_page(posts, has_more, limit)
+
+    async def get_filtered_posts_async(self, processed_status, start_date=None, end_date=None, cursor: Optional[str] = None, limit: int = settings.PAGE_SIZE_DEFAULT) -> Page[RedditPostSchema]:
+        """Same as get_filtered_posts, without blocking the event loop."""
+        if self.async_repository is None:
+            return await run_in_threadpool(self.get_filtered_posts, processed_status, start_date, end_date, cursor, limit)
+        logger.info(f"Fetching posts (async) with processed status: {processed_status}, start date: {start_date}, end date: {end_date}, cursor: {cursor}, limit: {limit}")
+        start_date_obj = datetime.strptime(start_date, "%Y-%m-%d") if start_date else None
+        end_date_obj = datetime.strptime(end_date, "%Y-%m-%d") if end_date else None
+        posts, has_more = await self.async_repository.get_filtered_posts(
+            processed_status, start_date=start_date_obj, end_date=end_date_obj, after=decode_cursor(cursor), limit=limit
+        )
+        return self._to_page(posts, has_more, limit)
+
+    async def get_comments_for_posts_async(self, post_ids: List[str]):
+        if self.async_repository is None:
+            return await run_in_threadpool(self.get_comments_for_posts, post_ids)
+        return await self.async_repository.get_comments_for_posts(post_ids)
+
+    @staticmethod
+    def _to_page(posts, has_more: bool, limit: int) -> Page[RedditPostSchema]:
+        next_cursor = encode_cursor(posts[-1].created_utc, posts[-1].id) if has_more else None
+        return Page[RedditPostSchema](items=[RedditPostSchema.model_validate(post) for post in posts], next_cursor=next_cursor, limit=limit)
+
+    @staticmethod
+    def parse_date_range(start_date: Optional[str], end_date: Optional[str]) -> Tuple[Optional[datetime], Optional[datetime]]:
+        """Parses YYYY-MM-DD bounds; raises ValueError for malformed dates."""
+        start_date_obj = datetime.strptime(start_date, "%Y-%m-%d") if start_date else None
+        end_date_obj = datetime.strptime(end_date, "%Y-%m-%d") if end_date else None
+        return start_date_obj, end_date_obj
+
+    def iter_filtered_posts(self, processed_status, start_date=None, end_date=None) -> Iterator[RedditPostSchema]:
+        start_date_obj, end_date_obj = self.parse_date_range(start_date, end_date)
+        for post in self.repository.iter_filtered_posts(processed_status, start_date=start_date_obj, end_date=end_date_obj):
+            yield RedditPostSchema.model_validate(post)
@@ -0,0 +1,262 @@
+import logging
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set
+import praw
+from sqlalchemy.orm import Session
+from app.core.config import settings, get_reddit_client
+from app.core.db import SessionLocal
+from app.data_fetcher.repositories.reddit_post import RedditPostRepository
+from app.data_fetcher.repositories.ingestion_checkpoint import IngestionCheckpointRepository
+from app.data_fetcher.services.reddit_service import RedditService
+from app.data_fetcher.services.poll_scheduler import AdaptivePollScheduler
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(name)s - %(message)s",
+    handlers=[
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger(__name__)
+
+class StreamIngestionService:
+    """
+    Long-running ingestion mode. Polls the newest submissions of every subreddit and the newest
+    comments across all of them, and writes each poll to raw_posts/raw_comments as one micro-batch.
+    Subreddits are polled on their own schedule by an `AdaptivePollScheduler`, which sizes each
+    subreddit's interval and listing limit to its post velocity; comments are polled every
+    `poll_interval` seconds, paging back to the checkpoint (up to `comments_max_items`).
+
+    PRAW's `stream` helpers only de-duplicate against an in-memory window and always start from the
+    newest items, so a restart either re-reads or silently skips data. Polling `new()`/`comments()`
+    against a checkpoint persisted in `ingestion_checkpoints` gives the same continuous feed and lets
+    a restarted process resume where it stopped. Inserts use ON CONFLICT DO NOTHING, so re-reading
+    the checkpoint boundary (or racing the `/fetcher/fetch` batch endpoint) is harmless.
+    """
+
+    def __init__(
+        self,
+        reddit_client_factory: Callable[[], praw.Reddit] = get_reddit_client,
+        session_factory: Callable[[], Session] = SessionLocal,
+        subreddits: Optional[List[str]] = None,
+        poll_interval: float = settings.STREAM_POLL_INTERVAL_SECONDS,
+        listing_limit: int = settings.STREAM_LISTING_LIMIT,
+        comments_max_items: int = settings.STREAM_COMMENTS_MAX_ITEMS,
+    ):
+        self.reddit_client_factory = reddit_client_factory
+        self.session_factory = session_factory
+        self.subreddits = subreddits or list(settings.SUBREDDITS_TO_FETCH)
+        self.poll_interval = poll_interval
+        self.listing_limit = listing_limit
+        self.comments_max_items = comments_max_items
+        self.reddit: Optional[praw.Reddit] = None
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stream_stats: Dict[str, Dict[str, Any]] = {}
+        self._stats_lock = threading.Lock() # The polling thread updates the stats while the API reads them
+        self._next_comments_poll_at = 0.0
+        # The comments poll gets a fixed share of the request budget; subreddits split the rest
+        comments_requests_per_minute = 60.0 / poll_interval
+        self.scheduler = AdaptivePollScheduler(
+            self.subreddits,
+            request_budget_per_minute=max(settings.STREAM_REQUEST_BUDGET_PER_MINUTE - comments_requests_per_minute, 1.0),
+            max_limit=listing_limit,
+        )
+
+    @property
+    def comments_stream_name(self) -> str:
+        return f"comments:{'+'.join(self.subreddits)}"
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> bool:
+        if self.is_running:
+            return False
+        if self.reddit is None:
+            self.reddit = self.reddit_client_factory()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self.run_forever, name="stream-ingestion", daemon=True)
+        self._thread.start()
+        logger.info(f"Stream ingestion started for {len(self.subreddits)} subreddits")
+        return True
+
+    def stop(self, timeout: float = 30.0) -> bool:
+        if not self.is_running:
+            return False
+        self._stop_event.set()
+        self._thread.join(timeout=timeout)
+        logger.info("Stream ingestion stopped")
+        return True
+
+    def run_forever(self) -> None:
+        while not self._stop_event.is_set():
+            now = time.time()
+            include_comments = now >= self._next_comments_poll_at
+            try:
+                self.poll_once(self.scheduler.due(now), include_comments=include_comments)
+            except Exception as e:
+                # Keep the loop alive: a Reddit or DB hiccup should only cost one cycle
+                logger.error(f"Stream ingestion cycle failed: {e}", exc_info=True)
+            if include_comments:
+                self._next_comments_poll_at = now + self.poll_interval
+            wait = min(self.scheduler.seconds_until_next(), max(0.0, self._next_comments_poll_at - time.time()))
+            self._stop_event.wait(wait)
+
+    def poll_once(self, subreddits: Optional[List[str]] = None, include_comments: bool = True) -> Dict[str, int]:
+        """
+        Runs one ingestion cycle and returns the number of new items per stream. Polls the given
+        subreddits (all of them by default) and, if `include_comments`, the comments stream.
+        """
+        if self.reddit is None:
+            self.reddit = self.reddit_client_factory()
+        subreddits = self.subreddits if subreddits is None else subreddits
+        ingested: Dict[str, int] = {}
+        db = self.session_factory()
+        try:
+            post_repository = RedditPostRepository(db)
+            checkpoint_repository = IngestionCheckpointRepository(db)
+            # Posts first, so comments polled in the same cycle can attach to them
+            for subreddit_name in subreddits:
+                stream_name = f"submissions:{subreddit_name}"
+                ingested[stream_name] = self._run_stream(
+                    stream_name,
+                    lambda since: self._ingest_submissions(subreddit_name, since, post_repository),
+                    checkpoint_repository,
+                )
+            if include_comments:
+                ingested[self.comments_stream_name] = self._run_stream(
+                    self.comments_stream_name,
+                    lambda since: self._ingest_comments(since, post_repository),
+                    checkpoint_repository,
+                )
+        finally:
+            db.close()
+        return ingested
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "running": self.is_running,
+            "subreddits": self.subreddits,
+            "comments_poll_interval_seconds": self.poll_interval,
+            "streams": self._stats_snapshot(),
+        }
+
+    def schedule(self) -> Dict[str, Any]:
+        return self.scheduler.snapshot()
+
+    def _run_stream(self, stream_name: str, ingest: Callable, checkpoint_repository: IngestionCheckpointRepository) -> int:
+        checkpoint = checkpoint_repository.get_checkpoint(stream_name)
+        since = checkpoint.last_created_utc if checkpoint else None
+        try:
+            inserted, newest = ingest(since)
+        except Exception as e:
+            checkpoint_repository.db.rollback()
+            self._update_stats(stream_name, last_error=str(e))
+            logger.error(f"Stream '{stream_name}' failed: {e}", exc_info=True)
+            return 0
+        if newest is not None:
+            # Checkpoint only after the batch is committed: at-least-once, duplicates are absorbed on insert
+            checkpoint_repository.save_checkpoint(stream_name, datetime.fromtimestamp(newest.created_utc), newest.id)
+        self._update_stats(
+            stream_name,
+            inserted=inserted,
+            last_poll_at=datetime.now().isoformat(),
+            last_ingested=inserted,
+            checkpoint=datetime.fromtimestamp(newest.created_utc).isoformat() if newest is not None else (since.isoformat() if since else None),
+            last_error=None,
+        )
+        return inserted
+
+    def _update_stats(self, stream_name: str, inserted: int = 0, **fields) -> None:
+        with self._stats_lock:
+            stats = self._stream_stats.setdefault(stream_name, {"total_ingested": 0, "last_error": None})
+            stats.update(fields, total_ingested=stats["total_ingested"] + inserted)
+
+    def _stats_snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._stats_lock:
+            return {stream_name: dict(stats) for stream_name, stats in self._stream_stats.items()}
+
+    def _take_since(self, listing, since: Optional[datetime], stream_name: str, limit: int):
+        """
+        Collects listing items (newest first) down to the checkpoint, inclusive. Also returns whether
+        the listing was saturated, i.e. came back full without reaching the checkpoint.
+        """
+        items = []
+        for item in listing:
+            if since is not None and datetime.fromtimestamp(item.created_utc) < since:
+                return items, False
+            items.append(item)
+        saturated = len(items) >= limit
+        if since is not None and saturated:
+            logger.warning(f"Stream '{stream_name}' filled a whole listing of {len(items)} items; some items may have been missed")
+        return items, saturated
+
+    def _ingest_submissions(self, subreddit_name: str, since: Optional[datetime], post_repository: RedditPostRepository):
+        limit = self.scheduler.listing_limit(subreddit_name)
+        try:
+            submissions, saturated = self._take_since(self.reddit.subreddit(subreddit_name).new(limit=limit), since, subreddit_name, limit)
+        except Exception:
+            self.scheduler.defer(subreddit_name) # Don't hammer a failing subreddit until its next slot
+            raise
+        self.scheduler.record_poll(subreddit_name, [submission.created_utc for submission in submissions], saturated)
+        if not submissions:
+            return 0, None
+        # Comments arrive through the comments stream, so posts are stored without them
+        posts = [RedditService._to_post_create(submission, subreddit_name, []) for submission in submissions]
+        created = post_repository.bulk_upsert_posts(posts)
+        return len(created), submissions[0]
+
+    def _ingest_comments(self, since: Optional[datetime], post_repository: RedditPostRepository):
+        multireddit = self.reddit.subreddit("+".join(self.subreddits))
+        # The listing is read lazily, 100 per request, so with a checkpoint it is paged only until it is reached;
+        # a busy multireddit can post more than one page of comments between two polls
+        limit = self.listing_limit if since is None else self.comments_max_items
+        comments, _ = self._take_since(multireddit.comments(limit=limit), since, self.comments_stream_name, limit)
+        if not comments:
+            return 0, None
+        # link_id is the "t3_"-prefixed fullname of the submission the comment belongs to
+        post_ids = {comment.link_id.split("_", 1)[1] for comment in comments}
+        known_post_ids = post_repository.get_existing_post_ids(list(post_ids))
+        missing_post_ids = post_ids - known_post_ids
+        if missing_post_ids:
+            # The streams are polled independently, so a comment can arrive before its submission
+            known_post_ids |= self._ingest_missing_submissions(missing_post_ids, post_repository)
+        to_store = [
+            RedditService._to_comment_create(comment, comment.link_id.split("_", 1)[1])
+            for comment in comments
+            if comment.link_id.split("_", 1)[1] in known_post_ids
+        ]
+        if len(to_store) < len(comments):
+            logger.warning(f"Dropped {len(comments) - len(to_store)} comments whose submission could not be fetched")
+        inserted = post_repository.bulk_upsert_comments(to_store)
+        return inserted, comments[0]
+
+    def _ingest_missing_submissions(self, post_ids: Set[str], post_repository: RedditPostRepository) -> Set[str]:
+        """
+        Fetches and stores the submissions of comments that arrived before them, 100 fullnames per
+        request. Returns the ids of the posts now stored; removed or unreachable submissions are left out.
+        """
+        submissions = list(self.reddit.info(fullnames=[f"t3_{post_id}" for post_id in post_ids]))
+        configured_names = {name.lower(): name for name in self.subreddits}
+        posts = [
+            RedditService._to_post_create(submission, configured_names.get(submission.subreddit.display_name.lower(), submission.subreddit.display_name), [])
+            for submission in submissions
+            if submission.id in post_ids
+        ]
+        created = post_repository.bulk_upsert_posts(posts)
+        logger.info(f"Fetched {len(posts)} of {len(post_ids)} submissions missing for new comments ({len(created)} stored)")
+        return {post.post_id for post in posts}
+
+if __name__ == "__main__":
+    # Standalone long-running mode: python -m app.data_fetcher.services.stream_ingestion_service
+    service = StreamIngestionService()
+    service.reddit = service.reddit_client_factory()
+    try:
+        service.run_forever()
+    except KeyboardInterrupt:
+        logger.info("Stream ingestion interrupted")
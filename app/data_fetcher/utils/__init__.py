@@ -0,0 +1 @@
+# Utilities for data_fetcher
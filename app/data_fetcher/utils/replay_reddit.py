@@ -0,0 +1,299 @@
+import json
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional
+
+# Offline stand-in for the parts of PRAW the data fetcher uses: `reddit.subreddit(name)`,
+# `subreddit.new(limit=...)`, `subreddit.comments(limit=...)` (including "a+b" multireddits),
+# `reddit.info(fullnames=...)`, `submission.subreddit`, `submission.comments.replace_more(limit=...)`
+# and `submission.comments.list()`.
+# It replays recorded or synthetic submission/comment trees, charges every simulated Reddit request
+# against a token-bucket rate limit with configurable latency, and counts the requests it served.
+
+LISTING_PAGE_SIZE = 100 # Reddit returns at most 100 items per listing request
+INITIAL_COMMENT_BATCH = 200 # Comments returned with the first load of a submission
+MORE_COMMENTS_BATCH = 100 # Comments returned by each /api/morechildren call
+
+@dataclass
+class ReplayRedditor:
+    name: str
+
+@dataclass
+class ReplayComment:
+    id: str
+    link_id: str
+    parent_id: str
+    author: Optional[ReplayRedditor]
+    body: str
+    created_utc: float
+
+@dataclass
+class ReplayMoreComments:
+    count: int
+
+class ReplayCommentForest:
+    def __init__(self, reddit: "ReplayReddit", comments: List[ReplayComment]):
+        self._reddit = reddit
+        self._loaded = comments[:INITIAL_COMMENT_BATCH]
+        self._pending = comments[INITIAL_COMMENT_BATCH:]
+
+    def replace_more(self, limit: Optional[int] = 32, threshold: int = 0) -> List[ReplayMoreComments]:
+        """Expands up to `limit` "load more" placeholders (all of them for None), one request each."""
+        batches = math.ceil(len(self._pending) / MORE_COMMENTS_BATCH)
+        to_expand = batches if limit is None else min(limit, batches)
+        for _ in range(to_expand):
+            self._reddit._request()
+            self._loaded.extend(self._pending[:MORE_COMMENTS_BATCH])
+            self._pending = self._pending[MORE_COMMENTS_BATCH:]
+        return [ReplayMoreComments(count=len(self._pending))] if self._pending else []
+
+    def list(self) -> List[ReplayComment]:
+        return list(self._loaded)
+
+class ReplaySubmission:
+    def __init__(self, reddit: "ReplayReddit", data: Dict[str, Any], subreddit_name: str):
+        self._reddit = reddit
+        self._data = data
+        self.subreddit = ReplaySubreddit(reddit, subreddit_name)
+        self.id = data["id"]
+        self.title = data["title"]
+        self.selftext = data.get("selftext", "")
+        self.created_utc = data["created_utc"]
+        self.author = ReplayRedditor(data["author"]) if data.get("author") else None
+        self._comments: Optional[ReplayCommentForest] = None
+
+    @property
+    def comments(self) -> ReplayCommentForest:
+        # Like PRAW, the comment forest is fetched lazily on first access
+        if self._comments is None:
+            self._reddit._request()
+            self._comments = ReplayCommentForest(self._reddit, self._reddit._visible_comments(self._data))
+        return self._comments
+
+class ReplaySubreddit:
+    def __init__(self, reddit: "ReplayReddit", display_name: str):
+        self._reddit = reddit
+        self.display_name = display_name
+        self._names = display_name.split("+")
+
+    def new(self, limit: Optional[int] = 100, params: Optional[Dict[str, Any]] = None) -> Iterator[ReplaySubmission]:
+        submissions = sorted(
+            (ReplaySubmission(self._reddit, post, name) for name in self._names for post in self._reddit._visible_posts(name)),
+            key=lambda submission: submission.created_utc, reverse=True
+        )
+        return self._paginate(submissions, limit)
+
+    def comments(self, limit: Optional[int] = 100) -> Iterator[ReplayComment]:
+        comments = sorted(
+            (comment for name in self._names for post in self._reddit._visible_posts(name) for comment in self._reddit._visible_comments(post)),
+            key=lambda comment: comment.created_utc, reverse=True
+        )
+        return self._paginate(comments, limit)
+
+    def _paginate(self, items: List[Any], limit: Optional[int]) -> Iterator[Any]:
+        # PRAW listings are generators that issue one request per 100-item page as they are consumed
+        items = items if limit is None else items[:limit]
+        for start in range(0, max(len(items), 1), LISTING_PAGE_SIZE):
+            self._reddit._request()
+            yield from items[start:start + LISTING_PAGE_SIZE]
+
+class ReplayReddit:
+    """
+    Drop-in replacement for `praw.Reddit` in the data fetcher, backed by an in-memory dataset of the
+    form {"subreddits": {name: [post, ...]}} where each post has id, title, selftext, author,
+    created_utc and a flat "comments" list (id, parent_id, author, body, created_utc).
+
+    Items whose created_utc lies in the future are hidden until the wall clock reaches them, so a
+    synthetic dataset generated into the future plays back as live traffic for the stream mode.
+    Every simulated request sleeps `latency_seconds` and takes a token from a bucket refilled at
+    `requests_per_minute` (waiting when it is empty, as PRAW does when rate limited).
+    """
+
+    def __init__(self, dataset: Dict[str, Any], latency_seconds: float = 0.0, requests_per_minute: Optional[float] = None, burst: int = 10):
+        self.dataset = dataset
+        self.latency_seconds = latency_seconds
+        self.requests_per_minute = requests_per_minute
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+        self.api_calls = 0
+        self.throttled_seconds = 0.0
+        self._comment_cache: Dict[str, List[ReplayComment]] = {}
+
+    @classmethod
+    def from_file(cls, path: str, rebase: bool = True, **kwargs) -> "ReplayReddit":
+        """Loads a recorded dataset. With `rebase`, timestamps are shifted so the newest item is "now"."""
+        with open(path, encoding="utf-8") as f:
+            dataset = json.load(f)
+        if rebase:
+            dataset = rebase_dataset(dataset, time.time())
+        return cls(dataset, **kwargs)
+
+    def subreddit(self, display_name: str) -> ReplaySubreddit:
+        return ReplaySubreddit(self, display_name)
+
+    def info(self, fullnames: List[str]) -> Iterator[ReplaySubmission]:
+        """Looks submissions up by "t3_" fullname, one request per 100 fullnames; unknown ones are skipped."""
+        posts = {
+            post["id"]: (name, post)
+            for name in self.dataset["subreddits"] for post in self._visible_posts(name)
+        }
+        fullnames = list(fullnames)
+        for start in range(0, len(fullnames), LISTING_PAGE_SIZE):
+            self._request()
+            for fullname in fullnames[start:start + LISTING_PAGE_SIZE]:
+                found = posts.get(fullname.split("_", 1)[1])
+                if found is not None:
+                    yield ReplaySubmission(self, found[1], found[0])
+
+    def stats(self) -> Dict[str, Any]:
+        return {"api_calls": self.api_calls, "throttled_seconds": round(self.throttled_seconds, 3)}
+
+    def reset_stats(self) -> None:
+        self.api_calls = 0
+        self.throttled_seconds = 0.0
+
+    def _request(self) -> None:
+        if self.requests_per_minute:
+            with self._lock:
+                rate = self.requests_per_minute / 60.0
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * rate)
+                self._last_refill = now
+                wait = 0.0 if self._tokens >= 1 else (1 - self._tokens) / rate
+                self._tokens -= 1
+            if wait:
+                self.throttled_seconds += wait
+                time.sleep(wait)
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        self.api_calls += 1
+
+    def _visible_posts(self, subreddit: str) -> List[Dict[str, Any]]:
+        now = time.time()
+        return [post for post in self.dataset["subreddits"].get(subreddit, []) if post["created_utc"] <= now]
+
+    def _visible_comments(self, post: Dict[str, Any]) -> List[ReplayComment]:
+        if post["id"] not in self._comment_cache:
+            self._comment_cache[post["id"]] = [
+                ReplayComment(
+                    id=comment["id"],
+                    link_id=f"t3_{post['id']}",
+                    parent_id=comment["parent_id"],
+                    author=ReplayRedditor(comment["author"]) if comment.get("author") else None,
+                    body=comment["body"],
+                    created_utc=comment["created_utc"],
+                )
+                for comment in post.get("comments", [])
+            ]
+        now = time.time()
+        return [comment for comment in self._comment_cache[post["id"]] if comment.created_utc <= now]
+
+def rebase_dataset(dataset: Dict[str, Any], newest_at: float) -> Dict[str, Any]:
+    timestamps = [
+        ts for posts in dataset["subreddits"].values() for post in posts
+        for ts in [post["created_utc"], *(comment["created_utc"] for comment in post.get("comments", []))]
+    ]
+    if not timestamps:
+        return dataset
+    shift = newest_at - max(timestamps)
+    return {"subreddits": {
+        name: [
+            {**post, "created_utc": post["created_utc"] + shift,
+             "comments": [{**comment, "created_utc": comment["created_utc"] + shift} for comment in post.get("comments", [])]}
+            for post in posts
+        ]
+        for name, posts in dataset["subreddits"].items()
+    }}
+
+def generate_synthetic_dataset(
+    posts_per_hour: Dict[str, float],
+    backlog_hours: float = 24.0,
+    future_hours: float = 0.0,
+    mean_comments_per_post: float = 40.0,
+    reply_probability: float = 0.6,
+    seed: int = 42,
+    now: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Generates Poisson post arrivals per subreddit over [now - backlog_hours, now + future_hours], each
+    with a geometric-sized comment tree whose comments reply to the post or to an earlier comment.
+    """
+    rng = random.Random(seed)
+    now = time.time() if now is None else now
+    start, end = now - backlog_hours * 3600, now + future_hours * 3600
+    words = ("policy vote debate reform senate law economy war peace rights tax opinion vote media "
+             "freedom election protest climate budget court speech power people country world").split()
+    subreddits: Dict[str, List[Dict[str, Any]]] = {}
+    next_id = 0
+
+    def new_id() -> str:
+        nonlocal next_id
+        next_id += 1
+        return format(next_id, "x").rjust(7, "0")
+
+    def sentence(n: int) -> str:
+        return " ".join(rng.choice(words) for _ in range(n)).capitalize()
+
+    for name, rate in posts_per_hour.items():
+        posts, t = [], start
+        while rate > 0:
+            t += rng.expovariate(rate / 3600)
+            if t > end:
+                break
+            post_id = new_id()
+            n_comments = int(rng.expovariate(1 / mean_comments_per_post)) if mean_comments_per_post > 0 else 0
+            comments, comment_time = [], t
+            for _ in range(n_comments):
+                comment_time += rng.expovariate(1 / 120)
+                parent = f"t1_{rng.choice(comments)['id']}" if comments and rng.random() < reply_probability else f"t3_{post_id}"
+                comments.append({
+                    "id": new_id(),
+                    "parent_id": parent,
+                    "author": f"user_{rng.randrange(5000)}" if rng.random() > 0.05 else None,
+                    "body": sentence(rng.randint(3, 60)),
+                    "created_utc": comment_time,
+                })
+            posts.append({
+                "id": post_id,
+                "title": sentence(rng.randint(4, 14)),
+                "selftext": sentence(rng.randint(0, 120)),
+                "author": f"user_{rng.randrange(5000)}",
+                "created_utc": t,
+                "comments": comments,
+            })
+        subreddits[name] = posts
+    return {"subreddits": subreddits}
+
+def record_dataset(reddit, subreddits: List[str], limit: int, path: str) -> Dict[str, Any]:
+    """Records the newest `limit` submissions of each subreddit, with full comment trees, from a live PRAW client."""
+    dataset: Dict[str, Any] = {"subreddits": {}}
+    for name in subreddits:
+        posts = []
+        for submission in reddit.subreddit(name).new(limit=limit):
+            submission.comments.replace_more(limit=None)
+            posts.append({
+                "id": submission.id,
+                "title": submission.title,
+                "selftext": submission.selftext,
+                "author": submission.author.name if submission.author else None,
+                "created_utc": submission.created_utc,
+                "comments": [
+                    {
+                        "id": comment.id,
+                        "parent_id": comment.parent_id,
+                        "author": comment.author.name if comment.author else None,
+                        "body": comment.body,
+                        "created_utc": comment.created_utc,
+                    }
+                    for comment in submission.comments.list()
+                ],
+            })
+        dataset["subreddits"][name] = posts
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(dataset, f)
+    return dataset
@@ -1,8 +1,9 @@
 import sys
 from fastapi import APIRouter, Depends, HTTPException, Request, Query
-from fastapi.responses import HTMLResponse 
+from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 import logging
 
@@ -11,7 +12,9 @@ from app.data_fetcher.services.reddit_service import RedditService
 from app.inference.services.inference_service import InferenceService
 from app.inference.schemas.prediction import Prediction as PredictionSchema
 from app.inference.repositories.prediction_repository import PredictionRepository
-from app.core.db import get_db
+from app.core.db import get_db, get_async_db, SessionLocal
+from app.core.pagination import Page, stream_json_array
+from app.core.config import settings
 
 router = APIRouter()
 logging.basicConfig(
@@ -25,8 +28,13 @@ logger = logging.getLogger(__name__)
 
 templates = Jinja2Templates(directory="app/inference/templates")
 
-def get_inference_service(request: Request, db: Session = Depends(get_db), reddit_service: RedditService = Depends(get_reddit_service)) -> InferenceService:
-    return InferenceService(db=db, request=request, reddit_service=reddit_service)
+def get_inference_service(
+    request: Request,
+    db: Session = Depends(get_db),
+    async_db: Optional[AsyncSession] = Depends(get_async_db),
+    reddit_service: RedditService = Depends(get_reddit_service)
+) -> InferenceService:
+    return InferenceService(db=db, request=request, reddit_service=reddit_service, async_db=async_db)
 
 def get_prediction_repository(db: Session = Depends(get_db)) -> PredictionRepository:
     return PredictionRepository(db)
@@ -47,6 +55,39 @@ async def process_posts_and_predict(
         logger.error(f"Error during post processing and prediction: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+def _stream_predictions(filters):
+    # Streaming outlives the request's dependencies, so the generator owns its own session
+    db = SessionLocal()
+    try:
+        predictions = PredictionRepository(db).iter_filtered_predictions(**filters)
+        yield from stream_json_array(PredictionSchema.model_validate(p) for p in predictions)
+    finally:
+        db.close()
+
+@router.get("/predictions", response_model=Page[PredictionSchema])
+def get_predictions(
+    label: Optional[str] = Query(None),
+    confidence_min: Optional[float] = Query(None),
+    confidence_max: Optional[float] = Query(None),
+    start_date: Optional[str] = Query(None),
+    end_date: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    stream: bool = Query(False, description="Stream every matching prediction as one JSON array instead of a page"),
+    service: InferenceService = Depends(get_inference_service),
+):
+    """
+    Lists predictions, newest first, one keyset page at a time.
+    """
+    try:
+        if stream:
+            # Filters are parsed before streaming starts, so bad input is still a 400
+            filters = InferenceService._parse_prediction_filters(label, confidence_min, confidence_max, start_date, end_date)
+            return StreamingResponse(_stream_predictions(filters), media_type="application/json")
+        return service.get_filtered_predictions(label, confidence_min, confidence_max, start_date, end_date, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/predictions/{post_id}", response_model=List[PredictionSchema])
 def get_predictions_for_post_route(
     post_id: str,
@@ -73,24 +114,32 @@ async def view_predictions_ui(
     confidence_max: Optional[float] = Query(None),
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
     service: InferenceService = Depends(get_inference_service),
 ):
     """
-    UI endpoint to view predictions with filtering.
+    UI endpoint to view predictions with filtering, one page at a time.
     """
 
-    preidctions = service.get_filtered_predictions(
-        label=label_filter,
-        confidence_min=confidence_min,
-        confidence_max=confidence_max,
-        start_date=start_date,
-        end_date=end_date
-    )
+    try:
+        page = await service.get_filtered_predictions_async(
+            label=label_filter,
+            confidence_min=confidence_min,
+            confidence_max=confidence_max,
+            start_date=start_date,
+            end_date=end_date,
+            cursor=cursor,
+            limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return templates.TemplateResponse(
         "predictions_view.html",
         {
             "request": request,
-            "predictions": preidctions,
+            "predictions": page.items,
+            "next_cursor": page.next_cursor,
             "label_filter": label_filter,
             "confidence_min": confidence_min,
             "confidence_max": confidence_max,
@@ -0,0 +1,9 @@
+from sqlalchemy import Column, BigInteger, String, Date
+from app.core.db import Base
+
+class EmbeddingReservoir(Base):
+    __tablename__ = "embedding_reservoirs"
+
+    model_version = Column(String, primary_key=True)
+    day = Column(Date, primary_key=True) # UTC day
+    seen = Column(BigInteger, nullable=False, default=0) # Texts offered to the reservoir so far
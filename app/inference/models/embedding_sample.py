@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, Date, DateTime, LargeBinary
+from sqlalchemy.sql import func
+from app.core.db import Base
+
+class EmbeddingSample(Base):
+    __tablename__ = "embedding_samples"
+
+    model_version = Column(String, primary_key=True)
+    day = Column(Date, primary_key=True) # UTC day of the reservoir
+    slot = Column(Integer, primary_key=True) # 0 .. EMBEDDING_RESERVOIR_SIZE - 1
+    post_id = Column(String, nullable=False)
+    comment_id = Column(String, nullable=True)
+    text_type = Column(String, nullable=False)
+    embedding = Column(LargeBinary, nullable=False) # float16 CLS embedding, raw bytes
+    sampled_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
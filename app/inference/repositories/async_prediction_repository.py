@@ -0,0 +1,30 @@
+from datetime import datetime
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Tuple
+from app.inference.models.prediction import Prediction
+from app.inference.repositories.prediction_repository import filtered_predictions_criteria
+from app.core.config import settings
+
+class AsyncPredictionRepository:
+    """Read-only counterpart of PredictionRepository for the async endpoints."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_filtered_predictions(
+        self,
+        label: Optional[str] = None,
+        confidence_min: Optional[float] = None,
+        confidence_max: Optional[float] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        after: Optional[Tuple[datetime, int]] = None,
+        limit: int = settings.PAGE_SIZE_DEFAULT,
+    ) -> Tuple[List[Prediction], bool]:
+        stmt = select(Prediction).where(*filtered_predictions_criteria(label, confidence_min, confidence_max, start_date, end_date))
+        if after:
+            stmt = stmt.where(tuple_(Prediction.prediction_timestamp, Prediction.id) < after)
+        stmt = stmt.order_by(Prediction.prediction_timestamp.desc(), Prediction.id.desc()).limit(limit + 1)
+        rows = (await self.db.scalars(stmt)).all()
+        return list(rows[:limit]), len(rows) > limit
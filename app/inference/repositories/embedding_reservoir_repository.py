@@ -0,0 +1,37 @@
+from datetime import date
+from typing import Dict
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.inference.models.embedding_reservoir import EmbeddingReservoir
+from app.inference.models.embedding_sample import EmbeddingSample
+
+class EmbeddingReservoirRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_seen(self, model_version: str, day: date) -> int:
+        seen = self.db.query(EmbeddingReservoir.seen).filter(
+            EmbeddingReservoir.model_version == model_version,
+            EmbeddingReservoir.day == day
+        ).scalar()
+        return seen or 0
+
+    def save_samples(self, model_version: str, day: date, offered: int, replaced: Dict[int, dict]) -> None:
+        """Writes the replaced slots and advances the reservoir's counter by `offered`, in one transaction."""
+        if replaced:
+            stmt = pg_insert(EmbeddingSample).values([
+                {"model_version": model_version, "day": day, "slot": slot, **sample} for slot, sample in replaced.items()
+            ])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[EmbeddingSample.model_version, EmbeddingSample.day, EmbeddingSample.slot],
+                set_={column: stmt.excluded[column] for column in ("post_id", "comment_id", "text_type", "embedding", "sampled_at")}
+            )
+            self.db.execute(stmt)
+        stmt = pg_insert(EmbeddingReservoir).values(model_version=model_version, day=day, seen=offered)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[EmbeddingReservoir.model_version, EmbeddingReservoir.day],
+            set_={"seen": EmbeddingReservoir.seen + stmt.excluded.seen}
+        )
+        self.db.execute(stmt)
+        self.db.commit()
@@ -1,8 +1,31 @@
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple
+from sqlalchemy import tuple_
 from datetime import datetime, timedelta
 from app.inference.models.prediction import Prediction
 from app.inference.schemas.prediction import PredictionCreate 
+from app.core.config import settings
+
+def filtered_predictions_criteria(
+    label: Optional[str] = None,
+    confidence_min: Optional[float] = None,
+    confidence_max: Optional[float] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+) -> List:
+    """WHERE criteria of the predictions listing, shared with AsyncPredictionRepository."""
+    criteria = []
+    if label:
+        criteria.append(Prediction.label.ilike(f"%{label}%")) # Case-insensitive partial match, could be better with exact match from dictionary
+    if confidence_min:
+        criteria.append(Prediction.confidence_score >= confidence_min)
+    if confidence_max:
+        criteria.append(Prediction.confidence_score <= confidence_max)
+    if start_date:
+        criteria.append(Prediction.prediction_timestamp >= start_date)
+    if end_date:
+        criteria.append(Prediction.prediction_timestamp < end_date + timedelta(days=1))
+    return criteria
 
 class PredictionRepository:
     def __init__(self, db: Session):
@@ -18,6 +41,17 @@ class PredictionRepository:
     def get_predictions_by_post_id(self, post_id: str) -> List[Prediction]:
         return self.db.query(Prediction).filter(Prediction.post_id == post_id).all()
 
+    def _filtered_predictions_query(
+        self,
+        label: Optional[str] = None,
+        confidence_min: Optional[float] = None,
+        confidence_max: Optional[float] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ):
+        criteria = filtered_predictions_criteria(label, confidence_min, confidence_max, start_date, end_date)
+        return self.db.query(Prediction).filter(*criteria)
+
     def get_filtered_predictions(
         self,
         label: Optional[str] = None,
@@ -25,16 +59,27 @@ class PredictionRepository:
         confidence_max: Optional[float] = None,
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None,
-    ) -> List[Prediction]:
-        query = self.db.query(Prediction)
-        if label:
-            query = query.filter(Prediction.label.ilike(f"%{label}%")) # Case-insensitive partial match, could be better with exact match from dictionary
-        if confidence_min:
-            query = query.filter(Prediction.confidence_score >= confidence_min)
-        if confidence_max:
-            query = query.filter(Prediction.confidence_score <= confidence_max)
-        if start_date:
-            query = query.filter(Prediction.prediction_timestamp >= start_date)
-        if end_date:
-            query = query.filter(Prediction.prediction_timestamp < end_date + timedelta(days=1))
-        return query.order_by(Prediction.prediction_timestamp.desc()).all()
+        after: Optional[Tuple[datetime, int]] = None,
+        limit: int = settings.PAGE_SIZE_DEFAULT,
+    ) -> Tuple[List[Prediction], bool]:
+        """
+        Returns one page of predictions, newest first, and whether more follow. Pages are
+        keyset-paginated on (prediction_timestamp, id): `after` is the key of the previous page's last row.
+        """
+        query = self._filtered_predictions_query(label, confidence_min, confidence_max, start_date, end_date)
+        if after:
+            query = query.filter(tuple_(Prediction.prediction_timestamp, Prediction.id) < after)
+        rows = query.order_by(Prediction.prediction_timestamp.desc(), Prediction.id.desc()).limit(limit + 1).all()
+        return rows[:limit], len(rows) > limit
+
+    def iter_filtered_predictions(
+        self,
+        label: Optional[str] = None,
+        confidence_min: Optional[float] = None,
+        confidence_max: Optional[float] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> Iterator[Prediction]:
+        """Streams all matching predictions, newest first, through a server-side cursor."""
+        query = self._filtered_predictions_query(label, confidence_min, confidence_max, start_date, end_date)
+        return query.order_by(Prediction.prediction_timestamp.desc(), Prediction.id.desc()).yield_per(1000)
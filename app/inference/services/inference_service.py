@@ -1,9 +1,12 @@
 from datetime import datetime, timezone
 import sys
+import time
 from zoneinfo import ZoneInfo
 import httpx
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from typing import List, Dict, Any, Optional
 import logging
 import mlflow
 from fastapi import Request
@@ -16,8 +19,12 @@ from app.data_fetcher.services.reddit_service import RedditService
 from app.data_fetcher.schemas.reddit_post import RedditPost as RedditPostSchema
 from app.data_fetcher.api.data_fetcher_api import get_reddit_service
 from app.inference.repositories.prediction_repository import PredictionRepository
+from app.inference.repositories.async_prediction_repository import AsyncPredictionRepository
+from app.inference.repositories.embedding_reservoir_repository import EmbeddingReservoirRepository
+from app.inference.utils.reservoir import ReservoirSampler
 from app.inference.schemas.prediction import PredictionCreate, Prediction as PredictionSchema
 from app.core.config import settings
+from app.core.pagination import Page, decode_cursor, encode_cursor
 
 logging.basicConfig(
     level=logging.INFO,
@@ -29,11 +36,13 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 class InferenceService:
-    def __init__(self, db: Session, request: Request, reddit_service: RedditService):
+    def __init__(self, db: Session, request: Request, reddit_service: RedditService, async_db: Optional[AsyncSession] = None):
         self.db = db
         self.app_state = request.app.state
         self.unprocessed_post_repo = RedditPostRepository(db)
         self.prediction_repo = PredictionRepository(db)
+        self.async_prediction_repo = AsyncPredictionRepository(async_db) if async_db is not None else None
+        self.embedding_reservoir_repo = EmbeddingReservoirRepository(db)
         self.reddit_service = reddit_service
         self.kyiv_tz = ZoneInfo("Europe/Kyiv")
         self._load_model_components_from_state()
@@ -61,21 +70,20 @@ class InferenceService:
             if self.model_version != champion_version_str:
                 logger.info(f"New champion model found! Current: {self.model_version}, New: {champion_version_str}. Updating...")
                 
-                # Load the new model from MLflow
-                model_uri = f"models:/{model_name}@{champion_alias}"
-                # mlflow.transformers.load_model returns a pipeline-like object
-                new_model_pipeline = mlflow.transformers.load_model(model_uri)
+                # Load the new model from MLflow; an adapter version only downloads the adapter when its base is loaded
+                started = time.perf_counter()
+                model, tokenizer = self.app_state.model_loader.load(champion_version_obj)
                 
                 # Update the application state with the new model components
                 self.app_state.model_components = {
-                    "model": new_model_pipeline.model,
-                    "tokenizer": new_model_pipeline.tokenizer,
+                    "model": model,
+                    "tokenizer": tokenizer,
                     "version": champion_version_str # Use the version string
                 }
                 
                 # Reload the components in the current service instance
                 self._load_model_components_from_state()
-                logger.info(f"Successfully updated and loaded new model version {champion_version_str}")
+                logger.info(f"Successfully updated and loaded new model version {champion_version_str} in {time.perf_counter() - started:.2f}s")
             else:
                 logger.info("Current model is up-to-date with the champion version.")
 
@@ -90,15 +98,19 @@ class InferenceService:
             return {"label": "neutral", "confidence_score": 1.0, "error": "Empty input text"}
         try:
             inputs = self.tokenizer(text, return_tensors="pt", truncation=True, max_length=512)
-            output = self.classifier(**inputs)
+            output = self.classifier(**inputs, output_hidden_states=settings.EMBEDDING_SAMPLING_ENABLED)
             logits = output.logits.detach()
             probs = F.softmax(logits, dim=1).squeeze().tolist()
             label_map = {0: "neutral", 1: "hate_speech"}
             pred_idx = int(torch.argmax(logits, dim=1).item())
-            return {
+            result = {
                 "label": label_map.get(pred_idx, str(pred_idx)),
                 "confidence_score": probs[pred_idx]
             }
+            if settings.EMBEDDING_SAMPLING_ENABLED:
+                # [CLS] token of the last layer, the representation the classification head pools
+                result["embedding"] = output.hidden_states[-1][0, 0].detach().to(torch.float16).numpy().tobytes()
+            return result
         except Exception as e:
             logger.error(f"Error during text classification for text '{text[:100]}...': {e}", exc_info=True)
             return {"label": "error", "confidence_score": 0.0, "error": str(e)}
@@ -113,10 +125,10 @@ class InferenceService:
         unprocessed_posts: List[RedditPostSchema] = self.unprocessed_post_repo.get_unprocessed_posts()
         
         created_predictions_db: List[PredictionSchema] = []
+        sampler = self._start_embedding_sampler()
 
         if not unprocessed_posts:
             logger.info("No unprocessed posts found to process with the current limit.")
-            return created_predictions_db
 
         for post_schema in unprocessed_posts:
             logger.info(f"Processing post ID: {post_schema.post_id}")
@@ -139,46 +151,103 @@ class InferenceService:
                     )
                     db_prediction = self.prediction_repo.create_prediction(prediction_data)
                     created_predictions_db.append(PredictionSchema.model_validate(db_prediction))
-            
-            # Classify comments if they exist
-            if post_schema.comments:
-                for i, comment_text in enumerate(post_schema.comments): 
-                    comment_id_for_db = f"{post_schema.post_id}_comment_{i}"
-
-                    if comment_text: # Ensure comment is not empty
-                        comment_classification_result = self._classify_text(comment_text)
-                        if "error" not in comment_classification_result:
-                            prediction_data = PredictionCreate(
-                                post_id=post_schema.post_id,
-                                comment_id=comment_id_for_db,
-                                text_type='comment',
-                                original_text=comment_text,
-                                label=comment_classification_result['label'],
-                                confidence_score=comment_classification_result['confidence_score'],
-                                model_version=self.model_version,
-                                prediction_timestamp=datetime.now(self.kyiv_tz)
-                            )
-                            db_prediction = self.prediction_repo.create_prediction(prediction_data)
-                            created_predictions_db.append(PredictionSchema.model_validate(db_prediction))
+                    self._offer_embedding(sampler, prediction_data, classification_result)
             
             # Mark the original post as processed in the data_fetcher's database
             self.reddit_service.mark_post_as_processed(post_schema.post_id)
 
+        # Classify unprocessed comments page by page, so large threads (and comments that
+        # arrive after their post was processed) never have to be loaded at once
+        for comment_page in self.unprocessed_post_repo.iter_unprocessed_comments():
+            for comment in comment_page:
+                if not comment.body: # Ensure comment is not empty
+                    continue
+                comment_classification_result = self._classify_text(comment.body)
+                if "error" not in comment_classification_result:
+                    prediction_data = PredictionCreate(
+                        post_id=comment.post_id,
+                        comment_id=comment.comment_id,
+                        text_type='comment',
+                        original_text=comment.body,
+                        label=comment_classification_result['label'],
+                        confidence_score=comment_classification_result['confidence_score'],
+                        model_version=self.model_version,
+                        prediction_timestamp=datetime.now(self.kyiv_tz)
+                    )
+                    db_prediction = self.prediction_repo.create_prediction(prediction_data)
+                    created_predictions_db.append(PredictionSchema.model_validate(db_prediction))
+                    self._offer_embedding(sampler, prediction_data, comment_classification_result)
+            self.unprocessed_post_repo.mark_comments_as_processed([comment.comment_id for comment in comment_page])
+
+        self._save_embedding_sample(sampler)
         logger.info(f"Finished processing batch. Created {len(created_predictions_db)} predictions.")
         return created_predictions_db
 
+    def _start_embedding_sampler(self) -> Optional[ReservoirSampler]:
+        """
+        Continues today's reservoir of CLS embeddings for the current model version, used by the
+        monitor's embedding drift check. None when EMBEDDING_SAMPLING_ENABLED is off.
+        """
+        if not settings.EMBEDDING_SAMPLING_ENABLED:
+            return None
+        self.embedding_day = datetime.now(timezone.utc).date()
+        seen = self.embedding_reservoir_repo.get_seen(self.model_version, self.embedding_day)
+        return ReservoirSampler(settings.EMBEDDING_RESERVOIR_SIZE, seen)
+
+    def _offer_embedding(self, sampler: Optional[ReservoirSampler], prediction: PredictionCreate, classification_result: Dict[str, Any]) -> None:
+        if sampler is None or "embedding" not in classification_result:
+            return
+        sampler.offer({
+            "post_id": prediction.post_id,
+            "comment_id": prediction.comment_id,
+            "text_type": prediction.text_type,
+            "embedding": classification_result["embedding"],
+        })
+
+    def _save_embedding_sample(self, sampler: Optional[ReservoirSampler]) -> None:
+        if sampler is None or sampler.offered == 0:
+            return
+        try:
+            self.embedding_reservoir_repo.save_samples(self.model_version, self.embedding_day, sampler.offered, sampler.replaced)
+            logger.info(f"Embedding reservoir: {len(sampler.replaced)} of {sampler.offered} texts sampled ({sampler.seen} seen today)")
+        except Exception as e:
+            # Sampling only feeds monitoring; never fail the inference run over it
+            self.db.rollback()
+            logger.error(f"Failed to save embedding samples: {e}", exc_info=True)
+
     def get_predictions_for_post(self, post_id: str) -> List[PredictionSchema]:
         db_predictions = self.prediction_repo.get_predictions_by_post_id(post_id)
         return [PredictionSchema.model_validate(p) for p in db_predictions]
     
-    def get_filtered_predictions(self, label, confidence_min, confidence_max, start_date, end_date):
+    def get_filtered_predictions(self, label, confidence_min, confidence_max, start_date, end_date, cursor: Optional[str] = None, limit: int = settings.PAGE_SIZE_DEFAULT) -> Page[PredictionSchema]:
         logger.info(
         f"Fetching predictions with filters: label='{label}', "
         f"confidence_min={confidence_min}, confidence_max={confidence_max}, "
-        f"start_date={start_date}, end_date={end_date}"
+        f"start_date={start_date}, end_date={end_date}, cursor={cursor}, limit={limit}"
     )
-        confidence_min = float(confidence_min) if confidence_min is not None else None
-        confidence_max = float(confidence_max) if confidence_max is not None else None
-        start_date_obj = datetime.strptime(start_date, "%Y-%m-%d") if start_date else None
-        end_date_obj = datetime.strptime(end_date, "%Y-%m-%d") if end_date else None
-        return self.prediction_repo.get_filtered_predictions(label, confidence_min, confidence_max, start_date_obj, end_date_obj)
+        filters = self._parse_prediction_filters(label, confidence_min, confidence_max, start_date, end_date)
+        predictions, has_more = self.prediction_repo.get_filtered_predictions(**filters, after=decode_cursor(cursor), limit=limit)
+        return self._to_page(predictions, has_more, limit)
+
+    async def get_filtered_predictions_async(self, label, confidence_min, confidence_max, start_date, end_date, cursor: Optional[str] = None, limit: int = settings.PAGE_SIZE_DEFAULT) -> Page[PredictionSchema]:
+        """Same as get_filtered_predictions, without blocking the event loop."""
+        if self.async_prediction_repo is None:
+            return await run_in_threadpool(self.get_filtered_predictions, label, confidence_min, confidence_max, start_date, end_date, cursor, limit)
+        filters = self._parse_prediction_filters(label, confidence_min, confidence_max, start_date, end_date)
+        predictions, has_more = await self.async_prediction_repo.get_filtered_predictions(**filters, after=decode_cursor(cursor), limit=limit)
+        return self._to_page(predictions, has_more, limit)
+
+    @staticmethod
+    def _to_page(predictions, has_more: bool, limit: int) -> Page[PredictionSchema]:
+        next_cursor = encode_cursor(predictions[-1].prediction_timestamp, predictions[-1].id) if has_more else None
+        return Page[PredictionSchema](items=[PredictionSchema.model_validate(p) for p in predictions], next_cursor=next_cursor, limit=limit)
+
+    @staticmethod
+    def _parse_prediction_filters(label, confidence_min, confidence_max, start_date, end_date) -> Dict[str, Any]:
+        return {
+            "label": label,
+            "confidence_min": float(confidence_min) if confidence_min is not None else None,
+            "confidence_max": float(confidence_max) if confidence_max is not None else None,
+            "start_date": datetime.strptime(start_date, "%Y-%m-%d") if start_date else None,
+            "end_date": datetime.strptime(end_date, "%Y-%m-%d") if end_date else None,
+        }
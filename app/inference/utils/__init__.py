@@ -0,0 +1 @@
+# Utilities for the inference feature
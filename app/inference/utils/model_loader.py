@@ -0,0 +1,44 @@
+import copy
+import tempfile
+from typing import Optional, Tuple
+import mlflow
+from peft import PeftModel
+
+# Model version tags the retrainer sets on adapter versions (FINETUNE_MODE=lora)
+FINETUNE_MODE_TAG = "finetune_mode"
+BASE_VERSION_TAG = "base_model_version"
+
+def merge_adapter(base_model, adapter_dir: str):
+    """Applies an adapter to a copy of the base model and merges it in, so inference runs a plain model."""
+    return PeftModel.from_pretrained(copy.deepcopy(base_model), adapter_dir).merge_and_unload().eval()
+
+class ModelLoader:
+    """
+    Loads registered model versions. Full versions load as logged. Adapter versions hold only LoRA
+    weights and are merged at load time into their pinned base version, which is kept in memory:
+    every full version loaded is remembered as a potential base, so swapping to an adapter trained
+    on it downloads the adapter (a few MB) instead of the whole model.
+    """
+
+    def __init__(self):
+        self._base_version: Optional[str] = None
+        self._base_components: Optional[dict] = None
+
+    def _load_full(self, name: str, version: str) -> dict:
+        if self._base_version != str(version):
+            self._base_components = mlflow.transformers.load_model(f"models:/{name}/{version}", return_type="components")
+            self._base_version = str(version)
+        return self._base_components
+
+    def load(self, model_version) -> Tuple[object, object]:
+        """Returns (model, tokenizer) of a registered model version."""
+        name = model_version.name
+        tags = model_version.tags or {}
+        if tags.get(FINETUNE_MODE_TAG) != "lora":
+            components = self._load_full(name, model_version.version)
+            return components["model"], components["tokenizer"]
+        base = self._load_full(name, tags[BASE_VERSION_TAG])
+        with tempfile.TemporaryDirectory() as directory:
+            adapter_dir = mlflow.artifacts.download_artifacts(artifact_uri=f"models:/{name}/{model_version.version}", dst_path=directory)
+            model = merge_adapter(base["model"], adapter_dir)
+        return model, base["tokenizer"]
@@ -0,0 +1,30 @@
+import random
+from typing import Any, Dict, Optional
+
+class ReservoirSampler:
+    """
+    Algorithm R over a stream whose first `seen` items were sampled by earlier runs: the n-th item
+    replaces a random slot with probability size / n, so every item seen so far stays in the
+    reservoir with the same probability. Only the slots replaced during this run are kept in
+    memory, which bounds it by the reservoir size.
+    """
+
+    def __init__(self, size: int, seen: int = 0, rng: Optional[random.Random] = None):
+        self.size = size
+        self.seen = seen
+        self.offered = 0
+        self.replaced: Dict[int, Any] = {}
+        self.rng = rng or random.Random()
+
+    def offer(self, item: Any) -> Optional[int]:
+        """Returns the slot `item` was stored in, or None if it was not sampled."""
+        self.seen += 1
+        self.offered += 1
+        if self.seen <= self.size:
+            slot = self.seen - 1
+        else:
+            slot = self.rng.randrange(self.seen)
+            if slot >= self.size:
+                return None
+        self.replaced[slot] = item
+        return slot
@@ -1,53 +1,55 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from app.core.db import engine, Base  
+from app.core.db import engine, async_engine, Base, get_pool_status
+from app.core.migrations import apply_schema
 from app.data_fetcher.api.data_fetcher_api import router as data_fetcher_router
 from app.inference.api.inference_api import router as inference_router
+from app.data_fetcher.services.stream_ingestion_service import StreamIngestionService
+from app.inference.utils.model_loader import ModelLoader
 from app.core.config import settings
 import mlflow
 import mlflow.transformers
 
 
-# Create database tables on startup
-def create_tables():
-    Base.metadata.create_all(bind=engine)
-
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    create_tables()
-    print("Database tables created (if they didn't exist).")
+    # Creates missing tables and builds missing indexes concurrently
+    apply_schema(engine, Base.metadata)
+    print("Database schema is up to date.")
 
     mlflow.set_tracking_uri(settings.MLFLOW_TRACKING_URI)
     
-    # Construct the model URI dynamically from the model name and alias
-    model_uri = f"models:/{settings.MLFLOW_MODEL_NAME}@{settings.MLFLOW_CHAMPION_ALIAS}"
-    print(f"Loading model from URI: {model_uri}")
-
-    # Load model components
-    model_components = mlflow.transformers.load_model(
-        model_uri=model_uri,
-        return_type="components"
-    )
-    print("Model and tokenizer loaded from MLflow.")
-
-    # Get model version
+    # Resolve the champion version, then load it (adapter versions are merged into their base version)
     client = mlflow.MlflowClient()
     champion_version_obj = client.get_model_version_by_alias(
         name=settings.MLFLOW_MODEL_NAME, 
         alias=settings.MLFLOW_CHAMPION_ALIAS
     )
     model_version_str = f"v{champion_version_obj.version}"
-    print(f"Loaded model version: {model_version_str}")
+    print(f"Loading model {settings.MLFLOW_MODEL_NAME} version {model_version_str}")
+
+    app.state.model_loader = ModelLoader()
+    model, tokenizer = app.state.model_loader.load(champion_version_obj)
+    print("Model and tokenizer loaded from MLflow.")
 
     # Store all components in app state
     app.state.model_components = {
-        "model": model_components["model"],
-        "tokenizer": model_components["tokenizer"],
+        "model": model,
+        "tokenizer": tokenizer,
         "version": model_version_str
     }
+
+    # Continuous ingestion runs in a background thread next to the batch /fetcher/fetch endpoint
+    app.state.stream_ingestion = StreamIngestionService()
+    if settings.STREAM_INGESTION_ENABLED:
+        app.state.stream_ingestion.start()
     
     yield
 
+    app.state.stream_ingestion.stop()
+    if async_engine is not None:
+        await async_engine.dispose()
+
 
 app = FastAPI(title="Automated Reddit Content Moderation System", lifespan=lifespan)
 
@@ -59,3 +61,8 @@ app.include_router(inference_router, prefix="/inference", tags=["Inference"])
 @app.get("/")
 async def root():
     return {"message": "Welcome to the Automated Reddit Content Moderation System"}
+
+@app.get("/db/pool")
+async def db_pool_status():
+    """Connection pool occupancy and checkout wait metrics."""
+    return get_pool_status()
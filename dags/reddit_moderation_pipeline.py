@@ -2,9 +2,11 @@ from __future__ import annotations
 
 import pendulum
 
+from airflow.exceptions import AirflowException
 from airflow.models.dag import DAG
 from airflow.operators.python import BranchPythonOperator
 from airflow.providers.http.operators.http import HttpOperator
+from airflow.providers.http.sensors.http import HttpSensor
 from airflow.operators.empty import EmptyOperator
 
 def check_retraining_trigger(ti):
@@ -13,6 +15,12 @@ def check_retraining_trigger(ti):
         return 'label_posts_task'
     return 'stop_pipeline'
 
+def check_retraining_job(response):
+    job = response.json()
+    if job['status'] in ('failed', 'cancelled'):
+        raise AirflowException(f"Retraining job {job['id']} {job['status']}: {job.get('message')}")
+    return job['status'] == 'succeeded'
+
 with DAG(
     dag_id="reddit_content_moderation_pipeline",
     start_date=pendulum.datetime(2025, 6, 29, tz="Europe/Kyiv"),
@@ -60,18 +68,39 @@ with DAG(
         extra_options={'timeout': 1800}, # Increased timeout for labeling posts
     )
 
+    # Retraining runs as a background job: submit it, then poll it without holding a worker slot
     retrain_task = HttpOperator(
         task_id="retrain_task",
         http_conn_id="retrainer",
-        endpoint="/retrainer/retrain-and-evaluate",
+        endpoint="/retrainer/jobs",
         method="POST",
         log_response=True,
-        extra_options={'timeout': 1800}, # Increased timeout for retraining
+        response_filter=lambda response: response.json()
+    )
+
+    wait_for_retrain_task = HttpSensor(
+        task_id="wait_for_retrain_task",
+        http_conn_id="retrainer",
+        endpoint="/retrainer/jobs/{{ ti.xcom_pull(task_ids='retrain_task')['id'] }}",
+        method="GET",
+        response_check=check_retraining_job,
+        mode="reschedule",
+        poke_interval=60,
+        timeout=6 * 60 * 60,
     )
 
     stop_pipeline = EmptyOperator(task_id='stop_pipeline')
 
+    # Independent of the pipeline: creates upcoming predictions partitions, rolls up expired ones
+    retention_task = HttpOperator(
+        task_id="retention_task",
+        http_conn_id="retrainer",
+        endpoint="/monitor/retention",
+        method="POST",
+        log_response=True,
+    )
+
     fetch_posts_task >> predict_task >> monitor_task >> branch_task
-    branch_task >> label_posts_task >> retrain_task
+    branch_task >> label_posts_task >> retrain_task >> wait_for_retrain_task
     branch_task >> stop_pipeline
 
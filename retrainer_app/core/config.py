@@ -29,6 +29,14 @@ class Settings(BaseSettings):
             path=f"{info.data.get('POSTGRES_DB')}",
         )
 
+    # --- Connection Pool Settings ---
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0 # Seconds to wait for a free connection before failing
+    DB_POOL_RECYCLE: int = 1800 # Seconds before a pooled connection is replaced
+    DB_STATEMENT_TIMEOUT_MS: int = 30000 # 0 disables the server-side timeout
+    PREDICTION_PARTITION_DAYS_AHEAD: int = 7 # Daily predictions partitions created ahead of time
+
 
     # --- MLflow Settings ---
     MLFLOW_TRACKING_URI: str = "http://mlflow:5000"
@@ -41,12 +49,60 @@ class Settings(BaseSettings):
     MLFLOW_MODEL_NAME: str = ""
     MLFLOW_CHAMPION_ALIAS: str = ""
 
+    # --- Retrainer Settings ---
+    COMMENT_PAGE_SIZE: int = 500
+    PAGE_SIZE_DEFAULT: int = 50
+    PAGE_SIZE_MAX: int = 500
+    TRAINING_SNAPSHOT_DIR: str = "./snapshots" # Pre-tokenized training corpora, reused while the data and tokenizer are unchanged
+    TRAINING_SNAPSHOT_PAGE_SIZE: int = 5000 # Labelled rows read and tokenized at a time while building a snapshot
+    TRAINING_SNAPSHOT_KEEP: int = 5 # Most recently built snapshots kept on disk
+    REPLAY_BUFFER_PER_CLASS: int = 5000 # Historical labelled rows per class replayed with each new batch; 0 trains on the new batch only
+    RETRAINING_MIN_ROWS: int = 100 # Training rows (new batch plus replay) needed to retrain
+    RETRAINING_CHECKPOINT_DIR: str = "./results" # One checkpoint directory per retraining job
+    RETRAINING_CHECKPOINT_STEPS: int = 50 # Training steps between checkpoints an interrupted job resumes from
+    RETRAINING_PROGRESS_INTERVAL_SECONDS: float = 5.0 # Minimum time between job progress updates
+    FINETUNE_MODE: str = "full" # "full" fine-tunes and logs the whole model; "lora" trains and logs only low-rank adapters on the champion's base version
+    LORA_RANK: int = 8 # Rank of the LoRA update matrices
+    LORA_ALPHA: int = 16 # LoRA scaling; the update is scaled by LORA_ALPHA / LORA_RANK
+    LORA_DROPOUT: float = 0.1
+    LORA_LEARNING_RATE: float = 5e-4 # Adapters train from zero and need a higher rate than full fine-tuning (5e-5)
+    LORA_TARGET_MODULES: str = "query,value" # Comma-separated attention projections that get adapters
+
     # --- Monitor Service Settings ---
     MONITOR_LOW_CONFIDENCE_THRESHOLD: float = 0.7
     MONITOR_TRIGGER_THRESHOLD: float = 0.1
+    MONITOR_WINDOWS_HOURS: List[int] = [1, 6, 24, 168] # Sliding windows, reported per subreddit, text type and model version
+    MONITOR_SUMMARY_WINDOW_HOURS: int = 24 # Window of the headline numbers
+    MONITOR_MIN_SLICE_PREDICTIONS: int = 50 # Smaller slices are reported but never trigger retraining
+    PREDICTION_RETENTION_DAYS: int = 90 # Older predictions partitions are rolled up and removed
+    PREDICTION_RETENTION_MODE: str = "drop" # "drop", or "detach" to keep them as standalone archive tables
+    MONITOR_ROLLUP_BATCH_SIZE: int = 50000 # Prediction ids folded into the hourly rollups per transaction
+    MONITOR_ROLLUP_LAG_SECONDS: float = 60.0 # Predictions younger than this wait for the next refresh
+    DRIFT_WINDOW_HOURS: int = 24 # Recent window compared against the frozen baseline
+    DRIFT_BASELINE_DAYS: int = 7 # Default length of a newly frozen baseline window
+    DRIFT_PSI_THRESHOLD: float = 0.2 # PSI above this, on confidence or label mix, counts as drift
+    DRIFT_MIN_PREDICTIONS: int = 200 # Smaller windows are too noisy to compare
+    EMBEDDING_DRIFT_MAX_SAMPLES: int = 1000 # Embeddings per side of the MMD test, bounds its memory
+    EMBEDDING_DRIFT_MIN_SAMPLES: int = 100
+    EMBEDDING_DRIFT_PERMUTATIONS: int = 200
+    EMBEDDING_DRIFT_P_VALUE: float = 0.01 # MMD permutation-test p-value below this counts as drift
 
     # --- Gemma3 API Settings ---
     LLM_API_KEY: str
+    LLM_PROVIDER: str = "gemini" # "gemini", or "local" for the offline stand-in (tests, benchmarks)
+    LLM_MODEL: str = "gemini-2.5-flash-lite-preview-06-17"
+    LLM_BATCH_SIZE: int = 25 # Texts per labeling prompt
+    LLM_BATCH_MAX_ATTEMPTS: int = 3 # Items missing from a batch answer are re-sent up to this many times in total
+    LLM_INPUT_COST_PER_MILLION_TOKENS: float = 0.10 # USD, for the labeling cost report
+    LLM_OUTPUT_COST_PER_MILLION_TOKENS: float = 0.40
+    LLM_CONCURRENCY: int = 8 # Labeling requests in flight at once
+    LLM_REQUESTS_PER_MINUTE: float = 300.0 # The model's request quota, enforced by a token bucket
+    LLM_MAX_RETRIES: int = 5 # Retries on 429, timeouts and 5xx, with exponential backoff
+    LLM_BACKOFF_BASE_SECONDS: float = 1.0
+    LLM_BACKOFF_MAX_SECONDS: float = 60.0
+    LABELING_BUDGET: int = 2000 # Items sent for labeling per run, picked by the active-learning sampler; 0 labels everything
+    LABELING_MIN_CLASS_SHARE: float = 0.3 # Budget share reserved for each predicted class, however rare
+    LABELING_DIVERSITY_CLUSTERS: int = 20 # Text clusters the sampler spreads each class's quota over
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,36 @@
+import base64
+import json
+from datetime import datetime
+from typing import Generic, Iterable, Iterator, List, Optional, Tuple, TypeVar
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+    limit: int
+
+def encode_cursor(sort_value: datetime, row_id: int) -> str:
+    """Opaque keyset cursor pointing just past the row (sort_value, row_id)."""
+    payload = json.dumps([sort_value.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(sort_value), int(row_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+def stream_json_array(items: Iterable[BaseModel]) -> Iterator[str]:
+    """Serializes items one by one as a JSON array, so bulk exports never build the whole list in memory."""
+    yield "["
+    first = True
+    for item in items:
+        yield ("" if first else ",") + item.model_dump_json()
+        first = False
+    yield "]"
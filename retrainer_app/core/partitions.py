@@ -0,0 +1,127 @@
+import re
+from datetime import date, datetime, time, timedelta, timezone
+from typing import List, Optional, Tuple
+from sqlalchemy import Table, text
+from sqlalchemy.engine import Connection
+
+# Range-partitioned tables declare `postgresql_partition_by` and name their partition key in
+# `info["partition_column"]`. They are split into one partition per UTC day, named <table>_pYYYYMMDD,
+# plus a DEFAULT partition that catches rows outside the created ranges.
+
+def partition_column(table: Table) -> Optional[str]:
+    return table.info.get("partition_column")
+
+def relkind(conn: Connection, name: str) -> Optional[str]:
+    """'r' for a plain table, 'p' for a partitioned parent, None if the relation does not exist."""
+    return conn.execute(
+        text("SELECT relkind FROM pg_class WHERE relname = :name AND relnamespace = 'public'::regnamespace"),
+        {"name": name}
+    ).scalar()
+
+def daily_partition_name(table_name: str, day: date) -> str:
+    return f"{table_name}_p{day:%Y%m%d}"
+
+def default_partition_name(table_name: str) -> str:
+    return f"{table_name}_default"
+
+def list_daily_partitions(conn: Connection, table_name: str) -> List[Tuple[str, date]]:
+    names = conn.execute(
+        text("SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = CAST(:parent AS regclass)"),
+        {"parent": table_name}
+    ).scalars()
+    pattern = re.compile(rf"{re.escape(table_name)}_p(\d{{8}})")
+    partitions = []
+    for name in names:
+        match = pattern.fullmatch(name)
+        if match:
+            partitions.append((name, datetime.strptime(match.group(1), "%Y%m%d").date()))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+def ensure_daily_partitions(conn: Connection, table: Table, first_day: date, last_day: date) -> List[str]:
+    """Creates the DEFAULT partition and any missing daily partition in [first_day, last_day]. Returns the new partitions."""
+    existing = set(conn.execute(
+        text("SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = CAST(:parent AS regclass)"),
+        {"parent": table.name}
+    ).scalars())
+    default = default_partition_name(table.name)
+    if default not in existing:
+        conn.exec_driver_sql(f'CREATE TABLE "{default}" PARTITION OF "{table.name}" DEFAULT')
+    created = []
+    day = first_day
+    while day <= last_day:
+        name = daily_partition_name(table.name, day)
+        if name not in existing:
+            _create_daily_partition(conn, table, name, day)
+            created.append(name)
+        day += timedelta(days=1)
+    return created
+
+def _create_daily_partition(conn: Connection, table: Table, name: str, day: date) -> None:
+    column = partition_column(table)
+    default = default_partition_name(table.name)
+    lower = datetime.combine(day, time.min, tzinfo=timezone.utc)
+    upper = lower + timedelta(days=1)
+    # Rows of this range already sitting in DEFAULT have to move first, otherwise ATTACH rejects the bound
+    conn.exec_driver_sql(f'CREATE TABLE "{name}" (LIKE "{table.name}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+    conn.execute(
+        text(f'WITH moved AS (DELETE FROM "{default}" WHERE "{column}" >= :lower AND "{column}" < :upper RETURNING *) INSERT INTO "{name}" SELECT * FROM moved'),
+        {"lower": lower, "upper": upper}
+    )
+    conn.exec_driver_sql(
+        f'ALTER TABLE "{table.name}" ATTACH PARTITION "{name}" FOR VALUES FROM (\'{lower.isoformat()}\') TO (\'{upper.isoformat()}\')'
+    )
+
+def remove_partition(conn: Connection, table_name: str, partition_name: str, drop: bool = True) -> None:
+    """Detaches a partition from its parent and, with `drop`, deletes it; otherwise it stays as a standalone archive table."""
+    conn.exec_driver_sql(f'ALTER TABLE "{table_name}" DETACH PARTITION "{partition_name}"')
+    if drop:
+        conn.exec_driver_sql(f'DROP TABLE "{partition_name}"')
+
+def convert_to_partitioned(conn: Connection, table: Table, days_ahead: int) -> int:
+    """
+    One-off conversion of an existing plain table into its partitioned definition. The old table is
+    renamed aside (with its indexes and sequences, whose names the new table reuses), the partitioned
+    table is created with partitions covering the existing data, rows are copied over, sequences are
+    moved past the copied ids and the old table is dropped. Meant to run in a single transaction.
+    Returns the number of rows copied.
+    """
+    column = partition_column(table)
+    legacy = f"{table.name}_legacy"
+    index_names = conn.execute(
+        text("SELECT indexname FROM pg_indexes WHERE schemaname = 'public' AND tablename = :name"), {"name": table.name}
+    ).scalars().all()
+    for index_name in index_names:
+        # Renaming a constraint's index renames the constraint too (e.g. the primary key)
+        conn.exec_driver_sql(f'ALTER INDEX "{index_name}" RENAME TO "{index_name}_legacy"')
+    sequence_names = conn.execute(
+        text("""
+            SELECT s.relname FROM pg_class s
+            JOIN pg_depend d ON d.objid = s.oid AND d.deptype = 'a'
+            JOIN pg_class t ON t.oid = d.refobjid
+            WHERE s.relkind = 'S' AND t.relname = :name
+        """),
+        {"name": table.name}
+    ).scalars().all()
+    for sequence_name in sequence_names:
+        conn.exec_driver_sql(f'ALTER SEQUENCE "{sequence_name}" RENAME TO "{sequence_name}_legacy"')
+    conn.exec_driver_sql(f'ALTER TABLE "{table.name}" RENAME TO "{legacy}"')
+
+    table.create(conn)
+    oldest, newest = conn.execute(text(f'SELECT MIN("{column}"), MAX("{column}") FROM "{legacy}"')).one()
+    today = datetime.now(timezone.utc).date()
+    first_day = oldest.astimezone(timezone.utc).date() if oldest else today
+    last_day = max(newest.astimezone(timezone.utc).date() if newest else today, today + timedelta(days=days_ahead))
+    ensure_daily_partitions(conn, table, first_day, last_day)
+
+    columns = ", ".join(f'"{c.name}"' for c in table.columns)
+    source_columns = ", ".join(
+        f'COALESCE("{c.name}", now())' if c.name == column else f'"{c.name}"' for c in table.columns
+    )
+    copied = conn.execute(text(f'INSERT INTO "{table.name}" ({columns}) SELECT {source_columns} FROM "{legacy}"')).rowcount
+    for c in table.columns:
+        if c.autoincrement is True:
+            conn.execute(text(
+                f"SELECT setval(pg_get_serial_sequence(:name, :column), COALESCE((SELECT MAX(\"{c.name}\") FROM \"{table.name}\"), 0) + 1, false)"
+            ), {"name": table.name, "column": c.name})
+    conn.exec_driver_sql(f'DROP TABLE "{legacy}"')
+    return copied
@@ -1,18 +1,24 @@
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
 
-from retrainer_app.core.db import engine, Base
+from retrainer_app.core.db import engine, Base, get_pool_status
+from retrainer_app.core.migrations import apply_schema
 from retrainer_app.retrainer.api.retrainer_api import router as retrainer_router
 from retrainer_app.monitor.api.monitor_api import router as monitor_router
-
-def create_tables():
-    Base.metadata.create_all(bind=engine)
+from retrainer_app.retrainer.services.retraining_job_manager import RetrainingJobManager
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    create_tables()
-    print("Database tables created (if they didn't exist).")
+    # Creates missing tables and builds missing indexes concurrently
+    apply_schema(engine, Base.metadata)
+    print("Database schema is up to date.")
+    # Retraining runs as background jobs; jobs interrupted by the last shutdown resume here
+    app.state.retraining_jobs = RetrainingJobManager()
+    app.state.retraining_jobs.start()
+    # Report of the latest labeling run, see GET /retrainer/labeling-report
+    app.state.labeling_report = None
     yield
+    app.state.retraining_jobs.stop()
 
 app = FastAPI(title="Retrainer Service", lifespan=lifespan)
 
@@ -22,3 +28,8 @@ app.include_router(monitor_router, prefix="/monitor", tags=["Monitor"])
 @app.get("/")
 async def root():
     return {"message": "Welcome to the Retrainer Service"}
+
+@app.get("/db/pool")
+async def db_pool_status():
+    """Connection pool occupancy and checkout wait metrics."""
+    return get_pool_status()
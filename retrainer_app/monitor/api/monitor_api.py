@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Optional
 from sqlalchemy.orm import Session
 
 from retrainer_app.core.db import get_db
 from retrainer_app.monitor.services.monitor_service import MonitorService
-from retrainer_app.monitor.schemas.monitor import MonitorResponse
+from retrainer_app.monitor.services.retention_service import PredictionRetentionService
+from retrainer_app.monitor.services.rollup_service import PredictionRollupService
+from retrainer_app.monitor.services.drift_service import DriftService
+from retrainer_app.monitor.schemas.monitor import DriftBaselineResponse, DriftResponse, MonitorResponse, RetentionResponse, RollupRefreshResponse
 
 router = APIRouter()
 
@@ -18,3 +22,49 @@ def run_monitoring(db: Session = Depends(get_db)):
         return response
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/retention", response_model=RetentionResponse)
+def run_retention(db: Session = Depends(get_db)):
+    """
+    Creates upcoming predictions partitions and rolls up and removes the expired ones.
+    """
+    try:
+        return PredictionRetentionService(db).run()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/rollups/refresh", response_model=RollupRefreshResponse)
+def refresh_rollups(db: Session = Depends(get_db)):
+    """
+    Folds the predictions written since the last refresh into the hourly rollups.
+    """
+    try:
+        return PredictionRollupService(db).refresh()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/drift", response_model=DriftResponse)
+def check_drift(db: Session = Depends(get_db)):
+    """
+    Compares the recent confidence and label distributions of each model version with its frozen baseline.
+    """
+    try:
+        return DriftService(db).check_drift()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/drift/baseline", response_model=DriftBaselineResponse)
+def freeze_drift_baseline(
+    model_version: Optional[str] = Query(None, description="Defaults to the most recently active model version"),
+    days: Optional[int] = Query(None, ge=1, description="Baseline window length in days, ending at the current hour"),
+    db: Session = Depends(get_db)
+):
+    """
+    Freezes the current distributions of a model version as the baseline drift is measured against.
+    """
+    try:
+        return DriftService(db).freeze_baseline(model_version=model_version, days=days)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
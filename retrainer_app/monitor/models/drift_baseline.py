@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+from sqlalchemy.sql import func
+from retrainer_app.core.db import Base
+
+class DriftBaseline(Base):
+    __tablename__ = "drift_baselines"
+
+    model_version = Column(String, primary_key=True)
+    window_start = Column(DateTime(timezone=True), nullable=False)
+    window_end = Column(DateTime(timezone=True), nullable=False)
+    prediction_count = Column(BigInteger, nullable=False)
+    confidence_histogram = Column(ARRAY(Integer), nullable=False) # HISTOGRAM_BUCKETS equal-width buckets over [0, 1]
+    label_counts = Column(JSONB, nullable=False) # {label: prediction count}
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,11 +1,11 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Index
 from sqlalchemy.sql import func
 from retrainer_app.core.db import Base
 
 class Prediction(Base):
     __tablename__ = "predictions"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     post_id = Column(String, index=True, nullable=False)
     comment_id = Column(String, index=True, nullable=True)
     
@@ -14,4 +14,12 @@ class Prediction(Base):
     label = Column(String, nullable=False)
     confidence_score = Column(Float, nullable=False)
     model_version = Column(String, nullable=False)
-    prediction_timestamp = Column(DateTime(timezone=True), server_default=func.now())
+    # Part of the primary key because PostgreSQL requires the partition key in every unique constraint
+    prediction_timestamp = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_predictions_timestamp_label", "prediction_timestamp", "label"), # Monitor windows per label
+        Index("ix_predictions_timestamp_id", "prediction_timestamp", "id"), # Keyset-paginated listing
+        # One partition per UTC day, see core/partitions.py
+        {"postgresql_partition_by": "RANGE (prediction_timestamp)", "info": {"partition_column": "prediction_timestamp"}},
+    )
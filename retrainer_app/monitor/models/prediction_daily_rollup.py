@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, BigInteger, String, Float, Date
+from sqlalchemy.dialects.postgresql import ARRAY
+from retrainer_app.core.db import Base
+
+HISTOGRAM_BUCKETS = 20 # Equal-width confidence buckets over [0, 1]
+
+class PredictionDailyRollup(Base):
+    __tablename__ = "prediction_daily_rollups"
+
+    day = Column(Date, primary_key=True) # UTC day
+    model_version = Column(String, primary_key=True)
+    label = Column(String, primary_key=True)
+    text_type = Column(String, primary_key=True)
+    prediction_count = Column(BigInteger, nullable=False)
+    confidence_sum = Column(Float, nullable=False)
+    confidence_histogram = Column(ARRAY(Integer), nullable=False)
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, BigInteger, String, Float, DateTime
+from sqlalchemy.dialects.postgresql import ARRAY
+from retrainer_app.core.db import Base
+
+class PredictionHourlyRollup(Base):
+    __tablename__ = "prediction_hourly_rollups"
+
+    hour = Column(DateTime(timezone=True), primary_key=True) # Start of the UTC hour
+    model_version = Column(String, primary_key=True)
+    label = Column(String, primary_key=True)
+    text_type = Column(String, primary_key=True)
+    subreddit = Column(String, primary_key=True)
+    prediction_count = Column(BigInteger, nullable=False)
+    confidence_sum = Column(Float, nullable=False)
+    confidence_histogram = Column(ARRAY(Integer), nullable=False) # HISTOGRAM_BUCKETS equal-width buckets over [0, 1]
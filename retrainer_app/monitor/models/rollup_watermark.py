@@ -0,0 +1,10 @@
+from sqlalchemy import Column, String, BigInteger, DateTime
+from sqlalchemy.sql import func
+from retrainer_app.core.db import Base
+
+class RollupWatermark(Base):
+    __tablename__ = "rollup_watermarks"
+
+    name = Column(String, primary_key=True)
+    last_id = Column(BigInteger, nullable=False, default=0) # Highest source id already folded in
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
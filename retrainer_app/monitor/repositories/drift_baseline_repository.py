@@ -0,0 +1,26 @@
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from typing import List, Optional
+
+from retrainer_app.monitor.models.drift_baseline import DriftBaseline
+
+class DriftBaselineRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_baseline(self, model_version: str) -> Optional[DriftBaseline]:
+        return self.db.query(DriftBaseline).filter(DriftBaseline.model_version == model_version).first()
+
+    def get_baselines(self, model_versions: List[str]) -> List[DriftBaseline]:
+        return self.db.query(DriftBaseline).filter(DriftBaseline.model_version.in_(model_versions)).all()
+
+    def save_baseline(self, baseline: dict) -> None:
+        """Inserts the baseline of a model version, replacing any earlier one."""
+        stmt = pg_insert(DriftBaseline).values(**baseline)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[DriftBaseline.model_version],
+            set_={**{column: stmt.excluded[column] for column in baseline if column != "model_version"}, "created_at": func.now()}
+        )
+        self.db.execute(stmt)
+        self.db.commit()
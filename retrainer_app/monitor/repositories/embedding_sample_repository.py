@@ -0,0 +1,19 @@
+from datetime import date
+from typing import List
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from retrainer_app.monitor.models.embedding_sample import EmbeddingSample
+
+class EmbeddingSampleRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_embeddings(self, model_version: str, first_day: date, last_day: date, limit: int) -> List[bytes]:
+        """A random subset of at most `limit` sampled embeddings (raw float16 bytes) from the daily reservoirs in [first_day, last_day]."""
+        rows = self.db.query(EmbeddingSample.embedding).filter(
+            EmbeddingSample.model_version == model_version,
+            EmbeddingSample.day >= first_day,
+            EmbeddingSample.day <= last_day
+        ).order_by(func.random()).limit(limit).all()
+        return [row.embedding for row in rows]
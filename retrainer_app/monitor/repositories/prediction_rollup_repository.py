@@ -0,0 +1,198 @@
+from collections import defaultdict
+from datetime import datetime
+from sqlalchemy.orm import Session
+from sqlalchemy import BigInteger, Row, cast, func, literal_column, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from retrainer_app.monitor.models.prediction_daily_rollup import PredictionDailyRollup, HISTOGRAM_BUCKETS
+from retrainer_app.monitor.models.prediction_hourly_rollup import PredictionHourlyRollup
+from retrainer_app.monitor.models.rollup_watermark import RollupWatermark
+
+def merge_histograms(table_name: str, column: str):
+    """Element-wise sum of the stored histogram and the incoming one, for ON CONFLICT DO UPDATE."""
+    return literal_column(f"ARRAY(SELECT a + b FROM unnest({table_name}.{column}, excluded.{column}) AS u(a, b))")
+
+def _fold_buckets(rows: Sequence[Row], key_fields: Tuple[str, ...]) -> Dict[Tuple, dict]:
+    # Rows carry one (key..., bucket, n, confidence_sum) aggregate each; fold them into one histogram per key
+    rollups: Dict[Tuple, dict] = defaultdict(lambda: {"prediction_count": 0, "confidence_sum": 0.0, "confidence_histogram": [0] * HISTOGRAM_BUCKETS})
+    for row in rows:
+        rollup = rollups[tuple(getattr(row, field) for field in key_fields)]
+        rollup["prediction_count"] += row.n
+        rollup["confidence_sum"] += row.confidence_sum
+        rollup["confidence_histogram"][row.bucket - 1] += row.n
+    return rollups
+
+class PredictionRollupRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def rollup_partition(self, partition_name: str) -> int:
+        """
+        Aggregates one predictions partition into prediction_daily_rollups (per UTC day, model version,
+        label and text type) and returns the number of predictions rolled up. Does not commit, so the
+        caller can remove the partition in the same transaction.
+        """
+        rows = self.db.execute(text(f"""
+            SELECT (prediction_timestamp AT TIME ZONE 'UTC')::date AS day, model_version, label, text_type,
+                   LEAST(GREATEST(width_bucket(confidence_score, 0, 1, :buckets), 1), :buckets) AS bucket,
+                   COUNT(*) AS n, SUM(confidence_score) AS confidence_sum
+            FROM "{partition_name}"
+            GROUP BY 1, 2, 3, 4, 5
+        """), {"buckets": HISTOGRAM_BUCKETS}).all()
+        key_fields = ("day", "model_version", "label", "text_type")
+        return self._upsert_rollups(PredictionDailyRollup, key_fields, _fold_buckets(rows, key_fields))
+
+    def rollup_hourly(self, after_id: int, upto_id: int) -> int:
+        """
+        Folds the predictions with after_id < id <= upto_id into prediction_hourly_rollups (per UTC
+        hour, model version, label, text type and subreddit). Does not commit, so the caller can move
+        the watermark in the same transaction. Returns the number of predictions rolled up.
+        """
+        rows = self.db.execute(text("""
+            SELECT (date_trunc('hour', p.prediction_timestamp AT TIME ZONE 'UTC') AT TIME ZONE 'UTC') AS hour,
+                   p.model_version, p.label, p.text_type, COALESCE(r.subreddit, 'unknown') AS subreddit,
+                   LEAST(GREATEST(width_bucket(p.confidence_score, 0, 1, :buckets), 1), :buckets) AS bucket,
+                   COUNT(*) AS n, SUM(p.confidence_score) AS confidence_sum
+            FROM predictions p
+            LEFT JOIN raw_posts r ON r.post_id = p.post_id
+            WHERE p.id > :after_id AND p.id <= :upto_id
+            GROUP BY 1, 2, 3, 4, 5, 6
+        """), {"buckets": HISTOGRAM_BUCKETS, "after_id": after_id, "upto_id": upto_id}).all()
+        key_fields = ("hour", "model_version", "label", "text_type", "subreddit")
+        return self._upsert_rollups(PredictionHourlyRollup, key_fields, _fold_buckets(rows, key_fields))
+
+    def get_settled_max_prediction_id(self, lag_seconds: float) -> Optional[int]:
+        """
+        Highest prediction id written more than `lag_seconds` ago. Ids are taken from a sequence, so a
+        slow transaction can still commit an id below the current maximum; staying behind by a short
+        lag keeps the watermark from jumping over it.
+        """
+        params = {"lag": lag_seconds}
+        settled = "prediction_timestamp < now() - make_interval(secs => :lag)"
+        # The recent window lets partition pruning keep this to the last few partitions
+        upto_id = self.db.execute(
+            text(f"SELECT MAX(id) FROM predictions WHERE prediction_timestamp >= now() - interval '2 days' AND {settled}"), params
+        ).scalar()
+        if upto_id is None:
+            upto_id = self.db.execute(text(f"SELECT MAX(id) FROM predictions WHERE {settled}"), params).scalar()
+        return upto_id
+
+    def lock_watermark(self, name: str) -> int:
+        """Returns the watermark, locking its row until the transaction ends so concurrent refreshes serialize."""
+        self.db.execute(pg_insert(RollupWatermark).values(name=name, last_id=0).on_conflict_do_nothing(index_elements=[RollupWatermark.name]))
+        return self.db.query(RollupWatermark.last_id).filter(RollupWatermark.name == name).with_for_update().scalar()
+
+    def save_watermark(self, name: str, last_id: int) -> None:
+        self.db.query(RollupWatermark).filter(RollupWatermark.name == name).update(
+            {RollupWatermark.last_id: last_id, RollupWatermark.updated_at: func.now()}, synchronize_session=False
+        )
+
+    def get_hourly_label_totals(self, period_start: datetime, period_end: datetime) -> List[Row]:
+        """Prediction count and confidence sum per label over the hourly rollups in [period_start, period_end)."""
+        return self.db.query(
+            PredictionHourlyRollup.label,
+            cast(func.sum(PredictionHourlyRollup.prediction_count), BigInteger).label("prediction_count"),
+            func.sum(PredictionHourlyRollup.confidence_sum).label("confidence_sum"),
+        ).filter(
+            PredictionHourlyRollup.hour >= period_start,
+            PredictionHourlyRollup.hour < period_end
+        ).group_by(PredictionHourlyRollup.label).all()
+
+    def get_hourly_label_histograms(self, period_start: datetime, period_end: datetime) -> List[Row]:
+        """Merged confidence histograms per label, as (label, bucket, prediction_count) rows with 1-based buckets."""
+        return self.db.execute(text("""
+            SELECT r.label, h.bucket::int AS bucket, SUM(h.n)::bigint AS prediction_count
+            FROM prediction_hourly_rollups r, unnest(r.confidence_histogram) WITH ORDINALITY AS h(n, bucket)
+            WHERE r.hour >= :period_start AND r.hour < :period_end
+            GROUP BY r.label, h.bucket
+        """), {"period_start": period_start, "period_end": period_end}).all()
+
+    def get_hourly_model_version_histograms(self, period_start: datetime, period_end: datetime) -> List[Row]:
+        """Merged confidence histograms per model version, as (model_version, bucket, prediction_count) rows with 1-based buckets."""
+        return self.db.execute(text("""
+            SELECT r.model_version, h.bucket::int AS bucket, SUM(h.n)::bigint AS prediction_count
+            FROM prediction_hourly_rollups r, unnest(r.confidence_histogram) WITH ORDINALITY AS h(n, bucket)
+            WHERE r.hour >= :period_start AND r.hour < :period_end
+            GROUP BY r.model_version, h.bucket
+        """), {"period_start": period_start, "period_end": period_end}).all()
+
+    def get_hourly_model_version_label_counts(self, period_start: datetime, period_end: datetime) -> List[Row]:
+        """Predicted-label mix per model version, as (model_version, label, prediction_count) rows."""
+        return self.db.query(
+            PredictionHourlyRollup.model_version,
+            PredictionHourlyRollup.label,
+            cast(func.sum(PredictionHourlyRollup.prediction_count), BigInteger).label("prediction_count"),
+        ).filter(
+            PredictionHourlyRollup.hour >= period_start,
+            PredictionHourlyRollup.hour < period_end
+        ).group_by(PredictionHourlyRollup.model_version, PredictionHourlyRollup.label).all()
+
+    def get_window_breakdowns(self, window_starts: Dict[str, datetime], low_confidence_buckets: int) -> List[dict]:
+        """
+        Prediction count, low-confidence count (the first `low_confidence_buckets` histogram buckets)
+        and confidence sum for every window in `window_starts` (name -> start, open-ended), overall
+        and per subreddit, text type and model version. One scan over the rollups of the longest
+        window: windows are FILTER clauses and the breakdowns GROUPING SETS. The `dimension` column
+        names the breakdown of each row ('all' for the overall totals) and `value` its group.
+        """
+        windows = list(window_starts.items())
+        params = {f"start_{i}": start for i, (_, start) in enumerate(windows)}
+        params["earliest"] = min(window_starts.values())
+        params["low_buckets"] = low_confidence_buckets
+        aggregates = ",\n".join(
+            f"COALESCE(SUM(prediction_count) FILTER (WHERE hour >= :start_{i}), 0)::bigint AS count_{i}, "
+            f"COALESCE(SUM(low_confidence_count) FILTER (WHERE hour >= :start_{i}), 0)::bigint AS low_{i}, "
+            f"COALESCE(SUM(confidence_sum) FILTER (WHERE hour >= :start_{i}), 0) AS sum_{i}"
+            for i in range(len(windows))
+        )
+        rows = self.db.execute(text(f"""
+            SELECT CASE
+                       WHEN GROUPING(subreddit) = 0 THEN 'subreddit'
+                       WHEN GROUPING(text_type) = 0 THEN 'text_type'
+                       WHEN GROUPING(model_version) = 0 THEN 'model_version'
+                       ELSE 'all'
+                   END AS dimension,
+                   COALESCE(subreddit, text_type, model_version) AS value,
+                   {aggregates}
+            FROM (
+                SELECT r.*, (SELECT COALESCE(SUM(n), 0) FROM unnest(r.confidence_histogram[1:CAST(:low_buckets AS int)]) AS n) AS low_confidence_count
+                FROM prediction_hourly_rollups r
+                WHERE r.hour >= :earliest
+            ) r
+            GROUP BY GROUPING SETS ((), (subreddit), (text_type), (model_version))
+        """), params).all()
+        # One row per (window, dimension, value) is easier on callers than the wide row
+        return [
+            {
+                "window": name,
+                "dimension": row.dimension,
+                "value": row.value,
+                "prediction_count": row._mapping[f"count_{i}"],
+                "low_confidence_count": row._mapping[f"low_{i}"],
+                "confidence_sum": row._mapping[f"sum_{i}"],
+            }
+            for row in rows
+            for i, (name, _) in enumerate(windows)
+        ]
+
+    def get_latest_model_version(self) -> Optional[str]:
+        """Model version of the most recent hourly rollup."""
+        return self.db.query(PredictionHourlyRollup.model_version).order_by(PredictionHourlyRollup.hour.desc()).limit(1).scalar()
+
+    def _upsert_rollups(self, model, key_fields: Tuple[str, ...], rollups: Dict[Tuple, dict]) -> int:
+        if not rollups:
+            return 0
+        stmt = pg_insert(model).values([
+            {**dict(zip(key_fields, key)), **values} for key, values in rollups.items()
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[getattr(model, field) for field in key_fields],
+            set_={
+                "prediction_count": model.prediction_count + stmt.excluded.prediction_count,
+                "confidence_sum": model.confidence_sum + stmt.excluded.confidence_sum,
+                "confidence_histogram": merge_histograms(model.__tablename__, "confidence_histogram"),
+            }
+        )
+        self.db.execute(stmt)
+        return sum(values["prediction_count"] for values in rollups.values())
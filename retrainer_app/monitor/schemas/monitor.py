@@ -1,4 +1,43 @@
 from pydantic import BaseModel
+from datetime import datetime
+from typing import Dict, List, Optional
+
+class LabelBreakdown(BaseModel):
+    label: str
+    prediction_count: int
+    low_confidence_count: int
+    mean_confidence: float
+
+class SliceStats(BaseModel):
+    window: str # e.g. "1h", "24h", "7d"
+    dimension: str # "all", "subreddit", "text_type" or "model_version"
+    value: Optional[str] = None # Group within the dimension, None for "all"
+    prediction_count: int
+    low_confidence_count: int
+    low_confidence_percentage: float
+    mean_confidence: float
+    triggered: bool = False
+
+class DriftResult(BaseModel):
+    model_version: str
+    prediction_count: int
+    baseline_prediction_count: int
+    confidence_psi: float
+    confidence_kl: float
+    label_psi: float
+    label_kl: float
+    embedding_mmd: Optional[float] = None # None without enough sampled embeddings on both sides
+    embedding_p_value: Optional[float] = None
+    embedding_sample_sizes: Optional[List[int]] = None # [baseline, current]
+    drift_detected: bool
+
+class DriftResponse(BaseModel):
+    message: str
+    window_start: datetime
+    window_end: datetime
+    drift_detected: bool = False
+    results: List[DriftResult] = []
+    skipped_model_versions: List[str] = [] # No baseline yet, or too few predictions in the window
 
 class MonitorResponse(BaseModel):
     message: str
@@ -6,3 +45,30 @@ class MonitorResponse(BaseModel):
     total_hate_speech_predictions: int
     low_confidence_percentage: float
     retraining_triggered: bool
+    mean_confidence: float = 0.0
+    confidence_histogram: List[int] = [] # Counts per equal-width confidence bucket over [0, 1]
+    label_breakdown: List[LabelBreakdown] = []
+    summary_window: Optional[str] = None # Window of the headline numbers, histogram and label breakdown
+    windows: List[SliceStats] = []
+    triggered_slices: List[SliceStats] = [] # Slices over the trigger threshold, worst first
+    drift: Optional[DriftResponse] = None
+
+class RetentionResponse(BaseModel):
+    message: str
+    created_partitions: List[str] = []
+    removed_partitions: List[str] = []
+    rolled_up_predictions: int = 0
+
+class RollupRefreshResponse(BaseModel):
+    message: str
+    rolled_up_predictions: int = 0
+    watermark: int = 0 # Highest prediction id folded into the hourly rollups
+
+class DriftBaselineResponse(BaseModel):
+    message: str
+    model_version: str
+    window_start: datetime
+    window_end: datetime
+    prediction_count: int
+    confidence_histogram: List[int]
+    label_counts: Dict[str, int]
@@ -0,0 +1,165 @@
+import sys
+import logging
+import numpy as np
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+
+from retrainer_app.core.config import settings
+from retrainer_app.monitor.models.prediction_daily_rollup import HISTOGRAM_BUCKETS
+from retrainer_app.monitor.repositories.drift_baseline_repository import DriftBaselineRepository
+from retrainer_app.monitor.repositories.embedding_sample_repository import EmbeddingSampleRepository
+from retrainer_app.monitor.repositories.prediction_rollup_repository import PredictionRollupRepository
+from retrainer_app.monitor.schemas.monitor import DriftBaselineResponse, DriftResponse, DriftResult
+from retrainer_app.monitor.services.rollup_service import PredictionRollupService
+from retrainer_app.monitor.utils.drift import kl_divergence, mmd_rbf, population_stability_index
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(name)s - %(message)s",
+    handlers=[
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger(__name__)
+
+class DriftService:
+    """
+    Compares the confidence distribution and the predicted-label mix of each model version over the
+    last DRIFT_WINDOW_HOURS against a baseline frozen in drift_baselines. Both sides are merged from
+    the fixed-bucket histograms and counts of prediction_hourly_rollups, which the rollup refresh
+    keeps current from new predictions only, so a check never rescans the predictions table.
+
+    When inference samples CLS embeddings (EMBEDDING_SAMPLING_ENABLED in the app), the daily
+    reservoirs of the baseline window and of the recent window are also compared with an RBF-kernel
+    MMD test, which catches topic shifts the confidence distribution doesn't show. A day in both
+    windows is only read for the baseline.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.rollup_repository = PredictionRollupRepository(db)
+        self.baseline_repository = DriftBaselineRepository(db)
+        self.embedding_repository = EmbeddingSampleRepository(db)
+        self.rollup_service = PredictionRollupService(db)
+
+    def _window_sketches(self, window_start: datetime, window_end: datetime) -> Dict[str, dict]:
+        sketches: Dict[str, dict] = {}
+        for row in self.rollup_repository.get_hourly_model_version_histograms(window_start, window_end):
+            sketch = sketches.setdefault(row.model_version, {"confidence_histogram": [0] * HISTOGRAM_BUCKETS, "label_counts": {}})
+            sketch["confidence_histogram"][row.bucket - 1] += row.prediction_count
+        for row in self.rollup_repository.get_hourly_model_version_label_counts(window_start, window_end):
+            sketches[row.model_version]["label_counts"][row.label] = row.prediction_count
+        return sketches
+
+    @staticmethod
+    def _utc_days(window_start: datetime, window_end: datetime) -> Tuple[date, date]:
+        """First and last UTC day of a window: reservoirs are per UTC day, so windows are widened to whole days."""
+        last_day = (window_end - timedelta(microseconds=1)).astimezone(timezone.utc).date()
+        return window_start.astimezone(timezone.utc).date(), last_day
+
+    def _load_embeddings(self, model_version: str, first_day: date, last_day: date) -> np.ndarray:
+        embeddings = self.embedding_repository.get_embeddings(model_version, first_day, last_day, settings.EMBEDDING_DRIFT_MAX_SAMPLES)
+        if not embeddings:
+            return np.empty((0, 0), dtype=np.float16)
+        return np.stack([np.frombuffer(embedding, dtype=np.float16) for embedding in embeddings])
+
+    def _embedding_drift(self, baseline, window_start: datetime, window_end: datetime) -> dict:
+        reference_first, reference_last = self._utc_days(baseline.window_start, baseline.window_end)
+        current_first, current_last = self._utc_days(window_start, window_end)
+        # A day read on both sides would pull the two samples together, so the baseline keeps it
+        current_first = max(current_first, reference_last + timedelta(days=1))
+        if current_first > current_last:
+            return {}
+        reference = self._load_embeddings(baseline.model_version, reference_first, reference_last)
+        current = self._load_embeddings(baseline.model_version, current_first, current_last)
+        sizes = [len(reference), len(current)]
+        if min(sizes) < settings.EMBEDDING_DRIFT_MIN_SAMPLES:
+            return {}
+        mmd, p_value = mmd_rbf(reference, current, permutations=settings.EMBEDDING_DRIFT_PERMUTATIONS)
+        return {"embedding_mmd": mmd, "embedding_p_value": p_value, "embedding_sample_sizes": sizes}
+
+    def freeze_baseline(self, model_version: Optional[str] = None, days: Optional[int] = None, window_end: Optional[datetime] = None) -> DriftBaselineResponse:
+        """
+        Freezes the sketches of `model_version` (default: the most recently active one) over the `days`
+        hourly-rollup days before `window_end` as its baseline, replacing any earlier baseline.
+        """
+        self.rollup_service.refresh()
+        model_version = model_version or self.rollup_repository.get_latest_model_version()
+        if model_version is None:
+            raise ValueError("No predictions have been rolled up yet.")
+        window_end = window_end or datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        window_start = window_end - timedelta(days=days or settings.DRIFT_BASELINE_DAYS)
+        sketch = self._window_sketches(window_start, window_end).get(model_version)
+        if sketch is None:
+            raise ValueError(f"No predictions of model version {model_version} between {window_start} and {window_end}.")
+
+        prediction_count = sum(sketch["confidence_histogram"])
+        self.baseline_repository.save_baseline({
+            "model_version": model_version,
+            "window_start": window_start,
+            "window_end": window_end,
+            "prediction_count": prediction_count,
+            "confidence_histogram": sketch["confidence_histogram"],
+            "label_counts": sketch["label_counts"],
+        })
+        logger.info(f"Froze drift baseline for model version {model_version} ({prediction_count} predictions)")
+        return DriftBaselineResponse(
+            message=f"Froze drift baseline for model version {model_version}.",
+            model_version=model_version,
+            window_start=window_start,
+            window_end=window_end,
+            prediction_count=prediction_count,
+            confidence_histogram=sketch["confidence_histogram"],
+            label_counts=sketch["label_counts"],
+        )
+
+    def check_drift(self, refresh: bool = True) -> DriftResponse:
+        if refresh:
+            self.rollup_service.refresh()
+        window_end = datetime.now(timezone.utc)
+        # Rollups are hourly, so the window starts on an hour boundary
+        window_start = window_end.replace(minute=0, second=0, microsecond=0) - timedelta(hours=settings.DRIFT_WINDOW_HOURS)
+        sketches = self._window_sketches(window_start, window_end)
+        baselines = {baseline.model_version: baseline for baseline in self.baseline_repository.get_baselines(list(sketches))}
+
+        results: List[DriftResult] = []
+        skipped: List[str] = []
+        for model_version, sketch in sorted(sketches.items()):
+            baseline = baselines.get(model_version)
+            prediction_count = sum(sketch["confidence_histogram"])
+            if baseline is None or prediction_count < settings.DRIFT_MIN_PREDICTIONS:
+                skipped.append(model_version)
+                continue
+            confidence_psi = population_stability_index(baseline.confidence_histogram, sketch["confidence_histogram"])
+            label_psi = population_stability_index(baseline.label_counts, sketch["label_counts"])
+            embedding_drift = self._embedding_drift(baseline, window_start, window_end)
+            embedding_drifted = embedding_drift.get("embedding_p_value", 1.0) < settings.EMBEDDING_DRIFT_P_VALUE
+            results.append(DriftResult(
+                model_version=model_version,
+                prediction_count=prediction_count,
+                baseline_prediction_count=baseline.prediction_count,
+                confidence_psi=confidence_psi,
+                confidence_kl=kl_divergence(baseline.confidence_histogram, sketch["confidence_histogram"]),
+                label_psi=label_psi,
+                label_kl=kl_divergence(baseline.label_counts, sketch["label_counts"]),
+                **embedding_drift,
+                drift_detected=max(confidence_psi, label_psi) > settings.DRIFT_PSI_THRESHOLD or embedding_drifted,
+            ))
+
+        drifted = [result.model_version for result in results if result.drift_detected]
+        if drifted:
+            message = f"Drift detected for model versions {', '.join(drifted)} (PSI above {settings.DRIFT_PSI_THRESHOLD} or embedding MMD p-value below {settings.EMBEDDING_DRIFT_P_VALUE})."
+            logger.warning(message)
+        elif results:
+            message = "No drift detected."
+        else:
+            message = "No model version with a baseline and enough recent predictions to compare."
+        return DriftResponse(
+            message=message,
+            window_start=window_start,
+            window_end=window_end,
+            drift_detected=bool(drifted),
+            results=results,
+            skipped_model_versions=skipped,
+        )
@@ -1,11 +1,16 @@
 import sys
+import math
 from sqlalchemy.orm import Session
-from datetime import date
+from datetime import datetime, timedelta, timezone
+from typing import List
 import logging
 
 from retrainer_app.core.config import settings
-from retrainer_app.monitor.repositories.prediction_repository import PredictionRepository
-from retrainer_app.monitor.schemas.monitor import MonitorResponse
+from retrainer_app.monitor.repositories.prediction_rollup_repository import PredictionRollupRepository
+from retrainer_app.monitor.services.rollup_service import PredictionRollupService
+from retrainer_app.monitor.services.drift_service import DriftService
+from retrainer_app.monitor.models.prediction_daily_rollup import HISTOGRAM_BUCKETS
+from retrainer_app.monitor.schemas.monitor import LabelBreakdown, MonitorResponse, SliceStats
 
 logging.basicConfig(
     level=logging.INFO,
@@ -16,39 +21,120 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def low_confidence_buckets(threshold: float) -> int:
+    """
+    Number of leading histogram buckets counted as low confidence. Exact when the threshold falls on a
+    bucket edge (multiples of 1 / HISTOGRAM_BUCKETS, e.g. 0.7); otherwise the threshold is rounded
+    down to the previous edge.
+    """
+    return min(max(math.floor(threshold * HISTOGRAM_BUCKETS + 1e-9), 0), HISTOGRAM_BUCKETS)
+
+def window_name(hours: int) -> str:
+    return f"{hours // 24}d" if hours > 24 and hours % 24 == 0 else f"{hours}h"
+
 class MonitorService:
+    """
+    Monitors from prediction_hourly_rollups only; the predictions table is read by the incremental refresh.
+
+    Each window in MONITOR_WINDOWS_HOURS covers that many whole UTC hours before the current one plus
+    the current hour so far. Every window is broken down by subreddit, text type and model version,
+    and any slice with at least MONITOR_MIN_SLICE_PREDICTIONS predictions whose low-confidence share
+    exceeds MONITOR_TRIGGER_THRESHOLD triggers retraining, as does drift.
+    """
+
     def __init__(self, db: Session):
         self.db = db
-        self.prediction_repository = PredictionRepository(db)
+        self.rollup_repository = PredictionRollupRepository(db)
+        self.rollup_service = PredictionRollupService(db)
+        self.drift_service = DriftService(db)
+
+    def _window_slices(self, current_hour: datetime, low_buckets: int) -> List[SliceStats]:
+        window_starts = {
+            window_name(hours): current_hour - timedelta(hours=hours)
+            for hours in sorted(settings.MONITOR_WINDOWS_HOURS)
+        }
+        slices = []
+        for row in self.rollup_repository.get_window_breakdowns(window_starts, low_buckets):
+            prediction_count = row["prediction_count"]
+            if prediction_count == 0:
+                continue
+            low_confidence_percentage = row["low_confidence_count"] / prediction_count
+            slices.append(SliceStats(
+                window=row["window"],
+                dimension=row["dimension"],
+                value=row["value"],
+                prediction_count=prediction_count,
+                low_confidence_count=row["low_confidence_count"],
+                low_confidence_percentage=low_confidence_percentage,
+                mean_confidence=row["confidence_sum"] / prediction_count,
+                triggered=(
+                    prediction_count >= settings.MONITOR_MIN_SLICE_PREDICTIONS
+                    and low_confidence_percentage > settings.MONITOR_TRIGGER_THRESHOLD
+                ),
+            ))
+        window_order = list(window_starts)
+        return sorted(slices, key=lambda s: (window_order.index(s.window), s.dimension != "all", s.dimension, s.value or ""))
 
     def check_predictions_and_trigger_retraining(self) -> MonitorResponse:
-        today = date.today()
-        logger.info(f"Checking predictions for {today}")
+        now = datetime.now(timezone.utc)
+        current_hour = now.replace(minute=0, second=0, microsecond=0)
+        logger.info(f"Checking predictions up to {now.isoformat()}")
 
-        predictions = self.prediction_repository.get_predictions_for_n_days(start_date=today, n_days=1)
+        self.rollup_service.refresh()
+        low_buckets = low_confidence_buckets(settings.MONITOR_LOW_CONFIDENCE_THRESHOLD)
+        slices = self._window_slices(current_hour, low_buckets)
+        drift = self.drift_service.check_drift(refresh=False)
 
-        total_predictions = len(predictions)
-        if total_predictions == 0:
+        # Headline numbers, histogram and label breakdown cover the summary window
+        summary_window = window_name(settings.MONITOR_SUMMARY_WINDOW_HOURS)
+        period_start = current_hour - timedelta(hours=settings.MONITOR_SUMMARY_WINDOW_HOURS)
+        period_end = current_hour + timedelta(hours=1)
+        totals = self.rollup_repository.get_hourly_label_totals(period_start, period_end)
+        labels = {
+            row.label: {"prediction_count": row.prediction_count, "low_confidence_count": 0, "confidence_sum": row.confidence_sum}
+            for row in totals
+        }
+        # (label, bucket) rows of the merged histograms; at most labels x buckets rows
+        histogram = [0] * HISTOGRAM_BUCKETS
+        for row in self.rollup_repository.get_hourly_label_histograms(period_start, period_end):
+            histogram[row.bucket - 1] += row.prediction_count
+            if row.bucket <= low_buckets:
+                labels[row.label]["low_confidence_count"] += row.prediction_count
+
+        total_predictions = sum(stats["prediction_count"] for stats in labels.values())
+        triggered_slices = sorted(
+            (s for s in slices if s.triggered), key=lambda s: s.low_confidence_percentage, reverse=True
+        )
+        if total_predictions == 0 and not triggered_slices:
             return MonitorResponse(
-                message="No predictions found for today.",
+                message=f"No predictions found in the last {summary_window}.",
                 low_confidence_count=0,
                 total_hate_speech_predictions=0,
                 low_confidence_percentage=0.0,
-                retraining_triggered=False
+                retraining_triggered=drift.drift_detected,
+                summary_window=summary_window,
+                windows=slices,
+                drift=drift
             )
 
-        low_confidence_count = sum(
-            1 for p in predictions if p.confidence_score < settings.MONITOR_LOW_CONFIDENCE_THRESHOLD
-        )
+        low_confidence_count = sum(stats["low_confidence_count"] for stats in labels.values())
 
-        low_confidence_percentage = (low_confidence_count / total_predictions)
+        low_confidence_percentage = (low_confidence_count / total_predictions) if total_predictions else 0.0
 
-        retraining_triggered = low_confidence_percentage > settings.MONITOR_TRIGGER_THRESHOLD
+        retraining_triggered = bool(triggered_slices) or drift.drift_detected
 
-        if retraining_triggered:
-            message = f"Retraining triggered: Low confidence predictions ({low_confidence_percentage:.2%}) exceeded threshold ({settings.MONITOR_TRIGGER_THRESHOLD:.2%})."
+        if triggered_slices:
+            worst = triggered_slices[0]
+            slice_name = "all predictions" if worst.dimension == "all" else f"{worst.dimension}={worst.value}"
+            message = (
+                f"Retraining triggered: Low confidence predictions ({worst.low_confidence_percentage:.2%}) of {slice_name} "
+                f"in the last {worst.window} exceeded threshold ({settings.MONITOR_TRIGGER_THRESHOLD:.2%})."
+            )
             logger.warning(message)
             # Retraining wiil be triggered through Airflow based on the 'retraining_triggered' flag
+        elif drift.drift_detected:
+            message = f"Retraining triggered: {drift.message}"
+            logger.warning(message)
         else:
             message = "Monitoring check complete. Retraining not required."
             logger.info(message)
@@ -58,5 +144,20 @@ class MonitorService:
             low_confidence_count=low_confidence_count,
             total_hate_speech_predictions=total_predictions,
             low_confidence_percentage=low_confidence_percentage,
-            retraining_triggered=retraining_triggered
+            retraining_triggered=retraining_triggered,
+            mean_confidence=sum(stats["confidence_sum"] for stats in labels.values()) / total_predictions if total_predictions else 0.0,
+            confidence_histogram=histogram,
+            label_breakdown=[
+                LabelBreakdown(
+                    label=label,
+                    prediction_count=stats["prediction_count"],
+                    low_confidence_count=stats["low_confidence_count"],
+                    mean_confidence=stats["confidence_sum"] / stats["prediction_count"],
+                )
+                for label, stats in sorted(labels.items())
+            ],
+            summary_window=summary_window,
+            windows=slices,
+            triggered_slices=triggered_slices,
+            drift=drift
         )
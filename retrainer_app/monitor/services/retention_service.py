@@ -0,0 +1,66 @@
+import sys
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy.orm import Session
+
+from retrainer_app.core.config import settings
+from retrainer_app.core.partitions import ensure_daily_partitions, list_daily_partitions, relkind, remove_partition
+from retrainer_app.monitor.models.prediction import Prediction
+from retrainer_app.monitor.repositories.prediction_rollup_repository import PredictionRollupRepository
+from retrainer_app.monitor.schemas.monitor import RetentionResponse
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(name)s - %(message)s",
+    handlers=[
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger(__name__)
+
+class PredictionRetentionService:
+    """
+    Maintenance of the daily-partitioned predictions table: creates the upcoming partitions and
+    replaces partitions older than PREDICTION_RETENTION_DAYS by rows in prediction_daily_rollups.
+    Each expired partition is rolled up and detached (and dropped) in one transaction, so a failed
+    run never double counts or loses a day.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.rollup_repository = PredictionRollupRepository(db)
+
+    def run(self, today: Optional[date] = None) -> RetentionResponse:
+        today = today or datetime.now(timezone.utc).date()
+        table = Prediction.__table__
+        conn = self.db.connection()
+        if relkind(conn, table.name) != "p":
+            return RetentionResponse(message=f"{table.name} is not partitioned yet; restart a service to migrate it.")
+
+        created = ensure_daily_partitions(conn, table, today, today + timedelta(days=settings.PREDICTION_PARTITION_DAYS_AHEAD))
+        self.db.commit()
+
+        cutoff = today - timedelta(days=settings.PREDICTION_RETENTION_DAYS)
+        drop = settings.PREDICTION_RETENTION_MODE == "drop"
+        removed, rolled_up = [], 0
+        for partition_name, day in list_daily_partitions(self.db.connection(), table.name):
+            if day >= cutoff:
+                break
+            try:
+                rolled_up += self.rollup_repository.rollup_partition(partition_name)
+                remove_partition(self.db.connection(), table.name, partition_name, drop=drop)
+                self.db.commit()
+            except Exception:
+                self.db.rollback()
+                logger.error(f"Retention failed for partition {partition_name}", exc_info=True)
+                raise
+            removed.append(partition_name)
+            logger.info(f"Rolled up and {'dropped' if drop else 'detached'} partition {partition_name}")
+
+        return RetentionResponse(
+            message=f"Created {len(created)} partitions, rolled up {len(removed)} expired partitions ({rolled_up} predictions).",
+            created_partitions=created,
+            removed_partitions=removed,
+            rolled_up_predictions=rolled_up,
+        )
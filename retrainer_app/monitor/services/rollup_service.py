@@ -0,0 +1,56 @@
+import sys
+import logging
+from sqlalchemy.orm import Session
+
+from retrainer_app.core.config import settings
+from retrainer_app.monitor.repositories.prediction_rollup_repository import PredictionRollupRepository
+from retrainer_app.monitor.schemas.monitor import RollupRefreshResponse
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(name)s - %(message)s",
+    handlers=[
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger(__name__)
+
+HOURLY_ROLLUP_WATERMARK = "prediction_hourly_rollups"
+
+class PredictionRollupService:
+    """
+    Keeps prediction_hourly_rollups up to date. Predictions are append-only with increasing ids, so
+    each refresh only folds in the ids above the stored watermark, in chunks of
+    MONITOR_ROLLUP_BATCH_SIZE. Every chunk is upserted and the watermark moved in the same
+    transaction, under a row lock on the watermark, so predictions are counted exactly once even with
+    overlapping refreshes.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.rollup_repository = PredictionRollupRepository(db)
+
+    def refresh(self) -> RollupRefreshResponse:
+        upto_id = self.rollup_repository.get_settled_max_prediction_id(settings.MONITOR_ROLLUP_LAG_SECONDS)
+        rolled_up = 0
+        try:
+            watermark = self.rollup_repository.lock_watermark(HOURLY_ROLLUP_WATERMARK)
+            while upto_id is not None and watermark < upto_id:
+                batch_end = min(watermark + settings.MONITOR_ROLLUP_BATCH_SIZE, upto_id)
+                rolled_up += self.rollup_repository.rollup_hourly(watermark, batch_end)
+                self.rollup_repository.save_watermark(HOURLY_ROLLUP_WATERMARK, batch_end)
+                self.db.commit()
+                watermark = self.rollup_repository.lock_watermark(HOURLY_ROLLUP_WATERMARK)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            logger.error("Refreshing the hourly prediction rollups failed", exc_info=True)
+            raise
+
+        if rolled_up:
+            logger.info(f"Rolled up {rolled_up} predictions into hourly rollups (watermark {watermark})")
+        return RollupRefreshResponse(
+            message=f"Rolled up {rolled_up} predictions.",
+            rolled_up_predictions=rolled_up,
+            watermark=watermark,
+        )
@@ -0,0 +1,79 @@
+import math
+import numpy as np
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+# Divergences between two count distributions (histogram buckets or label counts). Counts are
+# normalised to proportions with a small floor, so empty buckets don't make the result infinite.
+
+EPSILON = 1e-4
+
+Counts = Union[Sequence[float], Dict[str, float]]
+
+def _proportions(expected: Counts, actual: Counts):
+    if isinstance(expected, dict) or isinstance(actual, dict):
+        keys = sorted(set(expected) | set(actual))
+        expected = [expected.get(key, 0) for key in keys]
+        actual = [actual.get(key, 0) for key in keys]
+    if len(expected) != len(actual):
+        raise ValueError("Distributions must have the same number of buckets")
+    expected_total, actual_total = sum(expected), sum(actual)
+    if expected_total <= 0 or actual_total <= 0:
+        raise ValueError("Distributions must not be empty")
+    return (
+        [max(count / expected_total, EPSILON) for count in expected],
+        [max(count / actual_total, EPSILON) for count in actual],
+    )
+
+def population_stability_index(expected: Counts, actual: Counts) -> float:
+    """PSI = sum((a - e) * ln(a / e)). Rule of thumb: < 0.1 stable, 0.1-0.2 moderate shift, > 0.2 significant shift."""
+    expected_p, actual_p = _proportions(expected, actual)
+    return sum((a - e) * math.log(a / e) for e, a in zip(expected_p, actual_p))
+
+def kl_divergence(expected: Counts, actual: Counts) -> float:
+    """KL(actual || expected), in nats."""
+    expected_p, actual_p = _proportions(expected, actual)
+    return sum(a * math.log(a / e) for e, a in zip(expected_p, actual_p))
+
+def _squared_distances(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    return np.maximum((x * x).sum(axis=1)[:, None] + (y * y).sum(axis=1)[None, :] - 2.0 * x @ y.T, 0.0)
+
+def _unbiased_mmd2(kernel: np.ndarray, assignments: np.ndarray) -> np.ndarray:
+    """
+    Unbiased MMD^2 for several splits of a pooled sample at once. `kernel` is the Gram matrix of the
+    pooled sample (unit diagonal, as for the RBF kernel) and each column of `assignments` marks with
+    1 the members of the first sample, so all splits cost a single matrix product.
+    """
+    n = assignments[:, 0].sum()
+    m = kernel.shape[0] - n
+    kw = kernel @ assignments
+    sum_xx = (assignments * kw).sum(axis=0)
+    sum_xy = ((1.0 - assignments) * kw).sum(axis=0)
+    sum_yy = kernel.sum() - sum_xx - 2.0 * sum_xy
+    return (sum_xx - n) / (n * (n - 1)) + (sum_yy - m) / (m * (m - 1)) - 2.0 * sum_xy / (n * m)
+
+def mmd_rbf(reference: np.ndarray, current: np.ndarray, permutations: int = 100, seed: Optional[int] = None) -> Tuple[float, float]:
+    """
+    Unbiased squared maximum mean discrepancy between two samples of embeddings under an RBF kernel,
+    with the bandwidth set by the median heuristic, and a permutation-test p-value. Memory is one
+    Gram matrix of the pooled sample, so callers bound it by capping the sample sizes.
+    """
+    x = np.asarray(reference, dtype=np.float32)
+    y = np.asarray(current, dtype=np.float32)
+    n, m = len(x), len(y)
+    if n < 2 or m < 2:
+        raise ValueError("Both samples need at least two embeddings")
+    pooled = np.concatenate([x, y])
+    distances = _squared_distances(pooled, pooled)
+    bandwidth = np.median(distances[np.triu_indices(n + m, k=1)])
+    # float64 from here on: the statistic is a small difference of large kernel sums
+    kernel = np.exp(-distances.astype(np.float64) / max(float(bandwidth), 1e-12))
+
+    # Column 0 is the observed split, the others are random relabellings of the pooled sample
+    rng = np.random.default_rng(seed)
+    assignments = np.zeros((n + m, permutations + 1))
+    assignments[:n, 0] = 1.0
+    for column in range(1, permutations + 1):
+        assignments[rng.choice(n + m, size=n, replace=False), column] = 1.0
+    statistics = _unbiased_mmd2(kernel, assignments)
+    p_value = (np.sum(statistics[1:] >= statistics[0]) + 1) / (permutations + 1)
+    return float(statistics[0]), float(p_value)
@@ -5,9 +5,13 @@ from datetime import datetime
 from fastapi.templating import Jinja2Templates
 from fastapi.responses import HTMLResponse
 from retrainer_app.core.db import get_db
+from retrainer_app.core.config import settings
 from retrainer_app.retrainer.repositories.reddit_post import RedditPostRepository
 from retrainer_app.retrainer.repositories.labelled_post_content_repository import LabelledPostContentRepository
+from retrainer_app.retrainer.repositories.llm_label_cache_repository import LLMLabelCacheRepository
 from retrainer_app.retrainer.schemas.labelled_post_content import LabelledPostContent
+from retrainer_app.retrainer.schemas.labeling import LabelingReport
+from retrainer_app.retrainer.schemas.retraining_job import RetrainingJob
 from retrainer_app.retrainer.services.retrainer_service import RetrainerService
 
 router = APIRouter()
@@ -16,39 +20,94 @@ templates = Jinja2Templates(directory="retrainer_app/retrainer/templates")
 def get_retrainer_service(db: Session = Depends(get_db)):
     fetcher_repo = RedditPostRepository(db)
     labelled_repo = LabelledPostContentRepository(db)
-    return RetrainerService(fetcher_repo, labelled_repo)
+    label_cache_repo = LLMLabelCacheRepository(db)
+    return RetrainerService(fetcher_repo, labelled_repo, label_cache_repo)
 
 @router.post("/label-posts", response_model=List[LabelledPostContent])
-def label_today_posts(service: RetrainerService = Depends(get_retrainer_service)):
+def label_today_posts(request: Request, service: RetrainerService = Depends(get_retrainer_service)):
     posts = service.get_current_date_original_posts()
     if not posts:
         raise HTTPException(status_code=404, detail="No posts found for today.")
     labelled_posts = service.label_posts(posts)
+    request.app.state.labeling_report = service.last_labeling_report
     return labelled_posts
 
+@router.get("/labeling-report", response_model=LabelingReport)
+def get_labeling_report(request: Request):
+    """
+    Items, LLM requests, tokens, cost and latency of the latest labeling run.
+    """
+    if request.app.state.labeling_report is None:
+        raise HTTPException(status_code=404, detail="No labeling run since the service started.")
+    return request.app.state.labeling_report
+
 @router.get("/labelled-posts", response_class=HTMLResponse)
 def view_labelled_posts(
     request: Request, 
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
     service: RetrainerService = Depends(get_retrainer_service)
 ):
 
-    posts = service.get_labelled_posts(start_date=start_date, end_date=end_date)
+    try:
+        page = service.get_labelled_posts(start_date=start_date, end_date=end_date, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return templates.TemplateResponse(
         "labelled_posts_view.html", 
         {
             "request": request, 
-            "posts": posts,
+            "posts": page.items,
+            "next_cursor": page.next_cursor,
             "start_date": start_date,
             "end_date": end_date
         }
     )
 
 @router.post("/retrain-and-evaluate", response_model=dict)
-def retrain_and_evaluate_model(service: RetrainerService = Depends(get_retrainer_service)):
+def retrain_and_evaluate_model(request: Request):
+    """
+    Runs retraining as a background job and waits for it. The job keeps running if the connection
+    drops; prefer POST /retrainer/jobs and polling GET /retrainer/jobs/{job_id}.
+    """
+    manager = request.app.state.retraining_jobs
     try:
-        service.retrain_and_evaluate()
-        return {"message": "Model retraining and evaluation completed successfully."}
+        job = manager.wait(manager.submit().id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    if job.status != "succeeded":
+        raise HTTPException(status_code=500, detail=f"Retraining job {job.id} {job.status}: {job.message}")
+    return {"message": "Model retraining and evaluation completed successfully.", "job_id": job.id, "result": job.result}
+
+@router.post("/jobs", response_model=RetrainingJob, status_code=202)
+def submit_retraining_job(request: Request):
+    """
+    Queues retraining and evaluation as a background job and returns it at once. If a job is
+    already queued or running, that job is returned instead.
+    """
+    try:
+        return request.app.state.retraining_jobs.submit()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/jobs", response_model=List[RetrainingJob])
+def list_retraining_jobs(request: Request, limit: int = Query(20, ge=1, le=100)):
+    return request.app.state.retraining_jobs.list_recent(limit)
+
+@router.get("/jobs/{job_id}", response_model=RetrainingJob)
+def get_retraining_job(job_id: str, request: Request):
+    """Status, phase, training step, latest loss and ETA of a retraining job."""
+    job = request.app.state.retraining_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Retraining job {job_id} not found.")
+    return job
+
+@router.post("/jobs/{job_id}/cancel", response_model=RetrainingJob)
+def cancel_retraining_job(job_id: str, request: Request):
+    """Cancels a queued job at once; a running job stops at its next training step or phase."""
+    job = request.app.state.retraining_jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Retraining job {job_id} not found.")
+    return job
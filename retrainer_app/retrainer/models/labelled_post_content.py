@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, func
+from sqlalchemy import Column, Integer, String, Text, DateTime, func, Index
 from retrainer_app.core.db import Base
 
 class LabelledPostContent(Base):
@@ -11,3 +11,8 @@ class LabelledPostContent(Base):
     label = Column(Integer)
     text_type = Column(String)
     created_utc = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_labelled_post_contents_created_utc_id", "created_utc", "id"), # Daily training windows and the listing
+        Index("ix_labelled_post_contents_post_id_posts", "post_id", postgresql_where=text_type == 'post'), # "Post already labelled" anti-join
+    )
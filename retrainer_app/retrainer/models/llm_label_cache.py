@@ -0,0 +1,10 @@
+from sqlalchemy import Column, Integer, String, DateTime, func
+from retrainer_app.core.db import Base
+
+class LLMLabelCache(Base):
+    __tablename__ = "llm_label_cache"
+
+    text_hash = Column(String(64), primary_key=True) # sha256 of the normalized text
+    fingerprint = Column(String(16), primary_key=True) # Provider, model and prompts the label was produced with
+    label = Column(Integer, nullable=False)
+    created_utc = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,18 @@
+from sqlalchemy import BigInteger, Column, DateTime, Integer, String, func
+from sqlalchemy.dialects.postgresql import JSONB
+from retrainer_app.core.db import Base
+
+class ReplayBufferSlot(Base):
+    __tablename__ = "replay_buffer"
+
+    label = Column(Integer, primary_key=True)
+    slot = Column(Integer, primary_key=True) # Position in the class's reservoir, below REPLAY_BUFFER_PER_CLASS
+    labelled_id = Column(Integer, nullable=False) # labelled_post_contents.id
+
+class ReplayBufferState(Base):
+    __tablename__ = "replay_buffer_state"
+
+    name = Column(String, primary_key=True)
+    last_id = Column(BigInteger, nullable=False, default=0) # Highest labelled row id already offered to the reservoirs
+    seen = Column(JSONB, nullable=False, default=dict) # Labelled rows offered so far, per class
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
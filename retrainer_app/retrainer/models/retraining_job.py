@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, Float, Text, Boolean, DateTime, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from retrainer_app.core.db import Base
+
+class RetrainingJob(Base):
+    __tablename__ = "retraining_jobs"
+
+    id = Column(String(32), primary_key=True)
+    status = Column(String, nullable=False, default="queued") # queued, running, succeeded, failed, cancelled
+    phase = Column(String, nullable=True) # loading_data, loading_model, training, registering, evaluating, promoting
+    step = Column(Integer, nullable=True)
+    total_steps = Column(Integer, nullable=True)
+    loss = Column(Float, nullable=True)
+    eta_seconds = Column(Float, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0) # Runs started, > 1 when resumed after an interruption
+    cancel_requested = Column(Boolean, nullable=False, default=False)
+    checkpoint_dir = Column(String, nullable=True)
+    snapshot_dir = Column(String, nullable=True) # Training snapshot of the first attempt, reused on resume
+    message = Column(Text, nullable=True)
+    result = Column(JSONB, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_retraining_jobs_active_created_at", "created_at", postgresql_where=status.in_(["queued", "running"])), # Job queue
+    )
@@ -1,9 +1,13 @@
 from sqlalchemy.orm import Session
+from retrainer_app.monitor.models.prediction import Prediction
 from retrainer_app.retrainer.models.labelled_post_content import LabelledPostContent
+from retrainer_app.retrainer.models.reddit_comment import RedditComment
+from retrainer_app.retrainer.models.reddit_post import RedditPost
 from retrainer_app.retrainer.schemas.labelled_post_content import LabelledPostContentCreate
-from sqlalchemy import func
+from sqlalchemy import String, and_, exists, func, insert, literal, tuple_
 from datetime import date, datetime, time, timedelta
-from typing import Optional
+from typing import Iterator, List, Optional, Set, Tuple
+from retrainer_app.core.config import settings
 
 
 class LabelledPostContentRepository:
@@ -17,21 +21,155 @@ class LabelledPostContentRepository:
         self.db.refresh(db_labelled_post_content)
         return db_labelled_post_content
 
+    def bulk_create(self, labelled_post_contents: List[LabelledPostContentCreate]) -> List[LabelledPostContent]:
+        if not labelled_post_contents:
+            return []
+        created = self.db.scalars(
+            insert(LabelledPostContent).returning(LabelledPostContent),
+            [content.model_dump() for content in labelled_post_contents]
+        ).all()
+        self.db.commit()
+        return created
+
     def get_all(self):
         return self.db.query(LabelledPostContent).all()
     
-    def get_labelled_posts_for_n_days(self, start_date: date, n_days: int = 1):
+    def get_unlabelled_post_ids(self, post_ids: List[str]) -> Set[str]:
+        """The given posts without a labelled post text, found by an anti-join on the partial post index."""
+        if not post_ids:
+            return set()
+        labelled = exists().where(
+            LabelledPostContent.text_type == 'post',
+            LabelledPostContent.post_id == RedditPost.post_id
+        )
+        rows = self.db.query(RedditPost.post_id).filter(RedditPost.post_id.in_(post_ids), ~labelled).all()
+        return {row.post_id for row in rows}
+
+    def iter_unlabelled_comments(self, post_ids: List[str], page_size: int = settings.COMMENT_PAGE_SIZE) -> Iterator[List[RedditComment]]:
+        """Yields the not yet labelled comments of the given posts in keyset-paginated pages."""
+        if not post_ids:
+            return
+        labelled = exists().where(LabelledPostContent.comment_id == RedditComment.comment_id)
+        last_id = None
+        while True:
+            query = self.db.query(RedditComment).filter(RedditComment.post_id.in_(post_ids), ~labelled)
+            if last_id is not None:
+                query = query.filter(RedditComment.id > last_id)
+            page = query.order_by(RedditComment.id).limit(page_size).all()
+            if not page:
+                return
+            last_id = page[-1].id
+            yield page
+
+    def get_labeling_candidates(self, post_ids: List[str], since: datetime) -> list:
+        """
+        The not yet labelled posts and comments of the given posts, each with its latest prediction
+        made since `since` (which also prunes the predictions partitions). Rows carry the stored
+        `text`, the `label_text` sent to the LLM, and the predicted `label` and `confidence_score`,
+        both None for items without such a prediction.
+        """
+        if not post_ids:
+            return []
+        post_labelled = exists().where(
+            LabelledPostContent.text_type == 'post',
+            LabelledPostContent.post_id == RedditPost.post_id
+        )
+        posts = self.db.query(
+            RedditPost.post_id,
+            literal(None, String).label("comment_id"),
+            literal('post').label("text_type"),
+            RedditPost.text.label("text"),
+            (func.coalesce(RedditPost.title, '') + ' -- ' + func.coalesce(RedditPost.text, '')).label("label_text"),
+            Prediction.label,
+            Prediction.confidence_score
+        ).outerjoin(
+            Prediction, and_(
+                Prediction.post_id == RedditPost.post_id,
+                Prediction.text_type == 'post',
+                Prediction.prediction_timestamp >= since
+            )
+        ).filter(
+            RedditPost.post_id.in_(post_ids),
+            ~post_labelled
+        ).distinct(RedditPost.post_id).order_by(RedditPost.post_id, Prediction.prediction_timestamp.desc()).all()
+
+        comment_labelled = exists().where(LabelledPostContent.comment_id == RedditComment.comment_id)
+        comments = self.db.query(
+            RedditComment.post_id,
+            RedditComment.comment_id,
+            literal('comment').label("text_type"),
+            RedditComment.body.label("text"),
+            RedditComment.body.label("label_text"),
+            Prediction.label,
+            Prediction.confidence_score
+        ).outerjoin(
+            Prediction, and_(Prediction.comment_id == RedditComment.comment_id, Prediction.prediction_timestamp >= since)
+        ).filter(
+            RedditComment.post_id.in_(post_ids),
+            ~comment_labelled
+        ).distinct(RedditComment.comment_id).order_by(RedditComment.comment_id, Prediction.prediction_timestamp.desc()).all()
+        return posts + comments
+
+    @staticmethod
+    def _period(start_date: date, n_days: int) -> Tuple[datetime, datetime]:
         period_start = datetime.combine(start_date, time.min)
         period_end = datetime.combine(start_date, time.max) + timedelta(days=n_days - 1)
+        return period_start, period_end
+
+    def get_labelled_posts_for_n_days(self, start_date: date, n_days: int = 1):
+        period_start, period_end = self._period(start_date, n_days)
         return self.db.query(LabelledPostContent).filter(
             LabelledPostContent.created_utc >= period_start,
             LabelledPostContent.created_utc <= period_end
         ).all()
 
-    def get_labelled_posts_by_date_range(self, start_date: Optional[datetime], end_date: Optional[datetime]):
+    def get_training_data_version(self, start_date: date, n_days: int = 1) -> Tuple[int, int]:
+        """Row count and highest id in the window: any insert or delete changes one of them."""
+        period_start, period_end = self._period(start_date, n_days)
+        count, max_id = self.db.query(func.count(LabelledPostContent.id), func.max(LabelledPostContent.id)).filter(
+            LabelledPostContent.created_utc >= period_start,
+            LabelledPostContent.created_utc <= period_end
+        ).one()
+        return count, max_id or 0
+
+    def iter_training_rows(self, start_date: date, n_days: int = 1, max_id: Optional[int] = None, page_size: int = settings.TRAINING_SNAPSHOT_PAGE_SIZE) -> Iterator[list]:
+        """Yields (id, text, label) rows of the window up to `max_id` in id order, one keyset page at a time."""
+        period_start, period_end = self._period(start_date, n_days)
+        last_id = 0
+        while True:
+            query = self.db.query(LabelledPostContent.id, LabelledPostContent.text, LabelledPostContent.label).filter(
+                LabelledPostContent.created_utc >= period_start,
+                LabelledPostContent.created_utc <= period_end,
+                LabelledPostContent.id > last_id
+            )
+            if max_id is not None:
+                query = query.filter(LabelledPostContent.id <= max_id)
+            page = query.order_by(LabelledPostContent.id).limit(page_size).all()
+            if not page:
+                return
+            last_id = page[-1].id
+            yield page
+
+    def get_labels_after(self, after_id: int, limit: int) -> list:
+        """(id, label) of the next `limit` labelled rows above `after_id`, in id order."""
+        return self.db.query(LabelledPostContent.id, LabelledPostContent.label).filter(
+            LabelledPostContent.id > after_id
+        ).order_by(LabelledPostContent.id).limit(limit).all()
+
+    def get_labelled_posts_by_date_range(
+        self,
+        start_date: Optional[datetime],
+        end_date: Optional[datetime],
+        after: Optional[Tuple[datetime, int]] = None,
+        limit: int = settings.PAGE_SIZE_DEFAULT,
+    ) -> Tuple[List[LabelledPostContent], bool]:
+        """Returns one keyset page on (created_utc, id), newest first, and whether more rows follow."""
         query = self.db.query(LabelledPostContent)
         if start_date:
             query = query.filter(LabelledPostContent.created_utc >= start_date)
         if end_date:
             query = query.filter(LabelledPostContent.created_utc < end_date + timedelta(days=1))
-        return query.order_by(LabelledPostContent.created_utc.desc()).all()
+        if after:
+            query = query.filter(tuple_(LabelledPostContent.created_utc, LabelledPostContent.id) < after)
+        rows = query.order_by(LabelledPostContent.created_utc.desc(), LabelledPostContent.id.desc()).limit(limit + 1).all()
+        return rows[:limit], len(rows) > limit
@@ -0,0 +1,28 @@
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from typing import Dict, Iterable
+from retrainer_app.retrainer.models.llm_label_cache import LLMLabelCache
+
+class LLMLabelCacheRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_labels(self, fingerprint: str, text_hashes: Iterable[str]) -> Dict[str, int]:
+        text_hashes = list(text_hashes)
+        if not text_hashes:
+            return {}
+        rows = self.db.query(LLMLabelCache.text_hash, LLMLabelCache.label).filter(
+            LLMLabelCache.fingerprint == fingerprint,
+            LLMLabelCache.text_hash.in_(text_hashes)
+        ).all()
+        return {row.text_hash: row.label for row in rows}
+
+    def save_labels(self, fingerprint: str, labels: Dict[str, int]) -> None:
+        if not labels:
+            return
+        self.db.execute(
+            pg_insert(LLMLabelCache).values([
+                {"text_hash": text_hash, "fingerprint": fingerprint, "label": label} for text_hash, label in labels.items()
+            ]).on_conflict_do_nothing(index_elements=[LLMLabelCache.text_hash, LLMLabelCache.fingerprint])
+        )
+        self.db.commit()
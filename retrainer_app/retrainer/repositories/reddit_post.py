@@ -2,7 +2,9 @@ from datetime import datetime, timedelta
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 from typing import List
+from retrainer_app.core.config import settings
 from retrainer_app.retrainer.models.reddit_post import RedditPost
+from retrainer_app.retrainer.models.reddit_comment import RedditComment
 from retrainer_app.retrainer.schemas.reddit_post import RedditPostCreate
 
 class RedditPostRepository:
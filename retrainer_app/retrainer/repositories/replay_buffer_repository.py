@@ -0,0 +1,64 @@
+from datetime import datetime
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from typing import Dict, Iterator
+from retrainer_app.core.config import settings
+from retrainer_app.retrainer.models.labelled_post_content import LabelledPostContent
+from retrainer_app.retrainer.models.replay_buffer import ReplayBufferSlot, ReplayBufferState
+
+REPLAY_BUFFER_NAME = "default"
+
+class ReplayBufferRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def lock_state(self) -> ReplayBufferState:
+        """Returns the buffer state, locking its row until the transaction ends so concurrent updates serialize."""
+        self.db.execute(pg_insert(ReplayBufferState).values(name=REPLAY_BUFFER_NAME, last_id=0, seen={}).on_conflict_do_nothing(index_elements=[ReplayBufferState.name]))
+        return self.db.query(ReplayBufferState).filter(ReplayBufferState.name == REPLAY_BUFFER_NAME).with_for_update().populate_existing().one()
+
+    def get_last_id(self) -> int:
+        return self.db.query(ReplayBufferState.last_id).filter(ReplayBufferState.name == REPLAY_BUFFER_NAME).scalar() or 0
+
+    def save_state(self, last_id: int, seen: Dict[str, int]) -> None:
+        self.db.query(ReplayBufferState).filter(ReplayBufferState.name == REPLAY_BUFFER_NAME).update(
+            {ReplayBufferState.last_id: last_id, ReplayBufferState.seen: seen, ReplayBufferState.updated_at: func.now()}, synchronize_session=False
+        )
+
+    def upsert_slots(self, label: int, slots: Dict[int, int]) -> None:
+        """Points each slot of the class's reservoir at a labelled row. Does not commit."""
+        if not slots:
+            return
+        statement = pg_insert(ReplayBufferSlot).values([
+            {"label": label, "slot": slot, "labelled_id": labelled_id} for slot, labelled_id in slots.items()
+        ])
+        self.db.execute(statement.on_conflict_do_update(
+            index_elements=[ReplayBufferSlot.label, ReplayBufferSlot.slot],
+            set_={"labelled_id": statement.excluded.labelled_id}
+        ))
+
+    def _rows_before(self, before: datetime, per_class: int):
+        # Slots above a lowered REPLAY_BUFFER_PER_CLASS are ignored rather than deleted
+        return self.db.query(LabelledPostContent).join(
+            ReplayBufferSlot, ReplayBufferSlot.labelled_id == LabelledPostContent.id
+        ).filter(
+            ReplayBufferSlot.slot < per_class,
+            LabelledPostContent.created_utc < before
+        )
+
+    def count_rows(self, before: datetime, per_class: int = settings.REPLAY_BUFFER_PER_CLASS) -> int:
+        """Buffered rows labelled before `before`, i.e. outside the new batch."""
+        return self._rows_before(before, per_class).with_entities(func.count(LabelledPostContent.id)).scalar()
+
+    def iter_rows(self, before: datetime, per_class: int = settings.REPLAY_BUFFER_PER_CLASS, page_size: int = settings.TRAINING_SNAPSHOT_PAGE_SIZE) -> Iterator[list]:
+        """Yields (id, text, label) of the buffered rows labelled before `before` in id order, one keyset page at a time."""
+        last_id = 0
+        while True:
+            page = self._rows_before(before, per_class).with_entities(
+                LabelledPostContent.id, LabelledPostContent.text, LabelledPostContent.label
+            ).filter(LabelledPostContent.id > last_id).order_by(LabelledPostContent.id).limit(page_size).all()
+            if not page:
+                return
+            last_id = page[-1].id
+            yield page
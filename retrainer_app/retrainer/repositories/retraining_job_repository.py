@@ -0,0 +1,84 @@
+import uuid
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from retrainer_app.retrainer.models.retraining_job import RetrainingJob
+
+ACTIVE_STATUSES = ("queued", "running")
+
+class RetrainingJobRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create(self, checkpoint_root: str) -> RetrainingJob:
+        job_id = uuid.uuid4().hex
+        job = RetrainingJob(id=job_id, status="queued", attempts=0, cancel_requested=False, checkpoint_dir=f"{checkpoint_root}/{job_id}")
+        self.db.add(job)
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[RetrainingJob]:
+        return self.db.get(RetrainingJob, job_id, populate_existing=True)
+
+    def get_recent(self, limit: int) -> List[RetrainingJob]:
+        return self.db.query(RetrainingJob).order_by(RetrainingJob.created_at.desc()).limit(limit).all()
+
+    def get_active(self) -> Optional[RetrainingJob]:
+        return self.db.query(RetrainingJob).filter(
+            RetrainingJob.status.in_(ACTIVE_STATUSES)
+        ).order_by(RetrainingJob.created_at).first()
+
+    def claim_next(self) -> Optional[RetrainingJob]:
+        """Marks the oldest queued job as running; SKIP LOCKED lets several workers share the queue."""
+        job = self.db.query(RetrainingJob).filter(
+            RetrainingJob.status == "queued"
+        ).order_by(RetrainingJob.created_at).with_for_update(skip_locked=True).first()
+        if job is None:
+            self.db.commit()
+            return None
+        job.status = "running"
+        job.attempts += 1
+        job.started_at = job.started_at or func.now()
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+
+    def requeue_running(self) -> int:
+        """Puts jobs left running by a stopped process back in the queue, to resume from their checkpoints."""
+        count = self.db.query(RetrainingJob).filter(RetrainingJob.status == "running").update(
+            {"status": "queued", "message": "Interrupted, resuming from the last checkpoint"}, synchronize_session=False
+        )
+        self.db.commit()
+        return count
+
+    def update(self, job_id: str, **fields) -> bool:
+        """Writes the fields and returns the job's cancel_requested flag, which another process may have set."""
+        cancel_requested = self.db.execute(
+            update(RetrainingJob).where(RetrainingJob.id == job_id).values(**fields).returning(RetrainingJob.cancel_requested)
+        ).scalar()
+        self.db.commit()
+        return bool(cancel_requested)
+
+    def is_cancel_requested(self, job_id: str) -> bool:
+        cancel_requested = self.db.query(RetrainingJob.cancel_requested).filter(RetrainingJob.id == job_id).scalar()
+        self.db.commit()
+        return bool(cancel_requested)
+
+    def finish(self, job_id: str, status: str, message: Optional[str] = None, result: Optional[dict] = None) -> None:
+        self.update(job_id, status=status, message=message, result=result, eta_seconds=None, finished_at=func.now())
+
+    def request_cancel(self, job_id: str) -> Optional[RetrainingJob]:
+        """Cancels a queued job at once; a running one stops at its next step or phase."""
+        job = self.db.query(RetrainingJob).filter(RetrainingJob.id == job_id).with_for_update().first()
+        if job is None:
+            self.db.commit()
+            return None
+        if job.status == "queued":
+            job.status = "cancelled"
+            job.finished_at = func.now()
+        if job.status in ACTIVE_STATUSES:
+            job.cancel_requested = True
+        self.db.commit()
+        self.db.refresh(job)
+        return job
@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+
+class LabelingReport(BaseModel):
+    candidates: int = 0 # Unlabelled items before LABELING_BUDGET was applied
+    items: int = 0
+    labeled: int = 0 # Distinct texts the LLM answered validly
+    failed: int = 0 # Distinct texts given the default label after all attempts
+    cache_hits: int = 0 # Items answered from the label cache
+    duplicates: int = 0 # Items repeating the text of another item in the same run
+    cache_hit_rate: float = 0.0 # Share of items that needed no LLM call (cache hits and duplicates)
+    requests: int = 0 # LLM requests, including retries
+    retries: int = 0
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+    cost_usd: float = 0.0
+    cost_per_item_usd: float = 0.0
+    seconds: float = 0.0
+    latency_per_item_ms: float = 0.0 # Wall time per item, with batching and concurrency
+    mean_request_latency_ms: float = 0.0
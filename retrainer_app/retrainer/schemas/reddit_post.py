@@ -1,13 +1,12 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import List
+from typing import Optional
 
 class RedditPostBase(BaseModel):
     post_id: str
     subreddit: str
     title: str
     text: str
-    comments: List[str] = []
     created_utc: datetime
     is_processed: bool = False
 
@@ -20,3 +19,15 @@ class RedditPost(RedditPostBase):
 
     class Config:
         from_attributes = True
+
+class RedditComment(BaseModel):
+    id: int
+    comment_id: str
+    post_id: str
+    parent_id: Optional[str] = None
+    author: Optional[str] = None
+    body: str
+    created_utc: datetime
+
+    class Config:
+        from_attributes = True
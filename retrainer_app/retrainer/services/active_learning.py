@@ -0,0 +1,113 @@
+import logging
+import math
+import sys
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.feature_extraction.text import HashingVectorizer
+from retrainer_app.core.config import settings
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(name)s - %(message)s",
+    handlers=[
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger(__name__)
+
+def uncertainty(confidence: Optional[float]) -> float:
+    """1 for a coin-flip prediction (confidence 0.5) or no prediction at all, 0 for a certain one."""
+    if confidence is None:
+        return 1.0
+    return min(1.0, max(0.0, 1.0 - abs(2.0 * confidence - 1.0)))
+
+class ActiveLearningSampler:
+    """
+    Picks at most `budget` labeling candidates out of the day's predicted posts and comments, so the
+    LLM cost is set by LABELING_BUDGET instead of by traffic.
+
+    Candidates need `label` and `confidence_score` (the model's prediction) and `label_text`.
+    Candidates never predicted (both None) count as maximally uncertain and form their own class.
+    The budget is first split into quotas per predicted class: each class gets at least
+    LABELING_MIN_CLASS_SHARE of it, so rare classes are not crowded out, and the rest in proportion.
+    Within a class, candidates are clustered on hashed word and bigram features
+    (LABELING_DIVERSITY_CLUSTERS clusters) and picked round-robin over the clusters, most uncertain
+    first, so the set covers different topics instead of many near-duplicates of one uncertain
+    thread. Budget left over by small classes goes to the remaining candidates the same way.
+    """
+
+    def __init__(
+        self,
+        budget: int = settings.LABELING_BUDGET,
+        min_class_share: float = settings.LABELING_MIN_CLASS_SHARE,
+        clusters: int = settings.LABELING_DIVERSITY_CLUSTERS,
+        seed: int = 42,
+    ):
+        self.budget = budget
+        self.min_class_share = min_class_share
+        self.clusters = max(1, clusters)
+        self.seed = seed
+
+    def class_quotas(self, class_counts: Dict[str, int]) -> Dict[str, int]:
+        """Reserves LABELING_MIN_CLASS_SHARE of the budget per class, then splits the rest by class size."""
+        share = min(self.min_class_share, 1.0 / len(class_counts))
+        reserved = {label: min(count, math.floor(self.budget * share)) for label, count in class_counts.items()}
+        left = self.budget - sum(reserved.values())
+        spare = {label: count - reserved[label] for label, count in class_counts.items()}
+        spare_total = sum(spare.values())
+        if not spare_total:
+            return reserved
+        return {label: reserved[label] + min(spare[label], math.floor(left * spare[label] / spare_total)) for label in class_counts}
+
+    def _cluster(self, texts: List[str]) -> np.ndarray:
+        features = HashingVectorizer(n_features=2 ** 18, ngram_range=(1, 2), alternate_sign=False).transform(texts)
+        n_clusters = min(self.clusters, len(texts))
+        if n_clusters < 2:
+            return np.zeros(len(texts), dtype=int)
+        return MiniBatchKMeans(n_clusters=n_clusters, random_state=self.seed, n_init=3, batch_size=1024).fit_predict(features)
+
+    @staticmethod
+    def _round_robin(indices: List[int], cluster_ids: np.ndarray, scores: List[float], k: int) -> List[int]:
+        """Takes `k` of `indices`, one per cluster per round, most uncertain first within each cluster."""
+        groups = defaultdict(list)
+        for index in sorted(indices, key=lambda i: -scores[i]):
+            groups[cluster_ids[index]].append(index)
+        # Clusters holding the most uncertain candidates go first in every round
+        queues = sorted(groups.values(), key=lambda group: -scores[group[0]])
+        picked: List[int] = []
+        round_index = 0
+        while len(picked) < k and queues:
+            queues = [queue for queue in queues if len(queue) > round_index]
+            for queue in queues:
+                if len(picked) == k:
+                    break
+                picked.append(queue[round_index])
+            round_index += 1
+        return picked
+
+    def select(self, candidates: Sequence) -> List:
+        if self.budget <= 0 or len(candidates) <= self.budget:
+            return list(candidates)
+        scores = [uncertainty(candidate.confidence_score) for candidate in candidates]
+        cluster_ids = self._cluster([candidate.label_text or "" for candidate in candidates])
+        by_class = defaultdict(list)
+        for index, candidate in enumerate(candidates):
+            by_class[candidate.label].append(index)
+        quotas = self.class_quotas({label: len(indices) for label, indices in by_class.items()})
+
+        selected: List[int] = []
+        for label, indices in by_class.items():
+            selected.extend(self._round_robin(indices, cluster_ids, scores, quotas[label]))
+        taken = set(selected)
+        remaining = [index for index in range(len(candidates)) if index not in taken]
+        selected.extend(self._round_robin(remaining, cluster_ids, scores, self.budget - len(selected)))
+
+        chosen = [candidates[index] for index in selected]
+        logger.info(
+            f"Selected {len(chosen)} of {len(candidates)} labeling candidates "
+            f"(per predicted class: {dict(Counter(candidate.label for candidate in chosen))}, "
+            f"mean uncertainty {np.mean([scores[index] for index in selected]):.3f} vs {np.mean(scores):.3f} overall)"
+        )
+        return chosen
@@ -0,0 +1,205 @@
+import hashlib
+import json
+import logging
+import sys
+import threading
+import time
+import unicodedata
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+from retrainer_app.core.config import settings
+from retrainer_app.retrainer.repositories.llm_label_cache_repository import LLMLabelCacheRepository
+from retrainer_app.retrainer.schemas.labeling import LabelingReport
+from retrainer_app.retrainer.services.labeling_engine import LabelingEngine
+from retrainer_app.retrainer.services.llm_client import LLMClient
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(name)s - %(message)s",
+    handlers=[
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger(__name__)
+
+BATCH_PROMPT = (
+    "Classify each of the following texts as either hate/offensive speech or neutral. "
+    "Label 1 if the text contains hate or offensive speech and 0 if it is neutral. "
+    "The texts are given as a JSON array of objects with an \"id\" and a \"text\". "
+    "Reply only with a JSON array containing one object per text, of the form {\"id\": <id>, \"label\": <0 or 1>}, "
+    "using the ids exactly as given.\n"
+    "Texts: "
+)
+
+# Identifies what produced a cached label: a new model, provider or prompt starts a fresh cache
+LABELING_FINGERPRINT = hashlib.sha256(f"{settings.LLM_PROVIDER}|{settings.LLM_MODEL}|{BATCH_PROMPT}".encode()).hexdigest()[:16]
+
+def normalize_text(text: Optional[str]) -> str:
+    """Unicode-normalized, case-folded text with whitespace collapsed, so trivial variants share a cache entry."""
+    return " ".join(unicodedata.normalize("NFKC", text or "").casefold().split())
+
+def text_hash(text: Optional[str]) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+def build_batch_prompt(batch: Sequence[Tuple[str, str]]) -> str:
+    return BATCH_PROMPT + json.dumps([{"id": item_id, "text": text} for item_id, text in batch], ensure_ascii=False)
+
+def parse_batch_response(response_text: str, expected_ids: Sequence[str]) -> Dict[str, int]:
+    """
+    Returns {id: label} for the valid entries of a batch answer. Entries with unknown or repeated
+    ids, or with a label other than 0/1, are dropped, so their items count as unanswered. A reply
+    that is not a JSON array yields nothing.
+    """
+    text = response_text.strip()
+    if text.startswith("```"):
+        # Models sometimes wrap JSON in a markdown code fence despite the instructions
+        text = text.strip("`").removeprefix("json").strip()
+    try:
+        answer = json.loads(text)
+    except ValueError:
+        return {}
+    if not isinstance(answer, list):
+        return {}
+    expected = set(expected_ids)
+    labels: Dict[str, int] = {}
+    duplicates = set()
+    for entry in answer:
+        if not isinstance(entry, dict):
+            continue
+        item_id, label = str(entry.get("id")), entry.get("label")
+        if isinstance(label, str) and label.strip() in ("0", "1"):
+            label = int(label)
+        if item_id not in expected or label not in (0, 1) or isinstance(label, bool):
+            continue
+        if item_id in labels:
+            duplicates.add(item_id)
+        labels[item_id] = label
+    for item_id in duplicates:
+        del labels[item_id]
+    return labels
+
+class BatchLabeler:
+    """
+    Labels texts LLM_BATCH_SIZE at a time: each request carries a JSON array of texts with short
+    stable ids and asks for a JSON array of {id, label} back. Answers are validated per item; items
+    missing from an answer, or whose batch answer was malformed, are re-sent in new batches, up to
+    LLM_BATCH_MAX_ATTEMPTS attempts per item. Batches run concurrently on the `LabelingEngine`, so
+    they share its rate limit and its backoff on 429/5xx.
+
+    With a `cache`, labels are content-addressed by the hash of the normalized text and the
+    LABELING_FINGERPRINT: texts labeled before (in any thread, on any day) are answered from the
+    cache, texts repeated within a call are sent once, and every new valid label is stored.
+
+    Token usage, cost (LLM_*_COST_PER_MILLION_TOKENS), latency and cache hits are accumulated over
+    all calls and summarised by `report()`.
+    """
+
+    def __init__(
+        self,
+        llm: LLMClient,
+        batch_size: int = settings.LLM_BATCH_SIZE,
+        max_attempts: int = settings.LLM_BATCH_MAX_ATTEMPTS,
+        engine: Optional[LabelingEngine] = None,
+        cache: Optional[LLMLabelCacheRepository] = None,
+        fingerprint: str = LABELING_FINGERPRINT,
+    ):
+        self.llm = llm
+        self.cache = cache
+        self.fingerprint = fingerprint
+        self.batch_size = max(1, batch_size)
+        self.max_attempts = max(1, max_attempts)
+        self.engine = engine or LabelingEngine(self._label_batch)
+        self._lock = threading.Lock()
+        self.items = 0
+        self.labeled = 0
+        self.failed = 0
+        self.cache_hits = 0
+        self.duplicates = 0
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+        self.request_seconds = 0.0
+        self.wall_seconds = 0.0
+
+    def _label_batch(self, prompt: str) -> str:
+        started = time.perf_counter()
+        response = self.llm.generate(prompt, json_output=True)
+        with self._lock:
+            self.prompt_tokens += response.prompt_tokens
+            self.output_tokens += response.output_tokens
+            self.request_seconds += time.perf_counter() - started
+        return response.text
+
+    def label(self, items: Sequence[Tuple[Hashable, str]]) -> Dict[Hashable, int]:
+        """
+        Labels every (key, text) item and returns {key: label}. Items never answered validly are left
+        out, so they stay unlabelled and are sent again by the next run.
+        """
+        started = time.perf_counter()
+        hashes = [text_hash(text) for _, text in items]
+        cached = self.cache.get_labels(self.fingerprint, set(hashes)) if self.cache else {}
+        # One request slot per distinct uncached text
+        to_send: Dict[str, str] = {}
+        for item_hash, (_, text) in zip(hashes, items):
+            if item_hash not in cached and item_hash not in to_send:
+                to_send[item_hash] = text
+
+        labels = self._label_texts(list(to_send.values()))
+        new_labels = {item_hash: labels[index] for index, item_hash in enumerate(to_send) if index in labels}
+        if self.cache:
+            self.cache.save_labels(self.fingerprint, new_labels)
+
+        with self._lock:
+            cache_hits = sum(1 for item_hash in hashes if item_hash in cached)
+            self.items += len(items)
+            self.cache_hits += cache_hits
+            self.duplicates += len(items) - cache_hits - len(to_send)
+            self.labeled += len(new_labels)
+            self.failed += len(to_send) - len(new_labels)
+            self.wall_seconds += time.perf_counter() - started
+        labels = {**cached, **new_labels}
+        return {key: labels[item_hash] for (key, _), item_hash in zip(items, hashes) if item_hash in labels}
+
+    def _label_texts(self, texts: List[str]) -> Dict[int, int]:
+        """Sends the texts in batches and returns {index: label} for the ones answered validly."""
+        # Ids are positions in `texts`: short, unique within the call and independent of batching
+        labels: Dict[str, int] = {}
+        pending: List[str] = [str(index) for index in range(len(texts))]
+        for attempt in range(1, self.max_attempts + 1):
+            if not pending:
+                break
+            batches = [pending[i:i + self.batch_size] for i in range(0, len(pending), self.batch_size)]
+            answers = self.engine.run(
+                [(batch_index, build_batch_prompt([(item_id, texts[int(item_id)]) for item_id in batch])) for batch_index, batch in enumerate(batches)],
+                default=""
+            )
+            for batch_index, batch in enumerate(batches):
+                labels.update(parse_batch_response(answers[batch_index], batch))
+            pending = [item_id for item_id in pending if item_id not in labels]
+            if pending and attempt < self.max_attempts:
+                logger.info(f"{len(pending)} items missing from the batch answers, retrying them (attempt {attempt + 1}/{self.max_attempts})")
+        if pending:
+            logger.warning(f"{len(pending)} items could not be labeled after {self.max_attempts} attempts")
+        return {int(item_id): label for item_id, label in labels.items()}
+
+    def report(self) -> LabelingReport:
+        cost = (
+            self.prompt_tokens * settings.LLM_INPUT_COST_PER_MILLION_TOKENS
+            + self.output_tokens * settings.LLM_OUTPUT_COST_PER_MILLION_TOKENS
+        ) / 1_000_000
+        engine_stats = self.engine.stats()
+        return LabelingReport(
+            items=self.items,
+            labeled=self.labeled,
+            failed=self.failed,
+            requests=engine_stats["requests"],
+            retries=engine_stats["retries"],
+            cache_hits=self.cache_hits,
+            duplicates=self.duplicates,
+            cache_hit_rate=(self.cache_hits + self.duplicates) / self.items if self.items else 0.0,
+            prompt_tokens=self.prompt_tokens,
+            output_tokens=self.output_tokens,
+            cost_usd=cost,
+            cost_per_item_usd=cost / self.items if self.items else 0.0,
+            seconds=self.wall_seconds,
+            latency_per_item_ms=1000 * self.wall_seconds / self.items if self.items else 0.0,
+            mean_request_latency_ms=1000 * self.request_seconds / engine_stats["requests"] if engine_stats["requests"] else 0.0,
+        )
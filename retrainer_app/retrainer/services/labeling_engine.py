@@ -0,0 +1,140 @@
+import logging
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Hashable, Optional, Sequence, Tuple, TypeVar
+from retrainer_app.core.config import settings
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(name)s - %(message)s",
+    handlers=[
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS_CODES = {408, 429}
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate_per_minute` tokens are added continuously, up to `burst`.
+    `acquire` blocks until a token is available, so all workers together stay within the quota.
+    """
+
+    def __init__(self, rate_per_minute: float, burst: Optional[float] = None):
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = burst if burst is not None else max(1.0, self.rate_per_second)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate_per_second)
+                self.updated_at = now
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                wait = (1.0 - self.tokens) / self.rate_per_second
+            time.sleep(wait)
+
+# One bucket per process: every labeling run shares the model's quota
+llm_rate_limiter = TokenBucket(settings.LLM_REQUESTS_PER_MINUTE)
+
+def status_code(error: Exception) -> Optional[int]:
+    """HTTP status of an LLM client error: google-genai errors carry `code`, httpx ones a `response`."""
+    for candidate in (getattr(error, "code", None), getattr(error, "status_code", None), getattr(getattr(error, "response", None), "status_code", None)):
+        if isinstance(candidate, int):
+            return candidate
+    return None
+
+def is_retryable(error: Exception) -> bool:
+    """Rate limiting (429), timeouts and server errors (5xx) are retried; other client errors are not."""
+    code = status_code(error)
+    if code is None:
+        return isinstance(error, (ConnectionError, TimeoutError))
+    return code in RETRYABLE_STATUS_CODES or code >= 500
+
+class LabelingEngine:
+    """
+    Runs a blocking LLM call over many items on a bounded thread pool. Every attempt first takes a
+    token from the shared `TokenBucket` (the model's requests-per-minute quota), and retryable
+    failures back off exponentially with full jitter, up to `max_retries` retries. Progress is
+    logged every `progress_every` items.
+    """
+
+    def __init__(
+        self,
+        call: Callable[[str], T],
+        concurrency: int = settings.LLM_CONCURRENCY,
+        rate_limiter: Optional[TokenBucket] = None,
+        max_retries: int = settings.LLM_MAX_RETRIES,
+        backoff_base: float = settings.LLM_BACKOFF_BASE_SECONDS,
+        backoff_max: float = settings.LLM_BACKOFF_MAX_SECONDS,
+        progress_every: int = 50,
+    ):
+        self.call = call
+        self.concurrency = max(1, concurrency)
+        self.rate_limiter = rate_limiter or llm_rate_limiter
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.progress_every = progress_every
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+
+    def _call_with_retries(self, text: str) -> T:
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire()
+            with self._lock:
+                self.requests += 1
+            try:
+                return self.call(text)
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+                logger.warning(f"LLM call failed ({e}), retrying in {delay:.1f}s (attempt {attempt + 1}/{self.max_retries})")
+                with self._lock:
+                    self.retries += 1
+                attempt += 1
+                time.sleep(delay)
+
+    def run(self, items: Sequence[Tuple[Hashable, str]], default: Optional[T] = None) -> Dict[Hashable, Optional[T]]:
+        """
+        Calls the LLM for every (key, text) item and returns {key: result}. Items whose call still
+        fails after the retries get `default`.
+        """
+        results: Dict[Hashable, Optional[T]] = {}
+        if not items:
+            return results
+        started = time.perf_counter()
+        done = 0
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="llm-labeling") as executor:
+            futures = [(key, executor.submit(self._call_with_retries, text)) for key, text in items]
+            for key, future in futures:
+                try:
+                    results[key] = future.result()
+                except Exception as e:
+                    logger.error(f"LLM call for {key} failed: {e}")
+                    with self._lock:
+                        self.failures += 1
+                    results[key] = default
+                done += 1
+                if done % self.progress_every == 0 or done == len(items):
+                    elapsed = time.perf_counter() - started
+                    logger.info(f"Labeled {done}/{len(items)} items in {elapsed:.1f}s ({done / elapsed:.1f} items/s)")
+        return results
+
+    def stats(self) -> Dict[str, int]:
+        return {"requests": self.requests, "retries": self.retries, "failures": self.failures}
@@ -0,0 +1,41 @@
+from dataclasses import dataclass
+from typing import Protocol
+from google import genai
+from retrainer_app.core.config import settings
+
+@dataclass
+class LLMResponse:
+    text: str
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+
+class LLMClient(Protocol):
+    def generate(self, prompt: str, json_output: bool = False) -> LLMResponse:
+        ...
+
+class GeminiLLM:
+    """Google GenAI client. API errors propagate, so callers can retry them."""
+
+    def __init__(self, api_key: str = settings.LLM_API_KEY, model: str = settings.LLM_MODEL):
+        self.client = genai.Client(api_key=api_key)
+        self.model = model
+
+    def generate(self, prompt: str, json_output: bool = False) -> LLMResponse:
+        response = self.client.models.generate_content(
+            model=self.model,
+            contents=prompt,
+            config={"response_mime_type": "application/json"} if json_output else None,
+        )
+        usage = response.usage_metadata
+        return LLMResponse(
+            text=response.text or "",
+            prompt_tokens=(usage.prompt_token_count or 0) if usage else 0,
+            output_tokens=(usage.candidates_token_count or 0) if usage else 0,
+        )
+
+def get_llm_client() -> LLMClient:
+    """The configured LLM_PROVIDER: "gemini", or "local" for the offline stand-in."""
+    if settings.LLM_PROVIDER == "local":
+        from retrainer_app.retrainer.utils.local_llm import LocalLLM
+        return LocalLLM()
+    return GeminiLLM()
@@ -0,0 +1,90 @@
+import logging
+import sys
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterator, Tuple
+import numpy as np
+from retrainer_app.core.config import settings
+from retrainer_app.retrainer.repositories.labelled_post_content_repository import LabelledPostContentRepository
+from retrainer_app.retrainer.repositories.replay_buffer_repository import ReplayBufferRepository
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(name)s - %(message)s",
+    handlers=[
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger(__name__)
+
+def reservoir_slots(ids: np.ndarray, seen: int, capacity: int, rng: np.random.Generator) -> Dict[int, int]:
+    """
+    Algorithm R over one page of a class's stream: the n-th row ever offered takes slot n-1 while
+    the reservoir fills, then replaces a uniformly chosen slot with probability capacity/n. Returns
+    {slot: id} with later rows winning, so the reservoir stays a uniform sample of every row seen.
+    """
+    positions = seen + np.arange(1, len(ids) + 1)
+    slots = np.where(positions <= capacity, positions - 1, np.floor(rng.random(len(ids)) * positions).astype(np.int64))
+    kept = slots < capacity
+    return dict(zip(slots[kept].tolist(), ids[kept].tolist()))
+
+class ReplayBuffer:
+    """
+    A bounded, stratified sample of the labelled history, replayed with each new batch so a retrain
+    does not forget what earlier batches taught. Every class keeps its own reservoir of at most
+    REPLAY_BUFFER_PER_CLASS rows, so a rare class is not crowded out by a frequent one.
+
+    The buffer holds row ids only. Labelled rows are append-only with increasing ids, so `update`
+    reads just the (id, label) pairs above the stored high-water mark, page by page, and moves the
+    mark in the same transaction as the slot changes: the cost of an update is the number of new
+    rows, not the size of the history.
+    """
+
+    def __init__(
+        self,
+        repository: ReplayBufferRepository,
+        labelled_post_content_repository: LabelledPostContentRepository,
+        per_class: int = settings.REPLAY_BUFFER_PER_CLASS,
+        page_size: int = settings.TRAINING_SNAPSHOT_PAGE_SIZE,
+    ):
+        self.repository = repository
+        self.labelled_post_content_repository = labelled_post_content_repository
+        self.per_class = per_class
+        self.page_size = page_size
+
+    def update(self) -> int:
+        """Offers the rows labelled since the last update to the reservoirs; returns their number."""
+        offered = 0
+        try:
+            while True:
+                state = self.repository.lock_state()
+                page = self.labelled_post_content_repository.get_labels_after(state.last_id, self.page_size)
+                if not page:
+                    break
+                seen = dict(state.seen or {})
+                # Seeded by the high-water mark, so rebuilding from the same history gives the same sample
+                rng = np.random.default_rng(state.last_id)
+                by_class = defaultdict(list)
+                for row in page:
+                    by_class[row.label].append(row.id)
+                for label, ids in by_class.items():
+                    self.repository.upsert_slots(label, reservoir_slots(np.asarray(ids, dtype=np.int64), seen.get(str(label), 0), self.per_class, rng))
+                    seen[str(label)] = seen.get(str(label), 0) + len(ids)
+                self.repository.save_state(page[-1].id, seen)
+                self.repository.db.commit()
+                offered += len(page)
+            self.repository.db.commit()
+        except Exception:
+            self.repository.db.rollback()
+            logger.error("Updating the replay buffer failed", exc_info=True)
+            raise
+        if offered:
+            logger.info(f"Offered {offered} labelled rows to the replay buffer (rows seen per class: {seen})")
+        return offered
+
+    def version(self, before: datetime) -> Tuple[int, int]:
+        """Rows replayed with a batch starting at `before`, and the high-water mark they were sampled up to."""
+        return self.repository.count_rows(before, self.per_class), self.repository.get_last_id()
+
+    def iter_rows(self, before: datetime) -> Iterator[list]:
+        return self.repository.iter_rows(before, self.per_class, self.page_size)
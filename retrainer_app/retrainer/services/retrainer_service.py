@@ -1,21 +1,38 @@
+import copy
 from datetime import datetime, timezone
 from math import log
-from typing import List, Optional
+import os
+import time
+from typing import Dict, List, Optional, Tuple
 from zoneinfo import ZoneInfo
 import mlflow
 import logging
 import sys
-from transformers import AutoModelForSequenceClassification, AutoTokenizer, Trainer, TrainingArguments
+from transformers import AutoModelForSequenceClassification, AutoTokenizer, DataCollatorWithPadding, Trainer, TrainingArguments
+from transformers.trainer_utils import get_last_checkpoint
 import numpy as np
+import torch
+from peft import PeftModel
 from sklearn.metrics import f1_score
 from sklearn.model_selection import train_test_split
 from retrainer_app.core.config import settings
+from retrainer_app.core.pagination import Page, decode_cursor, encode_cursor
 from retrainer_app.retrainer.repositories.reddit_post import RedditPostRepository
 from retrainer_app.retrainer.repositories.labelled_post_content_repository import LabelledPostContentRepository
+from retrainer_app.retrainer.repositories.llm_label_cache_repository import LLMLabelCacheRepository
+from retrainer_app.retrainer.repositories.replay_buffer_repository import ReplayBufferRepository
 from retrainer_app.retrainer.schemas.labelled_post_content import LabelledPostContent, LabelledPostContentCreate
-from retrainer_app.retrainer.schemas.reddit_post import RedditPostCreate
-from google import genai
-from retrainer_app.retrainer.utils.reddit_post_dataset import RedditPostDataset
+from retrainer_app.retrainer.schemas.reddit_post import RedditPost
+from retrainer_app.retrainer.schemas.labeling import LabelingReport
+from retrainer_app.retrainer.services.active_learning import ActiveLearningSampler
+from retrainer_app.retrainer.services.batch_labeler import BatchLabeler
+from retrainer_app.retrainer.services.llm_client import LLMClient, get_llm_client
+from retrainer_app.retrainer.services.replay_buffer import ReplayBuffer
+from retrainer_app.retrainer.services.retraining_job_context import RetrainingJobContext
+from retrainer_app.retrainer.services.snapshot_service import TrainingSnapshotService
+from retrainer_app.retrainer.utils.adapters import add_adapter, load_model_components, log_adapter, state_dict_size, trainable_parameters
+from retrainer_app.retrainer.utils.token_snapshot import SnapshotDataset
+from retrainer_app.retrainer.utils.training_callbacks import JobProgressCallback, TokenThroughputCallback
 
 logging.basicConfig(
     level=logging.INFO,
@@ -30,11 +47,21 @@ class RetrainerService:
     def __init__(
         self, 
         fetcher_repository: RedditPostRepository, 
-        labelled_post_content_repository: LabelledPostContentRepository
+        labelled_post_content_repository: LabelledPostContentRepository,
+        label_cache_repository: Optional[LLMLabelCacheRepository] = None,
+        replay_buffer_repository: Optional[ReplayBufferRepository] = None,
+        llm: Optional[LLMClient] = None
     ):
         self.fetcher_repository = fetcher_repository
         self.labelled_post_content_repository = labelled_post_content_repository
-        self.llm_client = genai.Client(api_key=settings.LLM_API_KEY)
+        self.label_cache_repository = label_cache_repository
+        # Without a replay buffer repository (or with REPLAY_BUFFER_PER_CLASS=0) only the new batch is trained on
+        replay_buffer = None
+        if replay_buffer_repository is not None and settings.REPLAY_BUFFER_PER_CLASS > 0:
+            replay_buffer = ReplayBuffer(replay_buffer_repository, labelled_post_content_repository)
+        self.snapshot_service = TrainingSnapshotService(labelled_post_content_repository, replay_buffer=replay_buffer)
+        self.llm = llm or get_llm_client()
+        self.last_labeling_report: Optional[LabelingReport] = None
         self.kyiv_tz = ZoneInfo("Europe/Kyiv")
 
 
@@ -47,103 +74,152 @@ class RetrainerService:
         today = datetime.now(self.kyiv_tz).date()
         return self.labelled_post_content_repository.get_labelled_posts_for_n_days(start_date=today, n_days=1)
 
-    def get_labelled_posts(self, start_date: Optional[str], end_date: Optional[str]) -> List[LabelledPostContent]:
+    def get_labelled_posts(self, start_date: Optional[str], end_date: Optional[str], cursor: Optional[str] = None, limit: int = settings.PAGE_SIZE_DEFAULT) -> Page[LabelledPostContent]:
         start_date_obj = datetime.strptime(start_date, "%Y-%m-%d") if start_date else None
         end_date_obj = datetime.strptime(end_date, "%Y-%m-%d") if end_date else None
-        return self.labelled_post_content_repository.get_labelled_posts_by_date_range(start_date_obj, end_date_obj)
+        posts, has_more = self.labelled_post_content_repository.get_labelled_posts_by_date_range(
+            start_date_obj, end_date_obj, after=decode_cursor(cursor), limit=limit
+        )
+        next_cursor = encode_cursor(posts[-1].created_utc, posts[-1].id) if has_more else None
+        return Page[LabelledPostContent](items=[LabelledPostContent.model_validate(p) for p in posts], next_cursor=next_cursor, limit=limit)
 
     def get_all_labelled_posts(self) -> List[LabelledPostContent]:
         return self.labelled_post_content_repository.get_all()
 
-    def label_posts(self, posts: List[RedditPostCreate]) -> List[LabelledPostContent]:
-        labelled_contents = []
-        # Get existing labelled content IDs to avoid re-labelling
-        existing_labelled_posts = self.labelled_post_content_repository.get_all()
-        existing_post_ids = {lp.post_id for lp in existing_labelled_posts if lp.text_type == 'post'}
-        existing_comment_ids = {lp.comment_id for lp in existing_labelled_posts if lp.text_type == 'comment' and lp.comment_id}
-        logger.info(f"Found {len(existing_post_ids) + len(existing_comment_ids)} existing labelled posts and comments.")
-
-        for post in posts:
-            # Label post text if not already labelled
-            if post.post_id not in existing_post_ids:
-                main_text = f"{post.title or ''} -- {post.text or ''}"
-                post_label = self.call_llm(main_text)
-                labelled_post_to_create = LabelledPostContentCreate(
-                    post_id=post.post_id,
-                    text=post.text,
-                    label=post_label,
-                    text_type='post',
-                    created_utc=datetime.now(self.kyiv_tz)
-                )
-                created_post = self.labelled_post_content_repository.create(labelled_post_to_create)
-                labelled_contents.append(created_post)
-
-            # Label comments if not already labelled
-            for i, comment_text in enumerate(post.comments):
-                comment_id_for_db = f"{post.post_id}_comment_{i}"
-                if comment_id_for_db not in existing_comment_ids:
-                    comment_label = self.call_llm(comment_text)
-                    labelled_comment_to_create = LabelledPostContentCreate(
-                        post_id=post.post_id,
-                        comment_id=comment_id_for_db,
-                        text=comment_text,
-                        label=comment_label,
-                        text_type='comment',
-                        created_utc=datetime.now(self.kyiv_tz)
-                    )
-                    created_comment = self.labelled_post_content_repository.create(labelled_comment_to_create)
-                    labelled_contents.append(created_comment)
-        logger.info(f"Labelled {len(labelled_contents)} posts and comments.")
+    def label_posts(self, posts: List[RedditPost]) -> List[LabelledPostContent]:
+        """Labels the posts and their comments; the run's cost and cache report is left in `last_labeling_report`."""
+        labeler = BatchLabeler(self.llm, cache=self.label_cache_repository)
+        if settings.LABELING_BUDGET > 0:
+            labelled_contents, candidates = self._label_sampled_posts(labeler, posts)
+        else:
+            labelled_contents = self._label_all_posts(labeler, posts)
+            candidates = len(labelled_contents)
+        self.last_labeling_report = labeler.report().model_copy(update={"candidates": candidates})
+        logger.info(f"Labelled {len(labelled_contents)} posts and comments: {self.last_labeling_report}")
         return labelled_contents
 
+    def _label_sampled_posts(self, labeler: BatchLabeler, posts: List[RedditPost]) -> Tuple[List[LabelledPostContent], int]:
+        """Labels the LABELING_BUDGET most useful unlabelled posts and comments, chosen from their predictions."""
+        if not posts:
+            return [], 0
+        # Predictions are made after the post is created, so its creation time bounds the partitions to read
+        since = min(post.created_utc for post in posts)
+        # The fetcher stores created_utc naive in server local time (datetime.fromtimestamp), which astimezone assumes
+        since = since.astimezone(timezone.utc)
+        candidates = self.labelled_post_content_repository.get_labeling_candidates([post.post_id for post in posts], since)
+        selected = ActiveLearningSampler().select(candidates)
+        labels = labeler.label([(index, item.label_text) for index, item in enumerate(selected)])
+        # Items the LLM never answered stay unlabelled, so a later run samples them again
+        labelled_contents = self.labelled_post_content_repository.bulk_create([
+            LabelledPostContentCreate(
+                post_id=item.post_id,
+                comment_id=item.comment_id,
+                text=item.text,
+                label=labels[index],
+                text_type=item.text_type,
+                created_utc=datetime.now(self.kyiv_tz)
+            )
+            for index, item in enumerate(selected)
+            if index in labels
+        ])
+        return labelled_contents, len(candidates)
 
-    def call_llm(self, text: str):
-        try:
-            response = self.llm_client.models.generate_content(
-                model="gemini-2.5-flash-lite-preview-06-17",
-                contents=f"Classify the following text as either hate/offensive speech or neutral. If the text contains hate or offensive speech, respond with 1. If the text is neutral, respond with 0. Only reply with a single number (1 or 0). Post: {text}"
+    def _label_all_posts(self, labeler: BatchLabeler, posts: List[RedditPost]) -> List[LabelledPostContent]:
+        labelled_contents = []
+        # Only the candidates without a label yet are fetched, so this scales with the batch, not the labelled history
+        unlabelled_post_ids = self.labelled_post_content_repository.get_unlabelled_post_ids([post.post_id for post in posts])
+        logger.info(f"{len(unlabelled_post_ids)} of {len(posts)} posts are not labelled yet.")
+
+        # Label post texts not labelled yet, several per LLM request with the requests running concurrently
+        posts_to_label = [post for post in posts if post.post_id in unlabelled_post_ids]
+        post_labels = labeler.label(
+            [(post.post_id, f"{post.title or ''} -- {post.text or ''}") for post in posts_to_label]
+        )
+        labelled_contents.extend(self.labelled_post_content_repository.bulk_create([
+            LabelledPostContentCreate(
+                post_id=post.post_id,
+                text=post.text,
+                label=post_labels[post.post_id],
+                text_type='post',
+                created_utc=datetime.now(self.kyiv_tz)
             )
-            response_text = response.text.strip()
-            if response_text in ['0', '1']:
-                return int(response_text)
-            else:
-                return 0 # Default to neutral if response is invalid
-        except Exception as e:
-            logger.error(f"Error calling LLM: {e}")
-            return 0 # Default to neutral on error
+            for post in posts_to_label
+            if post.post_id in post_labels
+        ]))
+
+        # Label comments not labelled yet, paging through large threads
+        for comments_to_label in self.labelled_post_content_repository.iter_unlabelled_comments([post.post_id for post in posts]):
+            comment_labels = labeler.label([(comment.comment_id, comment.body) for comment in comments_to_label])
+            labelled_contents.extend(self.labelled_post_content_repository.bulk_create([
+                LabelledPostContentCreate(
+                    post_id=comment.post_id,
+                    comment_id=comment.comment_id,
+                    text=comment.body,
+                    label=comment_labels[comment.comment_id],
+                    text_type='comment',
+                    created_utc=datetime.now(self.kyiv_tz)
+                )
+                for comment in comments_to_label
+                if comment.comment_id in comment_labels
+            ]))
+        return labelled_contents
 
 
-    def predict(self, model, dataset):
-        trainer = Trainer(model=model)
-        predictions = trainer.predict(dataset)
-        return np.argmax(predictions.predictions, axis=-1)
 
+    def predict(self, models: Dict[str, object], dataset: SnapshotDataset, batch_size: int = 64) -> Dict[str, np.ndarray]:
+        """
+        Predicts with several models in one pass over the dataset: each batch is collated once and
+        run through every model. Rows are batched by length, so little padding is computed.
+        """
+        collator = DataCollatorWithPadding(dataset.tokenizer)
+        order = np.argsort(dataset.lengths, kind="stable")
+        predictions = {name: np.zeros(len(dataset), dtype=np.int64) for name in models}
+        for model in models.values():
+            model.eval()
+        with torch.inference_mode():
+            for start in range(0, len(order), batch_size):
+                rows = order[start:start + batch_size]
+                batch = collator([dataset[int(row)] for row in rows])
+                for name, model in models.items():
+                    device = next(model.parameters()).device
+                    logits = model(input_ids=batch["input_ids"].to(device), attention_mask=batch["attention_mask"].to(device)).logits
+                    predictions[name][rows] = logits.argmax(dim=-1).cpu().numpy()
+        return predictions
 
-    def retrain_and_evaluate(self):
+    def retrain_and_evaluate(self, job: Optional[RetrainingJobContext] = None) -> dict:
+        """
+        Fine-tunes a challenger on today's labelled data and promotes it if it beats the champion.
+        Run by a background job, it reports its phases and training progress to `job`, checkpoints
+        every RETRAINING_CHECKPOINT_STEPS steps, resumes from the job's last checkpoint and
+        snapshot, and stops with `RetrainingCancelled` once the job is cancelled.
+        """
         mlflow.set_tracking_uri(settings.MLFLOW_TRACKING_URI)
 
         # 1. Fetch newly labeled data
+        if job:
+            job.phase("loading_data")
         today = datetime.now(self.kyiv_tz).date()
-        labelled_contents = self.labelled_post_content_repository.get_labelled_posts_for_n_days(start_date=today, n_days=1)
-        if len(labelled_contents) < 100: # Minimum data for training
-            logger.info("Not enough new data to retrain.")
-            return
-
-        texts = [content.text for content in labelled_contents]
-        labels = [content.label for content in labelled_contents]
+        # A resumed job trains on the snapshot it started with, whatever has been labelled since
+        if not (job and job.has_snapshot):
+            labelled_rows, _ = self.labelled_post_content_repository.get_training_data_version(start_date=today, n_days=1)
+            if labelled_rows == 0:
+                logger.info("No new labelled data to retrain on.")
+                return {"message": "No new labelled data to retrain on.", "promoted": False}
 
         # 2. Load current champion model and tokenizer using alias
+        if job:
+            job.phase("loading_model")
         client = mlflow.tracking.MlflowClient()
         champion_model_uri = None
         champion_version = None
+        champion_base_version = None
         
         try:
             champion_version = client.get_model_version_by_alias(name=settings.MLFLOW_MODEL_NAME, alias=settings.MLFLOW_CHAMPION_ALIAS)
             champion_model_uri = f"models:/{settings.MLFLOW_MODEL_NAME}/{champion_version.version}"
             
-            loaded_components = mlflow.transformers.load_model(champion_model_uri, return_type="components")
-            tokenizer = loaded_components['tokenizer']
-            model = loaded_components['model']
+            # An adapter champion loads as its pinned base version with the adapter on top
+            model, tokenizer, champion_base_version = load_model_components(champion_version)
             
             logger.info(f"Found production model version {champion_version.version}. Proceeding with retraining.")
         except mlflow.exceptions.MlflowException as e:
@@ -155,53 +231,114 @@ class RetrainerService:
                     model = AutoModelForSequenceClassification.from_pretrained(initial_model_path)
                 except OSError:
                     logger.error(f"Error: Initial model not found at {initial_model_path}. Please ensure the initial model is available.")
-                    return
+                    raise
             else:
                 raise e
 
         # 3. Create train and test datasets
         logger.info("Creating train and test datasets...")
-        X_train, X_test, y_train, y_test = train_test_split(texts, labels, test_size=0.2, random_state=42)
-        train_dataset = RedditPostDataset(X_train, y_train, tokenizer)
-        test_dataset = RedditPostDataset(X_test, y_test, tokenizer)
+        if job and job.has_snapshot:
+            snapshot = SnapshotDataset(job.snapshot_dir, tokenizer)
+        else:
+            # Today's rows plus the replay buffer's sample of earlier ones
+            snapshot = self.snapshot_service.get_or_build(start_date=today, n_days=1, tokenizer=tokenizer)
+            if len(snapshot) < settings.RETRAINING_MIN_ROWS:
+                logger.info("Not enough data to retrain.")
+                return {"message": "Not enough data to retrain.", "promoted": False}
+            if job:
+                job.set_snapshot(snapshot.directory)
+        train_indices, test_indices = train_test_split(np.arange(len(snapshot)), test_size=0.2, random_state=42)
+        train_dataset = snapshot.subset(train_indices)
+        test_dataset = snapshot.subset(test_indices)
         logger.info("Train and test datasets created successfully.")
         logger.info(f"Train dataset size: {len(train_dataset)}, Test dataset size: {len(test_dataset)}")
 
+        # The champion is fine-tuned in place: keep an untouched copy to evaluate, unless its
+        # predictions on this exact test set are cached from an earlier comparison
+        champion_key = f"champion-v{champion_version.version}" if champion_version else None
+        champion_preds = test_dataset.load_predictions(champion_key) if champion_key else None
+        champion_model = copy.deepcopy(model) if champion_key and champion_preds is None else None
+
         # 4. Fine-tune the model (create a challenger)
+        if job:
+            job.phase("training")
+        # Adapters are pinned to a full registered version: the champion, or the base under an adapter champion
+        base_version = champion_base_version or (champion_version.version if champion_version else None)
+        use_lora = settings.FINETUNE_MODE == "lora" and base_version is not None
+        if settings.FINETUNE_MODE == "lora" and not use_lora:
+            logger.warning("No registered base version to pin LoRA adapters to, fine-tuning the full initial model.")
+        if use_lora and not isinstance(model, PeftModel):
+            model = add_adapter(model)
+        elif not use_lora and isinstance(model, PeftModel):
+            # Back to full fine-tuning from an adapter champion: merge it and unfreeze the base weights
+            model = model.merge_and_unload()
+            model.requires_grad_(True)
+        finetune_mode = "lora" if use_lora else "full"
+        trainable = trainable_parameters(model)
+        logger.info(f"Fine-tuning mode {finetune_mode}: {trainable} trainable parameters")
+        output_dir = job.checkpoint_dir if job else settings.RETRAINING_CHECKPOINT_DIR
         training_args = TrainingArguments(
-            output_dir="./results",
+            output_dir=output_dir,
             num_train_epochs=1,
+            learning_rate=settings.LORA_LEARNING_RATE if use_lora else 5e-5,
             per_device_train_batch_size=32,
             per_device_eval_batch_size=32,
             warmup_steps=5,
             weight_decay=0.01,
             logging_dir="./logs",
+            group_by_length=True, # Batches of similar lengths, so dynamic padding adds little
+            include_num_input_tokens_seen=True,
+            logging_steps=10,
+            save_strategy="steps",
+            save_steps=settings.RETRAINING_CHECKPOINT_STEPS,
+            save_total_limit=2,
         )
 
+        throughput = TokenThroughputCallback(train_dataset.num_tokens)
         trainer = Trainer(
             model=model,
             args=training_args,
             train_dataset=train_dataset,
-            eval_dataset=test_dataset
+            eval_dataset=test_dataset,
+            data_collator=DataCollatorWithPadding(tokenizer),
+            callbacks=[throughput, JobProgressCallback(job)] if job else [throughput]
         )
-        logger.info("Starting model training...")
+        resume_from = get_last_checkpoint(output_dir) if job and os.path.isdir(output_dir) else None
+        logger.info(f"Resuming model training from {resume_from}..." if resume_from else "Starting model training...")
 
-        trainer.train()
+        trainer.train(resume_from_checkpoint=resume_from)
+        if job:
+            job.check_cancelled()
         
-        logger.info("Model training completed successfully.")
+        logger.info(
+            f"Model training completed successfully in {throughput.metrics['train_seconds']:.1f}s: "
+            f"{throughput.metrics['train_tokens_per_second']:.0f} tokens/s, "
+            f"{throughput.metrics['train_padding_share']:.1%} padding."
+        )
 
         # 5. Save challenger model to MLflow and register a new version
+        if job:
+            job.phase("registering")
         challenger_version = None
         with mlflow.start_run() as run:
             logger.info("Logging and registering challenger model...")
-            model_info = mlflow.transformers.log_model(
-                transformers_model={"model": model, "tokenizer": tokenizer},
-                task='text-classification',
-                registered_model_name=settings.MLFLOW_MODEL_NAME,
-            )
-            challenger_version = model_info.registered_model_version
-            challenger_model_uri = model_info.model_uri
-            logger.info(f"Challenger model registered as version {challenger_version} at {challenger_model_uri}")
+            mlflow.log_metrics(throughput.metrics)
+            mlflow.log_params({"finetune_mode": finetune_mode, "base_model_version": base_version if use_lora else None})
+            if use_lora:
+                # Only the adapter weights, registered against the base version they apply to
+                challenger_version, artifact_bytes = log_adapter(client, model, base_version, run)
+                challenger_model_uri = f"models:/{settings.MLFLOW_MODEL_NAME}/{challenger_version}"
+            else:
+                model_info = mlflow.transformers.log_model(
+                    transformers_model={"model": model, "tokenizer": tokenizer},
+                    task='text-classification',
+                    registered_model_name=settings.MLFLOW_MODEL_NAME,
+                )
+                challenger_version = model_info.registered_model_version
+                challenger_model_uri = model_info.model_uri
+                artifact_bytes = state_dict_size(model)
+            mlflow.log_metrics({"artifact_bytes": artifact_bytes, "trainable_parameters": trainable})
+            logger.info(f"Challenger model registered as version {challenger_version} at {challenger_model_uri} ({artifact_bytes / 1e6:.1f} MB)")
 
         # If no champion, promote challenger directly to production
         if not champion_model_uri:
@@ -211,20 +348,35 @@ class RetrainerService:
                 alias=settings.MLFLOW_CHAMPION_ALIAS,
                 version=challenger_version
             )
-            return
+            return {
+                "message": "No champion model, promoted the challenger.",
+                "promoted": True,
+                "challenger_version": challenger_version,
+                "finetune_mode": finetune_mode,
+                "artifact_bytes": artifact_bytes,
+                "train_seconds": throughput.metrics["train_seconds"],
+            }
         logger.info(f"Challenger model saved with version {challenger_version} at {challenger_model_uri}")
 
         # 6. Evaluate champion and challenger
-        champion_components = mlflow.transformers.load_model(champion_model_uri, return_type="components")
-        champion_model = champion_components['model']
-        
-        challenger_components = mlflow.transformers.load_model(challenger_model_uri, return_type="components")
-        challenger_model = challenger_components['model']
-
-        champion_preds = self.predict(champion_model, test_dataset)
-        challenger_preds = self.predict(challenger_model, test_dataset)
+        if job:
+            job.phase("evaluating")
+        # Both models are already in memory: the challenger is the model just trained
+        started = time.perf_counter()
+        models = {"challenger": model} if champion_model is None else {"champion": champion_model, "challenger": model}
+        predictions = self.predict(models, test_dataset)
+        challenger_preds = predictions["challenger"]
+        champion_cached = champion_model is None
+        if not champion_cached:
+            champion_preds = predictions["champion"]
+            test_dataset.save_predictions(champion_key, champion_preds)
+            del champion_model
+        logger.info(
+            f"Evaluated on {len(test_dataset)} test rows in {time.perf_counter() - started:.1f}s "
+            f"({'champion predictions cached' if champion_cached else 'champion and challenger in one pass'})"
+        )
 
-        true_labels = [item['labels'].item() for item in test_dataset]
+        true_labels = test_dataset.labels
 
         champion_f1 = f1_score(true_labels, champion_preds)
         challenger_f1 = f1_score(true_labels, challenger_preds)
@@ -233,7 +385,10 @@ class RetrainerService:
         logger.info(f"Challenger F1 score: {challenger_f1}")
 
         # 7. Promote the winner
-        if challenger_f1 > champion_f1:
+        if job:
+            job.phase("promoting")
+        promoted = challenger_f1 > champion_f1
+        if promoted:
             logger.info(f"Promoting challenger to Production. Old champion version: {champion_version.version}")
             # Set the new champion
             client.set_registered_model_alias(
@@ -249,3 +404,15 @@ class RetrainerService:
             )
         else:
             logger.info("Champion remains in Production.")
+        return {
+            "message": "Challenger promoted to Production." if promoted else "Champion remains in Production.",
+            "promoted": promoted,
+            "champion_version": champion_version.version,
+            "challenger_version": challenger_version,
+            "champion_f1": champion_f1,
+            "challenger_f1": challenger_f1,
+            "champion_predictions_cached": champion_cached,
+            "finetune_mode": finetune_mode,
+            "artifact_bytes": artifact_bytes,
+            "train_seconds": throughput.metrics["train_seconds"],
+        }
@@ -0,0 +1,81 @@
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Optional
+from retrainer_app.core.config import settings
+from retrainer_app.retrainer.repositories.retraining_job_repository import RetrainingJobRepository
+from retrainer_app.retrainer.utils.token_snapshot import META_FILE
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(name)s - %(message)s",
+    handlers=[
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger(__name__)
+
+class RetrainingCancelled(Exception):
+    pass
+
+class RetrainingJobContext:
+    """
+    What `retrain_and_evaluate` sees of the background job running it: where to checkpoint, the
+    snapshot to resume with, and where to report the phase and training progress. Progress is
+    written at most every `progress_interval` seconds. Cancellation sets an in-process event, checked
+    at every phase change and training step; a cancel recorded in the job's row by another process
+    is picked up whenever the job checks it or writes progress.
+    """
+
+    def __init__(
+        self,
+        job_id: str,
+        repository: RetrainingJobRepository,
+        checkpoint_dir: str,
+        snapshot_dir: Optional[str] = None,
+        cancel_event: Optional[threading.Event] = None,
+        progress_interval: float = settings.RETRAINING_PROGRESS_INTERVAL_SECONDS,
+    ):
+        self.job_id = job_id
+        self.repository = repository
+        self.checkpoint_dir = checkpoint_dir
+        self.snapshot_dir = snapshot_dir
+        self.cancel_event = cancel_event or threading.Event()
+        self.progress_interval = progress_interval
+        self._last_progress_at = 0.0
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    @property
+    def has_snapshot(self) -> bool:
+        return bool(self.snapshot_dir) and os.path.exists(os.path.join(self.snapshot_dir, META_FILE))
+
+    def check_cancelled(self) -> None:
+        if not self.cancelled and self.repository.is_cancel_requested(self.job_id):
+            self.cancel_event.set()
+        if self.cancelled:
+            raise RetrainingCancelled(f"Retraining job {self.job_id} was cancelled")
+
+    def phase(self, phase: str) -> None:
+        self.check_cancelled()
+        logger.info(f"Retraining job {self.job_id}: {phase}")
+        self._update(phase=phase)
+
+    def set_snapshot(self, snapshot_dir: str) -> None:
+        self.snapshot_dir = snapshot_dir
+        self._update(snapshot_dir=snapshot_dir)
+
+    def training_progress(self, step: int, total_steps: int, loss: Optional[float], eta_seconds: Optional[float], force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._last_progress_at < self.progress_interval:
+            return
+        self._last_progress_at = now
+        self._update(step=step, total_steps=total_steps, loss=loss, eta_seconds=eta_seconds)
+
+    def _update(self, **fields) -> None:
+        if self.repository.update(self.job_id, **fields):
+            self.cancel_event.set()
@@ -0,0 +1,194 @@
+import logging
+import shutil
+import sys
+import threading
+import time
+from typing import Callable, List, Optional
+from sqlalchemy.orm import Session
+from retrainer_app.core.config import settings
+from retrainer_app.core.db import SessionLocal
+from retrainer_app.retrainer.repositories.labelled_post_content_repository import LabelledPostContentRepository
+from retrainer_app.retrainer.repositories.llm_label_cache_repository import LLMLabelCacheRepository
+from retrainer_app.retrainer.repositories.reddit_post import RedditPostRepository
+from retrainer_app.retrainer.repositories.replay_buffer_repository import ReplayBufferRepository
+from retrainer_app.retrainer.repositories.retraining_job_repository import RetrainingJobRepository
+from retrainer_app.retrainer.schemas.retraining_job import RetrainingJob
+from retrainer_app.retrainer.services.retrainer_service import RetrainerService
+from retrainer_app.retrainer.services.retraining_job_context import RetrainingCancelled, RetrainingJobContext
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(name)s - %(message)s",
+    handlers=[
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ("succeeded", "failed", "cancelled")
+
+class RetrainingJobManager:
+    """
+    Runs `retrain_and_evaluate` as background jobs, one at a time, on a worker thread. Jobs are
+    rows in `retraining_jobs`, so their status survives the request that submitted them and a
+    restart of the service: jobs found running at startup were interrupted and are queued again,
+    and resume from their last checkpoint and training snapshot.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        checkpoint_root: str = settings.RETRAINING_CHECKPOINT_DIR,
+        poll_interval: float = 5.0,
+    ):
+        self.session_factory = session_factory
+        self.checkpoint_root = checkpoint_root
+        self.poll_interval = poll_interval
+        self._wakeup = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._current_job_id: Optional[str] = None
+        self._current_cancel_event: Optional[threading.Event] = None
+        self._finished = threading.Condition()
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> bool:
+        if self.is_running:
+            return False
+        db = self.session_factory()
+        try:
+            requeued = RetrainingJobRepository(db).requeue_running()
+        finally:
+            db.close()
+        if requeued:
+            logger.info(f"Requeued {requeued} interrupted retraining job(s)")
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self.run_forever, name="retraining-jobs", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self, timeout: float = 30.0) -> bool:
+        """Stops the worker. A job still training is left running in the table and resumes on the next start."""
+        if not self.is_running:
+            return False
+        self._stop_event.set()
+        self._wakeup.set()
+        self._thread.join(timeout=timeout)
+        return True
+
+    def submit(self) -> RetrainingJob:
+        """Queues a retraining job, or returns the queued or running one: only one runs at a time."""
+        db = self.session_factory()
+        try:
+            repository = RetrainingJobRepository(db)
+            job = repository.get_active() or repository.create(self.checkpoint_root)
+            response = RetrainingJob.model_validate(job)
+        finally:
+            db.close()
+        self._wakeup.set()
+        return response
+
+    def get(self, job_id: str) -> Optional[RetrainingJob]:
+        db = self.session_factory()
+        try:
+            job = RetrainingJobRepository(db).get(job_id)
+            return RetrainingJob.model_validate(job) if job else None
+        finally:
+            db.close()
+
+    def list_recent(self, limit: int = 20) -> List[RetrainingJob]:
+        db = self.session_factory()
+        try:
+            return [RetrainingJob.model_validate(job) for job in RetrainingJobRepository(db).get_recent(limit)]
+        finally:
+            db.close()
+
+    def cancel(self, job_id: str) -> Optional[RetrainingJob]:
+        db = self.session_factory()
+        try:
+            job = RetrainingJobRepository(db).request_cancel(job_id)
+            response = RetrainingJob.model_validate(job) if job else None
+        finally:
+            db.close()
+        with self._lock:
+            if job_id == self._current_job_id and self._current_cancel_event is not None:
+                self._current_cancel_event.set()
+        return response
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[RetrainingJob]:
+        """Blocks until the job reaches a terminal status (or `timeout` passes) and returns it."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            if job is None or job.status in TERMINAL_STATUSES:
+                return job
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return job
+            # Woken when a local job finishes; polling covers jobs run by another process
+            with self._finished:
+                self._finished.wait(self.poll_interval if remaining is None else min(self.poll_interval, remaining))
+
+    def run_forever(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                ran = self.run_next()
+            except Exception as e:
+                logger.error(f"Retraining job worker failed: {e}", exc_info=True)
+                ran = False
+            if not ran:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    def run_next(self) -> bool:
+        """Claims and runs the oldest queued job; returns False if there was none."""
+        db = self.session_factory()
+        try:
+            repository = RetrainingJobRepository(db)
+            job = repository.claim_next()
+            if job is None:
+                return False
+            cancel_event = threading.Event()
+            if job.cancel_requested:
+                cancel_event.set()
+            with self._lock:
+                self._current_job_id, self._current_cancel_event = job.id, cancel_event
+            context = RetrainingJobContext(job.id, repository, job.checkpoint_dir, job.snapshot_dir, cancel_event)
+            logger.info(f"Running retraining job {job.id} (attempt {job.attempts})")
+            try:
+                result = self._run(context)
+            except RetrainingCancelled as e:
+                logger.info(str(e))
+                repository.finish(job.id, "cancelled", message="Cancelled")
+            except Exception as e:
+                logger.error(f"Retraining job {job.id} failed: {e}", exc_info=True)
+                db.rollback()
+                repository.finish(job.id, "failed", message=str(e))
+            else:
+                repository.finish(job.id, "succeeded", message=result.get("message"), result=result)
+            # Checkpoints only matter to an interrupted job
+            shutil.rmtree(job.checkpoint_dir, ignore_errors=True)
+            return True
+        finally:
+            with self._lock:
+                self._current_job_id, self._current_cancel_event = None, None
+            db.close()
+            with self._finished:
+                self._finished.notify_all()
+
+    def _run(self, context: RetrainingJobContext) -> dict:
+        db = self.session_factory()
+        try:
+            service = RetrainerService(
+                RedditPostRepository(db),
+                LabelledPostContentRepository(db),
+                LLMLabelCacheRepository(db),
+                ReplayBufferRepository(db)
+            )
+            return service.retrain_and_evaluate(job=context)
+        finally:
+            db.close()
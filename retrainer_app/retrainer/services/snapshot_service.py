@@ -0,0 +1,95 @@
+import logging
+import os
+import shutil
+import sys
+from datetime import date
+from typing import Optional
+from retrainer_app.core.config import settings
+from retrainer_app.retrainer.repositories.labelled_post_content_repository import LabelledPostContentRepository
+from retrainer_app.retrainer.services.replay_buffer import ReplayBuffer
+from retrainer_app.retrainer.utils.token_snapshot import META_FILE, SnapshotDataset, SnapshotWriter, tokenizer_fingerprint
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(name)s - %(message)s",
+    handlers=[
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger(__name__)
+
+class TrainingSnapshotService:
+    """
+    Builds and reuses pre-tokenized snapshots of the labelled data under TRAINING_SNAPSHOT_DIR.
+    A snapshot is named by its data range (first day and number of days), the row count and highest
+    row id in that range, and the tokenizer fingerprint, so it is rebuilt only when labelled rows
+    are added or removed or the tokenizer changes; otherwise every run opens the same files.
+
+    With a `replay_buffer`, the snapshot holds the range (the new batch) followed by the buffered
+    rows labelled before it, and its name also carries the replayed row count and the buffer's
+    high-water mark.
+    """
+
+    def __init__(
+        self,
+        labelled_post_content_repository: LabelledPostContentRepository,
+        directory: str = settings.TRAINING_SNAPSHOT_DIR,
+        max_len: int = 512,
+        keep: int = settings.TRAINING_SNAPSHOT_KEEP,
+        replay_buffer: Optional[ReplayBuffer] = None,
+    ):
+        self.labelled_post_content_repository = labelled_post_content_repository
+        self.replay_buffer = replay_buffer
+        self.directory = directory
+        self.max_len = max_len
+        self.keep = keep
+
+    def get_or_build(self, start_date: date, n_days: int, tokenizer) -> SnapshotDataset:
+        rows, max_id = self.labelled_post_content_repository.get_training_data_version(start_date, n_days)
+        period_start, _ = LabelledPostContentRepository._period(start_date, n_days)
+        replay_rows, replay_last_id = 0, 0
+        if self.replay_buffer:
+            self.replay_buffer.update()
+            replay_rows, replay_last_id = self.replay_buffer.version(before=period_start)
+        fingerprint = tokenizer_fingerprint(tokenizer, self.max_len)
+        name = f"{start_date:%Y%m%d}-{n_days}d-{rows}-{max_id}-r{replay_rows}-{replay_last_id}-{fingerprint}"
+        path = os.path.join(self.directory, name)
+        if os.path.exists(os.path.join(path, META_FILE)):
+            logger.info(f"Reusing training snapshot {name}")
+            return SnapshotDataset(path, tokenizer)
+
+        logger.info(f"Building training snapshot {name} from {rows} new and {replay_rows} replayed labelled rows...")
+        os.makedirs(self.directory, exist_ok=True)
+        writer = SnapshotWriter(path, tokenizer, self.max_len)
+        try:
+            for page in self.labelled_post_content_repository.iter_training_rows(start_date, n_days, max_id=max_id):
+                writer.add([row.id for row in page], [row.text for row in page], [row.label for row in page])
+            if self.replay_buffer:
+                for page in self.replay_buffer.iter_rows(before=period_start):
+                    writer.add([row.id for row in page], [row.text for row in page], [row.label for row in page])
+            writer.close({
+                "start_date": start_date.isoformat(),
+                "n_days": n_days,
+                "max_id": max_id,
+                "new_rows": rows,
+                "replay_last_id": replay_last_id,
+                "tokenizer_fingerprint": fingerprint,
+                "max_len": self.max_len,
+            })
+        except Exception:
+            writer.abort()
+            raise
+        self._prune(keep_name=name)
+        return SnapshotDataset(path, tokenizer)
+
+    def _prune(self, keep_name: str) -> None:
+        """Removes all but the `keep` most recently built snapshots."""
+        snapshots = [
+            entry for entry in os.scandir(self.directory)
+            if entry.is_dir() and os.path.exists(os.path.join(entry.path, META_FILE))
+        ]
+        snapshots.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+        for entry in snapshots[max(1, self.keep):]:
+            if entry.name != keep_name:
+                logger.info(f"Removing old training snapshot {entry.name}")
+                shutil.rmtree(entry.path, ignore_errors=True)
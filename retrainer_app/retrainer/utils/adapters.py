@@ -0,0 +1,71 @@
+import os
+import tempfile
+from typing import Optional, Tuple
+import mlflow
+from peft import LoraConfig, PeftModel, TaskType, get_peft_model
+from retrainer_app.core.config import settings
+
+# Model version tags of an adapter version: its weights only make sense on top of the pinned base version
+FINETUNE_MODE_TAG = "finetune_mode"
+BASE_VERSION_TAG = "base_model_version"
+
+def is_adapter_version(model_version) -> bool:
+    return (model_version.tags or {}).get(FINETUNE_MODE_TAG) == "lora"
+
+def lora_config() -> LoraConfig:
+    # Sequence classification keeps the new classifier head trainable and saves it with the adapter
+    return LoraConfig(
+        task_type=TaskType.SEQ_CLS,
+        r=settings.LORA_RANK,
+        lora_alpha=settings.LORA_ALPHA,
+        lora_dropout=settings.LORA_DROPOUT,
+        target_modules=[module.strip() for module in settings.LORA_TARGET_MODULES.split(",") if module.strip()],
+    )
+
+def add_adapter(model):
+    """Wraps a full model for LoRA training: only the adapters and the classifier head are trainable."""
+    return get_peft_model(model, lora_config())
+
+def trainable_parameters(model) -> int:
+    return sum(parameter.numel() for parameter in model.parameters() if parameter.requires_grad)
+
+def directory_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+def state_dict_size(model) -> int:
+    """Bytes of a full model's weights, about the size of its logged safetensors file."""
+    return sum(tensor.numel() * tensor.element_size() for tensor in model.state_dict().values())
+
+def load_model_components(model_version) -> Tuple[object, object, Optional[str]]:
+    """
+    Loads a registered version as (model, tokenizer, base version). A full version loads as logged,
+    with no base version. An adapter version loads its pinned base version with the adapter on top,
+    still trainable, so a LoRA retrain continues from it against the same base.
+    """
+    name = model_version.name
+    if not is_adapter_version(model_version):
+        components = mlflow.transformers.load_model(f"models:/{name}/{model_version.version}", return_type="components")
+        return components["model"], components["tokenizer"], None
+    base_version = model_version.tags[BASE_VERSION_TAG]
+    components = mlflow.transformers.load_model(f"models:/{name}/{base_version}", return_type="components")
+    with tempfile.TemporaryDirectory() as directory:
+        adapter_dir = mlflow.artifacts.download_artifacts(artifact_uri=f"models:/{name}/{model_version.version}", dst_path=directory)
+        model = PeftModel.from_pretrained(components["model"], adapter_dir, is_trainable=True)
+    return model, components["tokenizer"], base_version
+
+def log_adapter(client: mlflow.tracking.MlflowClient, model, base_version: str, run) -> Tuple[str, int]:
+    """
+    Logs only the adapter weights of a LoRA model to `run` and registers them as a new version
+    tagged with the base version they apply to. Returns the version and the adapter's size in bytes.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        model.save_pretrained(directory)
+        size = directory_size(directory)
+        mlflow.log_artifacts(directory, artifact_path="adapter")
+    model_version = client.create_model_version(
+        name=settings.MLFLOW_MODEL_NAME,
+        source=f"{run.info.artifact_uri}/adapter",
+        run_id=run.info.run_id,
+        tags={FINETUNE_MODE_TAG: "lora", BASE_VERSION_TAG: str(base_version)},
+    )
+    return model_version.version, size
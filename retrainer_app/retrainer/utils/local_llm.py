@@ -0,0 +1,45 @@
+import json
+import random
+import re
+import time
+from typing import Iterable, Optional
+from retrainer_app.retrainer.services.llm_client import LLMResponse
+
+DEFAULT_OFFENSIVE_TERMS = ("hate", "idiot", "stupid", "kill", "scum", "trash", "moron", "disgusting")
+
+class LocalLLM:
+    """
+    Offline stand-in for the labeling LLM (LLM_PROVIDER=local), for tests, benchmarks and runs
+    without an API key. Labels batch prompts by keyword match and answers with a JSON array. It can
+    simulate latency, items missing from batch answers and malformed answers, so the retry paths
+    can be exercised. Token counts are estimated at four characters per token.
+    """
+
+    def __init__(
+        self,
+        latency_seconds: float = 0.0,
+        drop_rate: float = 0.0,
+        malformed_rate: float = 0.0,
+        offensive_terms: Iterable[str] = DEFAULT_OFFENSIVE_TERMS,
+        seed: Optional[int] = None,
+    ):
+        self.latency_seconds = latency_seconds
+        self.drop_rate = drop_rate
+        self.malformed_rate = malformed_rate
+        self.pattern = re.compile("|".join(re.escape(term) for term in offensive_terms), re.IGNORECASE)
+        self.rng = random.Random(seed)
+        self.calls = 0
+
+    def label(self, text: str) -> int:
+        return 1 if self.pattern.search(text or "") else 0
+
+    def generate(self, prompt: str, json_output: bool = False) -> LLMResponse:
+        self.calls += 1
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        items = json.loads(prompt[prompt.index("["):prompt.rindex("]") + 1])
+        answer = [{"id": item["id"], "label": self.label(item["text"])} for item in items if self.rng.random() >= self.drop_rate]
+        text = json.dumps(answer)
+        if self.rng.random() < self.malformed_rate:
+            text = text[:len(text) // 2]
+        return LLMResponse(text=text, prompt_tokens=len(prompt) // 4 + 1, output_tokens=len(text) // 4 + 1)
@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+import shutil
+from typing import Iterable, List, Optional, Sequence
+import numpy as np
+from torch.utils.data import Dataset
+
+TOKENS_FILE = "tokens.bin"
+OFFSETS_FILE = "offsets.npy"
+LABELS_FILE = "labels.npy"
+IDS_FILE = "ids.npy"
+META_FILE = "meta.json"
+PREDICTIONS_DIR = "predictions"
+TOKEN_DTYPE = np.int32
+
+
+def tokenizer_fingerprint(tokenizer, max_len: int) -> str:
+    """Changes whenever the same text could tokenize differently: vocabulary, normalizer, truncation length."""
+    backend = getattr(tokenizer, "backend_tokenizer", None)
+    if backend is not None:
+        definition = json.loads(backend.to_str())
+        # Set by the last call's arguments, not part of how the tokenizer splits text
+        definition.pop("truncation", None)
+        definition.pop("padding", None)
+        definition = json.dumps(definition)
+    else:
+        definition = json.dumps(tokenizer.get_vocab(), sort_keys=True)
+    return hashlib.sha256(f"{type(tokenizer).__name__}|{max_len}|{definition}".encode("utf-8")).hexdigest()[:16]
+
+
+class SnapshotWriter:
+    """
+    Writes a snapshot page by page: token ids are appended to one flat int32 file, and row offsets,
+    labels and labelled-row ids are saved next to it. The snapshot is written to a temporary
+    directory and renamed into place, so readers never see a partial one.
+    """
+
+    def __init__(self, directory: str, tokenizer, max_len: int = 512):
+        self.directory = directory
+        self.tokenizer = tokenizer
+        self.max_len = max_len
+        self.tmp_directory = f"{directory}.tmp-{os.getpid()}"
+        shutil.rmtree(self.tmp_directory, ignore_errors=True)
+        os.makedirs(self.tmp_directory)
+        self.tokens_file = open(os.path.join(self.tmp_directory, TOKENS_FILE), "wb")
+        self.offsets: List[int] = [0]
+        self.labels: List[int] = []
+        self.ids: List[int] = []
+
+    def add(self, ids: Sequence[int], texts: Sequence[str], labels: Sequence[int]) -> None:
+        encodings = self.tokenizer(
+            [str(text) for text in texts],
+            add_special_tokens=True,
+            max_length=self.max_len,
+            return_token_type_ids=False,
+            return_attention_mask=False,
+            truncation=True
+        )
+        for input_ids in encodings["input_ids"]:
+            np.asarray(input_ids, dtype=TOKEN_DTYPE).tofile(self.tokens_file)
+            self.offsets.append(self.offsets[-1] + len(input_ids))
+        self.labels.extend(int(label) for label in labels)
+        self.ids.extend(int(row_id) for row_id in ids)
+
+    def close(self, meta: dict) -> str:
+        self.tokens_file.close()
+        np.save(os.path.join(self.tmp_directory, OFFSETS_FILE), np.asarray(self.offsets, dtype=np.int64))
+        np.save(os.path.join(self.tmp_directory, LABELS_FILE), np.asarray(self.labels, dtype=np.int64))
+        np.save(os.path.join(self.tmp_directory, IDS_FILE), np.asarray(self.ids, dtype=np.int64))
+        with open(os.path.join(self.tmp_directory, META_FILE), "w") as f:
+            json.dump({**meta, "rows": len(self.labels), "tokens": self.offsets[-1]}, f)
+        try:
+            os.replace(self.tmp_directory, self.directory)
+        except OSError:
+            # Another process built the same snapshot first
+            if not os.path.exists(os.path.join(self.directory, META_FILE)):
+                raise
+            shutil.rmtree(self.tmp_directory, ignore_errors=True)
+        return self.directory
+
+    def abort(self) -> None:
+        self.tokens_file.close()
+        shutil.rmtree(self.tmp_directory, ignore_errors=True)
+
+
+class SnapshotDataset(Dataset):
+    """
+    A pre-tokenized snapshot opened as memory maps: nothing is read until an example is accessed,
+    examples are views into the token file, and `subset` selects rows without copying tokens.
+    Examples are unpadded, for use with `DataCollatorWithPadding`.
+    """
+
+    def __init__(self, directory: str, tokenizer=None, indices: Optional[np.ndarray] = None):
+        self.directory = directory
+        self.tokenizer = tokenizer
+        with open(os.path.join(directory, META_FILE)) as f:
+            self.meta = json.load(f)
+        offsets = np.load(os.path.join(directory, OFFSETS_FILE), mmap_mode="r")
+        self._offsets = offsets
+        self._tokens = np.memmap(os.path.join(directory, TOKENS_FILE), dtype=TOKEN_DTYPE, mode="r", shape=(int(offsets[-1]),)) if offsets[-1] else np.zeros(0, dtype=TOKEN_DTYPE)
+        self._labels = np.load(os.path.join(directory, LABELS_FILE), mmap_mode="r")
+        self._ids = np.load(os.path.join(directory, IDS_FILE), mmap_mode="r")
+        self.indices = np.arange(len(self._labels)) if indices is None else np.asarray(indices)
+
+    def subset(self, indices: Iterable[int]) -> "SnapshotDataset":
+        return SnapshotDataset(self.directory, self.tokenizer, self.indices[np.asarray(list(indices), dtype=np.int64)])
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, item):
+        row = self.indices[item]
+        input_ids = self._tokens[self._offsets[row]:self._offsets[row + 1]]
+        return {
+            'input_ids': input_ids,
+            'attention_mask': np.ones(len(input_ids), dtype=TOKEN_DTYPE),
+            'labels': int(self._labels[row])
+        }
+
+    @property
+    def lengths(self) -> List[int]:
+        return (self._offsets[self.indices + 1] - self._offsets[self.indices]).tolist()
+
+    @property
+    def labels(self) -> List[int]:
+        return self._labels[self.indices].tolist()
+
+    @property
+    def ids(self) -> List[int]:
+        return self._ids[self.indices].tolist()
+
+    @property
+    def num_tokens(self) -> int:
+        return int(sum(self.lengths))
+
+    @property
+    def fingerprint(self) -> str:
+        """Identifies the examples: the snapshot's name (data and tokenizer) and the selected rows."""
+        digest = hashlib.sha256(os.path.basename(os.path.normpath(self.directory)).encode("utf-8"))
+        digest.update(np.ascontiguousarray(self.indices, dtype=np.int64).tobytes())
+        return digest.hexdigest()[:16]
+
+    def _predictions_path(self, key: str) -> str:
+        return os.path.join(self.directory, PREDICTIONS_DIR, f"{key}-{self.fingerprint}.npy")
+
+    def load_predictions(self, key: str) -> Optional[np.ndarray]:
+        """Predictions saved for these exact examples under `key` (e.g. a model version), if any."""
+        path = self._predictions_path(key)
+        return np.load(path) if os.path.exists(path) else None
+
+    def save_predictions(self, key: str, predictions: np.ndarray) -> None:
+        """Stores predictions next to the snapshot, so they are pruned with it."""
+        path = self._predictions_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp-{os.getpid()}.npy"
+        np.save(tmp_path, np.asarray(predictions))
+        os.replace(tmp_path, path)
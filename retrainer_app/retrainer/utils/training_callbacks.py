@@ -0,0 +1,70 @@
+import time
+from typing import Dict
+from transformers import TrainerCallback
+
+
+class TokenThroughputCallback(TrainerCallback):
+    """
+    Measures training throughput in real (unpadded) tokens per second, and the share of the tokens
+    fed to the model that were padding. Needs `include_num_input_tokens_seen=True`. Only the epochs
+    and tokens of this attempt count, so a job resumed from a checkpoint is not credited with the
+    restored ones.
+    """
+
+    def __init__(self, tokens_per_epoch: int):
+        self.tokens_per_epoch = tokens_per_epoch
+        self.started = None
+        self.first_epoch = 0.0
+        self.first_tokens_seen = 0
+        self.metrics: Dict[str, float] = {}
+
+    def on_train_begin(self, args, state, control, **kwargs):
+        self.started = time.perf_counter()
+        self.first_epoch = state.epoch or 0.0
+        self.first_tokens_seen = state.num_input_tokens_seen or 0
+
+    def on_train_end(self, args, state, control, **kwargs):
+        seconds = time.perf_counter() - self.started
+        tokens = self.tokens_per_epoch * ((state.epoch or args.num_train_epochs) - self.first_epoch)
+        seen = state.num_input_tokens_seen - self.first_tokens_seen
+        self.metrics = {
+            "train_seconds": seconds,
+            "train_tokens": tokens,
+            "train_tokens_per_second": tokens / seconds if seconds else 0.0,
+            "train_padding_share": max(0.0, 1.0 - tokens / seen) if seen else 0.0,
+        }
+
+
+class JobProgressCallback(TrainerCallback):
+    """
+    Reports step, latest loss and ETA to a retraining job, and stops training at the next step once
+    the job is cancelled, in this process or, as seen when progress is written, in another one.
+    The ETA extrapolates from the steps run in this attempt, so a resumed job does not count the
+    restored steps as instantaneous.
+    """
+
+    def __init__(self, job):
+        self.job = job
+        self.loss = None
+        self.started = None
+        self.first_step = 0
+
+    def on_train_begin(self, args, state, control, **kwargs):
+        self.started = time.perf_counter()
+        self.first_step = state.global_step
+
+    def on_log(self, args, state, control, logs=None, **kwargs):
+        if logs and "loss" in logs:
+            self.loss = logs["loss"]
+
+    def on_step_end(self, args, state, control, **kwargs):
+        done = state.global_step - self.first_step
+        elapsed = time.perf_counter() - self.started
+        eta = (state.max_steps - state.global_step) * elapsed / done if done else None
+        self.job.training_progress(state.global_step, state.max_steps, self.loss, eta, force=state.global_step == state.max_steps)
+        if self.job.cancelled:
+            control.should_training_stop = True
+
+    def on_train_end(self, args, state, control, **kwargs):
+        # The last step's loss is logged after its on_step_end
+        self.job.training_progress(state.global_step, state.max_steps, self.loss, 0.0, force=True)
@@ -0,0 +1,93 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+
+# Offline benchmark of the data fetcher against the ReplayReddit stand-in.
+# Needs the app settings (.env) and a *dedicated* PostgreSQL database passed via --database-url:
+# the fetcher tables in that database are truncated before the run.
+#
+#   python scripts/benchmark_fetcher.py --database-url postgresql://user:pw@localhost/bench --cycles 3
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.db import Base
+from app.core.config import settings
+from app.data_fetcher.repositories.reddit_post import RedditPostRepository
+from app.data_fetcher.services.reddit_service import RedditService
+from app.data_fetcher.services.stream_ingestion_service import StreamIngestionService
+from app.data_fetcher.utils.replay_reddit import ReplayReddit, generate_synthetic_dataset
+
+DEFAULT_RATES = {
+    "politics": 120.0, "worldnews": 60.0, "changemyview": 8.0, "unpopularopinion": 20.0,
+    "Debate": 0.5, "TrueUnpopularOpinion": 2.0, "PoliticalDiscussion": 3.0,
+}
+
+class RoundTripCounter:
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args, **kwargs):
+        self.count += 1
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark RedditService against a replayed Reddit.")
+    parser.add_argument("--database-url", required=True, help="Dedicated PostgreSQL database for the benchmark")
+    parser.add_argument("--mode", choices=["batch", "stream"], default="batch")
+    parser.add_argument("--cycles", type=int, default=3)
+    parser.add_argument("--replay-file", help="Recorded dataset (see record_dataset); synthetic data if omitted")
+    parser.add_argument("--comments-per-post", type=float, default=40.0)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Simulated latency per Reddit request")
+    parser.add_argument("--requests-per-minute", type=float, default=None, help="Simulated Reddit rate limit")
+    parser.add_argument("--limit", type=int, default=settings.POST_FETCH_LIMIT, help="Listing limit per subreddit (batch mode)")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text("TRUNCATE raw_comments, raw_posts, ingestion_checkpoints RESTART IDENTITY"))
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    round_trips = RoundTripCounter(engine)
+
+    replay_options = {"latency_seconds": args.latency_ms / 1000, "requests_per_minute": args.requests_per_minute}
+    if args.replay_file:
+        reddit = ReplayReddit.from_file(args.replay_file, **replay_options)
+    else:
+        rates = {name: DEFAULT_RATES.get(name, 5.0) for name in settings.SUBREDDITS_TO_FETCH}
+        reddit = ReplayReddit(generate_synthetic_dataset(rates, mean_comments_per_post=args.comments_per_post), **replay_options)
+    subreddits = list(reddit.dataset["subreddits"].keys())
+
+    stream = StreamIngestionService(reddit_client_factory=lambda: reddit, session_factory=session_factory, subreddits=subreddits)
+    print(f"mode={args.mode} subreddits={len(subreddits)} cycles={args.cycles}")
+    print(f"{'cycle':>5} {'posts':>7} {'comments':>9} {'api_calls':>9} {'db_trips':>9} {'seconds':>8} {'items/s':>9}")
+    for cycle in range(1, args.cycles + 1):
+        reddit.reset_stats()
+        db = session_factory()
+        try:
+            counts_before = db.execute(text("SELECT (SELECT COUNT(*) FROM raw_posts), (SELECT COUNT(*) FROM raw_comments)")).one()
+            round_trips.count = 0
+            started = time.perf_counter()
+            if args.mode == "batch":
+                service = RedditService(RedditPostRepository(db), reddit)
+                for name in subreddits:
+                    asyncio.run(service.fetch_subreddit_posts(name, args.limit))
+            else:
+                stream.poll_once()
+            elapsed = time.perf_counter() - started
+            trips = round_trips.count
+            counts_after = db.execute(text("SELECT (SELECT COUNT(*) FROM raw_posts), (SELECT COUNT(*) FROM raw_comments)")).one()
+        finally:
+            db.close()
+        new_posts = counts_after[0] - counts_before[0]
+        new_comments = counts_after[1] - counts_before[1]
+        throughput = (new_posts + new_comments) / elapsed if elapsed > 0 else 0.0
+        print(f"{cycle:>5} {new_posts:>7} {new_comments:>9} {reddit.api_calls:>9} {trips:>9} {elapsed:>8.2f} {throughput:>9.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import argparse
+import copy
+import os
+import random
+import sys
+import tempfile
+import time
+from transformers import AutoConfig, AutoModelForSequenceClassification, AutoTokenizer, DataCollatorWithPadding, Trainer, TrainingArguments
+
+# Offline comparison of full fine-tuning and LoRA adapters (FINETUNE_MODE) on synthetic texts:
+# training time, logged artifact size and model swap latency in the inference service.
+# Needs the retrainer settings (.env); LORA_* can be overridden through the environment.
+#
+#   python scripts/benchmark_finetune.py --model-path data/initial-model --rows 2000
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from retrainer_app.core.config import settings
+from retrainer_app.retrainer.utils.adapters import add_adapter, directory_size, trainable_parameters
+from app.inference.utils.model_loader import merge_adapter
+
+WORDS = "the a this that people think really never good bad idea vote game play policy news hate idiot love".split()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compare full fine-tuning with LoRA adapters.")
+    parser.add_argument("--model-path", default="data/initial-model", help="Base model directory (config and tokenizer; weights if present)")
+    parser.add_argument("--rows", type=int, default=2000, help="Synthetic training rows")
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args()
+
+def load_base(model_path: str):
+    try:
+        return AutoModelForSequenceClassification.from_pretrained(model_path)
+    except OSError:
+        print(f"No weights in {model_path}, using randomly initialised weights of the same architecture.")
+        return AutoModelForSequenceClassification.from_config(AutoConfig.from_pretrained(model_path))
+
+def synthetic_dataset(tokenizer, rows: int):
+    texts = [" ".join(random.choices(WORDS, k=max(3, int(random.expovariate(1 / 30))))) for _ in range(rows)]
+    encodings = tokenizer(texts, truncation=True, max_length=512, return_token_type_ids=False)
+    return [
+        {"input_ids": input_ids, "attention_mask": attention_mask, "labels": int("hate" in text or "idiot" in text)}
+        for text, input_ids, attention_mask in zip(texts, encodings["input_ids"], encodings["attention_mask"])
+    ]
+
+def train(model, tokenizer, dataset, output_dir: str, learning_rate: float) -> float:
+    args = TrainingArguments(
+        output_dir=output_dir,
+        num_train_epochs=1,
+        learning_rate=learning_rate,
+        per_device_train_batch_size=32,
+        warmup_steps=5,
+        weight_decay=0.01,
+        group_by_length=True,
+        save_strategy="no",
+        report_to=[],
+        disable_tqdm=True,
+    )
+    started = time.perf_counter()
+    Trainer(model=model, args=args, train_dataset=dataset, data_collator=DataCollatorWithPadding(tokenizer)).train()
+    return time.perf_counter() - started
+
+def main():
+    args = parse_args()
+    random.seed(args.seed)
+    tokenizer = AutoTokenizer.from_pretrained(args.model_path)
+    dataset = synthetic_dataset(tokenizer, args.rows)
+    base = load_base(args.model_path)
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        # Full fine-tuning: the whole model is logged and a swap loads all of it
+        full_model = copy.deepcopy(base)
+        full_trainable = trainable_parameters(full_model)
+        full_seconds = train(full_model, tokenizer, dataset, os.path.join(workdir, "full-run"), 5e-5)
+        full_dir = os.path.join(workdir, "full")
+        full_model.save_pretrained(full_dir)
+        tokenizer.save_pretrained(full_dir)
+        started = time.perf_counter()
+        AutoModelForSequenceClassification.from_pretrained(full_dir).eval()
+        results.append(("full", full_trainable, full_seconds, directory_size(full_dir), time.perf_counter() - started))
+
+        # LoRA: only the adapter is logged and a swap merges it into the base already in memory
+        lora_model = add_adapter(copy.deepcopy(base))
+        lora_trainable = trainable_parameters(lora_model)
+        lora_seconds = train(lora_model, tokenizer, dataset, os.path.join(workdir, "lora-run"), settings.LORA_LEARNING_RATE)
+        adapter_dir = os.path.join(workdir, "adapter")
+        lora_model.save_pretrained(adapter_dir)
+        started = time.perf_counter()
+        merge_adapter(base, adapter_dir)
+        results.append(("lora", lora_trainable, lora_seconds, directory_size(adapter_dir), time.perf_counter() - started))
+
+    print(f"rows={args.rows} lora_rank={settings.LORA_RANK} lora_targets={settings.LORA_TARGET_MODULES}")
+    print(f"{'mode':>5} {'trainable':>11} {'train_s':>8} {'artifact_mb':>12} {'swap_ms':>8}")
+    for mode, trainable, seconds, size, swap in results:
+        print(f"{mode:>5} {trainable:>11} {seconds:>8.1f} {size / 1e6:>12.2f} {1000 * swap:>8.1f}")
+
+if __name__ == "__main__":
+    main()
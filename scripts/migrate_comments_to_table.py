@@ -0,0 +1,60 @@
+import os
+import sys
+from sqlalchemy import create_engine, text
+
+# One-off backfill: moves the legacy raw_posts.comments JSON lists into the raw_comments table.
+# Legacy comments have no Reddit ID, so they keep the positional "<post_id>_comment_<i>" ID that
+# predictions and labelled_post_contents already reference.
+
+DATABASE_URL = os.getenv("DATABASE_URL")
+if not DATABASE_URL:
+    raise ValueError("DATABASE_URL environment variable not set.")
+
+BATCH_SIZE = int(os.getenv("COMMENT_MIGRATION_BATCH_SIZE", "500"))
+
+BACKFILL_SQL = text("""
+    INSERT INTO raw_comments (comment_id, post_id, parent_id, author, body, created_utc, is_processed)
+    SELECT
+        p.post_id || '_comment_' || (c.ordinality - 1),
+        p.post_id,
+        NULL,
+        NULL,
+        c.value,
+        p.created_utc,
+        p.is_processed
+    FROM raw_posts p
+    CROSS JOIN LATERAL json_array_elements_text(p.comments) WITH ORDINALITY AS c(value, ordinality)
+    WHERE p.id > :last_id AND p.id <= :upper_id AND p.comments IS NOT NULL
+    ON CONFLICT (comment_id) DO NOTHING
+""")
+
+def migrate_comments(drop_column: bool = False):
+    engine = create_engine(DATABASE_URL)
+    with engine.connect() as conn:
+        has_column = conn.execute(text("""
+            SELECT 1 FROM information_schema.columns
+            WHERE table_name = 'raw_posts' AND column_name = 'comments'
+        """)).first()
+        max_id = conn.execute(text("SELECT COALESCE(MAX(id), 0) FROM raw_posts")).scalar()
+    if not has_column:
+        print("raw_posts.comments does not exist. Nothing to migrate.")
+        return
+
+    last_id, total = 0, 0
+    # Walk the posts in id ranges so each transaction stays small
+    while last_id < max_id:
+        upper_id = last_id + BATCH_SIZE
+        with engine.begin() as conn:
+            total += conn.execute(BACKFILL_SQL, {"last_id": last_id, "upper_id": upper_id}).rowcount
+        last_id = upper_id
+        print(f"Migrated posts up to id {min(upper_id, max_id)} / {max_id} ({total} comments so far)")
+
+    if drop_column:
+        with engine.begin() as conn:
+            conn.execute(text("ALTER TABLE raw_posts DROP COLUMN comments"))
+        print("Dropped legacy raw_posts.comments column.")
+
+    print(f"Comment migration finished. Inserted {total} comments.")
+
+if __name__ == "__main__":
+    migrate_comments(drop_column="--drop-column" in sys.argv)
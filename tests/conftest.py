@@ -0,0 +1,7 @@
+import os
+
+# Settings require database credentials at import time; unit tests never connect
+os.environ.setdefault("POSTGRES_USER", "test")
+os.environ.setdefault("POSTGRES_PASSWORD", "test")
+os.environ.setdefault("POSTGRES_HOST", "localhost")
+os.environ.setdefault("LLM_API_KEY", "test")
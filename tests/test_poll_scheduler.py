@@ -0,0 +1,37 @@
+from app.data_fetcher.services.poll_scheduler import AdaptivePollScheduler
+
+def make_scheduler(subreddits, budget_per_minute):
+    return AdaptivePollScheduler(
+        subreddits,
+        request_budget_per_minute=budget_per_minute,
+        min_interval=10.0,
+        max_interval=900.0,
+    )
+
+def test_budget_smaller_than_subreddit_count():
+    subreddits = [f"sub{i}" for i in range(26)]
+    scheduler = make_scheduler(subreddits, budget_per_minute=1.0)
+    now = 1_000_000.0
+    # The quiet subreddits are clamped to the maximum interval and already overspend the budget
+    scheduler.record_poll("sub0", [now - i for i in range(1, 101)], saturated=True, now=now)
+    for name in subreddits[1:]:
+        scheduler.record_poll(name, [], saturated=False, now=now)
+
+    intervals = [state["interval_seconds"] for state in scheduler.snapshot()["subreddits"]]
+    assert intervals == [900.0] * len(subreddits)
+
+def test_zero_budget_falls_back_to_max_interval():
+    scheduler = make_scheduler(["a", "b"], budget_per_minute=1.0)
+    scheduler.set_request_budget(0.0)
+    assert [state["interval_seconds"] for state in scheduler.snapshot()["subreddits"]] == [900.0, 900.0]
+
+def test_budget_is_split_by_square_root_of_rate():
+    scheduler = make_scheduler(["busy", "quiet"], budget_per_minute=6.0)
+    now = 1_000_000.0
+    scheduler.record_poll("busy", [now - 10 * i for i in range(1, 41)], saturated=True, now=now)
+    scheduler.record_poll("quiet", [now - 40 * i for i in range(1, 11)], saturated=True, now=now)
+
+    intervals = {state["subreddit"]: state["interval_seconds"] for state in scheduler.snapshot()["subreddits"]}
+    # 4x the rate gets half the interval, and the two polls together spend the budget
+    assert abs(intervals["quiet"] / intervals["busy"] - 2.0) < 0.01
+    assert abs(1 / intervals["busy"] + 1 / intervals["quiet"] - 0.1) < 1e-3